@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from datos_dashboard import ARCHIVOS, leer_tabla, versiones_datos
+from cubo_scorecard import CLAVE_TODOS, construir_cubo, construir_cubo_resumen
+
 st.set_page_config(
     page_title="Balanced Scorecard - DW Gestión",
     layout="wide",
@@ -22,15 +25,44 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-@st.cache_data
-def load_data(version: int = 1):
-    proyectos = pd.read_csv("dw_proyectos.csv")
-    tareas = pd.read_csv("dw_tareas.csv")
-    incidentes = pd.read_csv("dw_incidentes.csv")
-    hechos = pd.read_csv("dw_hechos_proyecto.csv")
-    return proyectos, tareas, incidentes, hechos
+# Política de caché: las entradas expiran a la hora y se guardan pocas versiones,
+# así la memoria no crece con cada exportación ni con el número de sesiones.
+# Se usa cache_resource: todas las sesiones comparten el mismo objeto (sin copiarlo
+# en cada llamada como cache_data), así que las tablas y el cubo son de solo lectura.
+TTL_CACHE = 3600
+MAX_ENTRADAS = 4
+
+@st.cache_resource(ttl=TTL_CACHE, max_entries=MAX_ENTRADAS * len(ARCHIVOS))
+def load_tabla(tabla: str, version: str):
+    # Snapshot Parquet tipado (solo las columnas que usa el tablero); CSV si no existe.
+    # version (hash del manifiesto o mtime/tamaño) solo es la llave: si la tabla
+    # no cambió no se vuelve a leer, aunque cambien las demás
+    return leer_tabla(tabla)
+
+@st.cache_resource(ttl=TTL_CACHE, max_entries=MAX_ENTRADAS)
+def load_cubo(version_proyectos: str, version_tareas: str, version_incidentes: str):
+    # Agregados de los 4 paneles para cada año y "Todos". Depende solo de estas
+    # tres tablas: un cambio en hechos no lo invalida. Los joins y las vistas por
+    # año se hacen una vez por versión de datos para todos los usuarios; cambiar
+    # de año solo lee cubo[anio_sel]
+    versiones = {"proyectos": version_proyectos, "tareas": version_tareas, "incidentes": version_incidentes}
+    proyectos, tareas, incidentes = (load_tabla(t, versiones[t]) for t in ("proyectos", "tareas", "incidentes"))
+    return construir_cubo(proyectos, tareas, incidentes)
+
+@st.cache_resource(ttl=TTL_CACHE, max_entries=MAX_ENTRADAS)
+def load_cubo_resumen(version_anio: str, version_proyectos: str):
+    # Mismo cubo desde las tablas resumen que mantiene el ETL en el DW (unos KB):
+    # conteos por año/estado/industria y tareas/incidentes por proyecto
+    return construir_cubo_resumen(
+        load_tabla("resumen_anio", version_anio), load_tabla("resumen_proyectos", version_proyectos)
+    )
 
-proyectos, tareas, incidentes, hechos = load_data(version=1)
+versiones = versiones_datos()
+if versiones["resumen_anio"] and versiones["resumen_proyectos"]:
+    cubo = load_cubo_resumen(versiones["resumen_anio"], versiones["resumen_proyectos"])
+else:
+    # Exportación anterior a las tablas resumen: se agrega desde las filas
+    cubo = load_cubo(versiones["proyectos"], versiones["tareas"], versiones["incidentes"])
 
 # Título más compacto con HTML
 st.markdown(
@@ -39,14 +71,14 @@ st.markdown(
 )
 
 # Filtro global compacto + botón de navegación
-anios = sorted(proyectos["AnioCierre"].dropna().unique()) if "AnioCierre" in proyectos.columns else []
+anios = [clave for clave in cubo if clave != CLAVE_TODOS]
 col_filtro1, col_filtro2, col_boton = st.columns([1, 4, 1])
 
+anio_sel = CLAVE_TODOS
 with col_filtro1:
     if anios:
-        anio_sel = st.selectbox("Año", options=["Todos"] + list(anios), index=0)
-        if anio_sel != "Todos":
-            proyectos = proyectos[proyectos["AnioCierre"] == anio_sel]
+        anio_sel = st.selectbox("Año", options=[CLAVE_TODOS] + anios, index=0)
+panel = cubo[anio_sel]
 
 with col_boton:
     st.markdown(
@@ -71,47 +103,20 @@ fila2_col1, fila2_col2 = st.columns(2)
 # =====================================================
 with fila1_col1:
     st.markdown("#### 1. Financiera – Proyectos dentro de presupuesto")
-    proy_final = proyectos[proyectos["EstadoProyecto"].str.upper() == "FINALIZADO"]
+    financiera = panel["financiera"]
 
-    if not proy_final.empty:
-        dentro = proy_final[proy_final["costo_real"] <= proy_final["presupuesto"]]
-        total_final = len(proy_final)
-        total_dentro = len(dentro)
-        pct_dentro = (total_dentro / total_final * 100) if total_final > 0 else 0
+    if financiera is not None:
+        total_final = financiera["total_final"]
+        total_dentro = financiera["total_dentro"]
+        pct_dentro = financiera["pct_dentro"]
 
         c1, c2, c3 = st.columns(3)
         c1.metric("Finalizados", total_final)
         c2.metric("Dentro de presupuesto", total_dentro)
         c3.metric("% Dentro", f"{pct_dentro:.1f}%")
 
-        if "AnioCierre" in proy_final.columns:
-            resumen_anio = (
-                proy_final
-                .assign(Dentro=lambda df: df["costo_real"] <= df["presupuesto"])
-                .groupby("AnioCierre")
-                .agg(
-                    Finalizados=("idProyecto", "count"),
-                    DentroPresupuesto=("Dentro", "sum")
-                )
-                .reset_index()
-            )
-            resumen_anio["FueraPresupuesto"] = (
-                resumen_anio["Finalizados"] - resumen_anio["DentroPresupuesto"]
-            )
-
-            # pasar a formato largo para barras agrupadas
-            resumen_anio["AnioCierre"] = resumen_anio["AnioCierre"].astype(str)
-            long_df = resumen_anio.melt(
-                id_vars=["AnioCierre"],
-                value_vars=["DentroPresupuesto", "FueraPresupuesto"],
-                var_name="Tipo",
-                value_name="Proyectos"
-            )
-            long_df["Tipo"] = long_df["Tipo"].map({
-                "DentroPresupuesto": "Dentro del presupuesto",
-                "FueraPresupuesto": "Fuera del presupuesto"
-            })
-
+        if financiera["por_anio"] is not None:
+            long_df = financiera["por_anio"]
             fig1 = px.bar(
                 long_df,
                 x="AnioCierre",
@@ -152,17 +157,9 @@ with fila1_col1:
 # =====================================================
 with fila1_col2:
     st.markdown("#### 2. Cliente – Industrias con más proyectos cancelados")
-    proy_cancel = proyectos[proyectos["EstadoProyecto"].str.upper() == "CANCELADO"]
-
-    if not proy_cancel.empty and "Industria" in proy_cancel.columns:
-        industria_counts = (
-            proy_cancel.groupby("Industria")["idProyecto"]
-            .count()
-            .reset_index(name="ProyectosCancelados")
-            .sort_values("ProyectosCancelados", ascending=False)
-        )
-        top = industria_counts.head(5)
+    top = panel["cancelaciones"]
 
+    if top is not None:
         fig2 = px.bar(
             top,
             x="ProyectosCancelados",
@@ -187,84 +184,37 @@ with fila1_col2:
 with fila2_col1:
     st.markdown("#### 3. Procesos – Tareas automatizadas vs no automatizadas por proyecto")
     
-    # Hacer join entre tareas y proyectos para obtener el año
-    if not tareas.empty and not proyectos.empty:
-        tareas_con_anio = tareas.merge(
-            proyectos[["idProyecto", "AnioCierre"]],
-            left_on="Proyecto_idProyecto",
-            right_on="idProyecto",
-            how="left"
-        )
-        
-        # Filtrar tareas por año seleccionado
-        tareas_filtradas = tareas_con_anio.copy()
-        if anio_sel != "Todos":
-            tareas_filtradas = tareas_filtradas[tareas_filtradas["AnioCierre"] == float(anio_sel)]
-        
-        if not tareas_filtradas.empty and "EsAutomatizacion" in tareas_filtradas.columns:
-            total_tareas = len(tareas_filtradas)
-            tareas_auto = tareas_filtradas[tareas_filtradas["EsAutomatizacion"] == 1]
-            total_auto = len(tareas_auto)
-            pct_auto = (total_auto / total_tareas * 100) if total_tareas > 0 else 0
+    automatizacion = panel["automatizacion"]
+
+    if automatizacion is not None:
+        if automatizacion["estado"] == "ok":
+            total_tareas = automatizacion["total_tareas"]
+            total_auto = automatizacion["total_auto"]
+            pct_auto = automatizacion["pct_auto"]
 
             c1, c2, c3 = st.columns(3)
             c1.metric("Tareas totales", total_tareas)
             c2.metric("Automatizadas", total_auto)
             c3.metric("% Automatizadas", f"{pct_auto:.1f}%")
 
-            if "Proyecto_idProyecto" in tareas_filtradas.columns:
-                resumen_auto = (
-                    tareas_filtradas.groupby("Proyecto_idProyecto")
-                    .agg(
-                        TareasTotales=("idTarea", "count"),
-                        TareasAuto=("EsAutomatizacion", "sum")
-                    )
-                    .reset_index()
-                )
-                resumen_auto["TareasNoAuto"] = (
-                    resumen_auto["TareasTotales"] - resumen_auto["TareasAuto"]
-                )
+            plot_df = automatizacion["top"]
 
-                resumen_auto = resumen_auto.merge(
-                    proyectos[["idProyecto", "nombre_proyecto"]],
-                    left_on="Proyecto_idProyecto",
-                    right_on="idProyecto",
-                    how="left"
-                )
-
-                top_n = 3
-                top_auto = resumen_auto.sort_values(
-                    "TareasTotales", ascending=False
-                ).head(top_n)
-
-                plot_df = top_auto.melt(
-                    id_vars=["nombre_proyecto"],
-                    value_vars=["TareasAuto", "TareasNoAuto"],
-                    var_name="Tipo",
-                    value_name="Cantidad"
-                )
-                plot_df["Tipo"] = plot_df["Tipo"].map(
-                    {"TareasAuto": "Automatizadas", "TareasNoAuto": "No automatizadas"}
-                )
-
-                fig3 = px.bar(
-                    plot_df,
-                    x="nombre_proyecto",
-                    y="Cantidad",
-                    color="Tipo",
-                    barmode="group",
-                    height=140,
-                    labels={"nombre_proyecto": "Proyecto", "Cantidad": "Tareas"},
-                )
-                fig3.update_layout(
-                    margin=dict(l=10, r=10, t=10, b=10),
-                    legend_title_text="Tipo",
-                    xaxis_tickangle=-20,
-                    xaxis_tickfont=dict(size=9),
-                )
-                st.plotly_chart(fig3, use_container_width=True)
-            else:
-                st.info("No se encontró la columna Proyecto_idProyecto en tareas.")
+            fig3 = px.bar(
+                plot_df,
+                x="nombre_proyecto",
+                y="Cantidad",
+                color="Tipo",
+                barmode="group",
+                height=140,
+                labels={"nombre_proyecto": "Proyecto", "Cantidad": "Tareas"},
+            )
+            fig3.update_layout(
+                margin=dict(l=10, r=10, t=10, b=10),
+                legend_title_text="Tipo",
+                xaxis_tickangle=-20,
+                xaxis_tickfont=dict(size=9),
+            )
+            st.plotly_chart(fig3, use_container_width=True)
 
             st.caption(
                 "Cálculo: por cada proyecto se cuentan las tareas con EsAutomatizacion = 1 "
@@ -280,46 +230,8 @@ with fila2_col1:
 # =====================================================
 with fila2_col2:
     st.markdown("#### 4. Aprendizaje/Riesgo – Proyectos con mayor % de incidentes")
-    if not incidentes.empty:
-        # Incidentes por proyecto
-        inc_por_proy = (
-            incidentes.groupby("Proyecto_idProyecto")["idIncidente"]
-            .count()
-            .reset_index(name="NumIncidentes")
-        )
-
-        # Tareas por proyecto
-        tareas_por_proy = (
-            tareas.groupby("Proyecto_idProyecto")["idTarea"]
-            .count()
-            .reset_index(name="NumTareas")
-        )
-
-        # Unir y calcular proporción (0–1)
-        resumen = inc_por_proy.merge(
-            tareas_por_proy, on="Proyecto_idProyecto", how="left"
-        )
-        resumen["NumTareas"] = resumen["NumTareas"].fillna(1)
-        resumen["IncidentesPorTarea"] = (
-            resumen["NumIncidentes"] / resumen["NumTareas"]
-        )
-
-        # Añadir nombre de proyecto
-        resumen = resumen.merge(
-            proyectos[["idProyecto", "nombre_proyecto"]],
-            left_on="Proyecto_idProyecto",
-            right_on="idProyecto",
-            how="left"
-        )
-
-        # Top 5 proyectos distintos por proporción de incidentes
-        top_inc = (
-            resumen
-            .sort_values("IncidentesPorTarea", ascending=False)
-            .drop_duplicates(subset=["nombre_proyecto"])
-            .head(5)
-        )
-
+    top_inc = panel["incidentes"]
+    if top_inc is not None:
         fig4 = px.bar(
             top_inc,
             x="nombre_proyecto",
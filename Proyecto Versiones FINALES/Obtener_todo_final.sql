@@ -29,3 +29,116 @@ BEGIN
 END//
 
 DELIMITER ;
+
+-- ===============================================================
+-- EXTRACCIÓN INCREMENTAL (ETL por watermark)
+-- Regresa los mismos 8 result sets que obtener_todo, pero solo para los
+-- proyectos tocados desde el último watermark: proyectos nuevos o modificados,
+-- y proyectos con incidentes, asignaciones o tareas nuevas/modificadas.
+-- De cada proyecto tocado se regresan TODAS sus asignaciones e incidentes
+-- para poder recalcular hecho_proyecto completo.
+-- ===============================================================
+DELIMITER //
+
+-- Llena tmp_proyectos_delta y tmp_tareas_delta (tablas temporales de la sesión).
+-- La extracción por bloques (extraccion_oltp.py) la llama y luego lee cada tabla
+-- con su propio SELECT sobre la misma conexión. Se llama en una transacción
+-- READ COMMITTED aparte, antes de abrir la foto consistente: en REPEATABLE READ
+-- los INSERT ... SELECT toman candados compartidos sobre las tablas del OLTP.
+-- p_desde ya trae restado el margen de traslape (etl_dw.MARGEN_WATERMARK) y el
+-- filtro es >=: lo modificado en el mismo segundo del watermark, o sellado antes
+-- de NOW() pero confirmado después, se vuelve a extraer en lugar de perderse.
+DROP PROCEDURE IF EXISTS preparar_delta//
+CREATE PROCEDURE preparar_delta(
+    IN p_ultimo_incidente INT,
+    IN p_ultimo_proyecto INT,
+    IN p_desde DATETIME
+)
+BEGIN
+    DROP TEMPORARY TABLE IF EXISTS tmp_proyectos_delta;
+    CREATE TEMPORARY TABLE tmp_proyectos_delta (idProyecto INT PRIMARY KEY);
+
+    INSERT IGNORE INTO tmp_proyectos_delta
+        SELECT idProyecto FROM proyecto
+        WHERE idProyecto > p_ultimo_proyecto OR Fecha_modificacion >= p_desde;
+
+    INSERT IGNORE INTO tmp_proyectos_delta
+        SELECT Proyecto_idProyecto FROM incidente
+        WHERE idIncidente > p_ultimo_incidente OR Fecha_modificacion >= p_desde;
+
+    INSERT IGNORE INTO tmp_proyectos_delta
+        SELECT Proyecto_idProyecto FROM asignacion_tarea
+        WHERE Fecha_modificacion >= p_desde;
+
+    INSERT IGNORE INTO tmp_proyectos_delta
+        SELECT a.Proyecto_idProyecto FROM asignacion_tarea a
+        JOIN tarea t ON t.idTarea = a.Tarea_idTarea
+        WHERE t.Fecha_modificacion >= p_desde;
+
+    -- dim_tarea toma el proyecto del primer incidente que usa la tarea: también
+    -- se recalculan los proyectos con incidentes sobre una tarea modificada
+    INSERT IGNORE INTO tmp_proyectos_delta
+        SELECT i.Proyecto_idProyecto FROM incidente i
+        JOIN tarea t ON t.idTarea = i.idTarea
+        WHERE t.Fecha_modificacion >= p_desde;
+
+    -- Tareas referenciadas por los proyectos tocados (asignaciones e incidentes)
+    DROP TEMPORARY TABLE IF EXISTS tmp_tareas_delta;
+    CREATE TEMPORARY TABLE tmp_tareas_delta (idTarea INT PRIMARY KEY);
+
+    INSERT IGNORE INTO tmp_tareas_delta
+        SELECT a.Tarea_idTarea FROM asignacion_tarea a
+        JOIN tmp_proyectos_delta d ON d.idProyecto = a.Proyecto_idProyecto;
+
+    INSERT IGNORE INTO tmp_tareas_delta
+        SELECT i.idTarea FROM incidente i
+        JOIN tmp_proyectos_delta d ON d.idProyecto = i.Proyecto_idProyecto
+        WHERE i.idTarea IS NOT NULL;
+END//
+
+DROP PROCEDURE IF EXISTS obtener_todo_incremental//
+CREATE PROCEDURE obtener_todo_incremental(
+    IN p_ultimo_incidente INT,
+    IN p_ultimo_proyecto INT,
+    IN p_desde DATETIME
+)
+BEGIN
+    CALL preparar_delta(p_ultimo_incidente, p_ultimo_proyecto, p_desde);
+
+    -- CLIENTES, EQUIPOS, EMPLEADOS Y ESTADÍSTICAS (catálogos pequeños, completos)
+    SELECT idCliente, Nombre, Email, Telefono, Industria, MetricaClienteInicial FROM cliente;
+    SELECT idEquipo, Nombre, Activo FROM equipo;
+    SELECT idEmpleado, Nombre, Email, Salario, SalarioxHora, Equipo_idEquipo FROM empleado;
+    SELECT idEstadistica, Fecha, Tareas_completadas, Tareas_pendientes, Horas_trabajadas, Costo_diario FROM estadisticas_proyecto;
+
+    -- PROYECTOS TOCADOS
+    SELECT p.idProyecto, p.Nombre, p.Descripcion, p.Tipo, p.Fecha_inicio, p.Fecha_fin_estimada, p.Fecha_fin_real, p.Estado,
+           p.Presupuesto, p.Costo_real, p.Cliente_idCliente, p.Estadisticas_Proyecto_idEstadistica, p.MetricaClienteFinal, p.CertificacionSeguridad
+    FROM proyecto p
+    JOIN tmp_proyectos_delta d ON d.idProyecto = p.idProyecto
+    ORDER BY p.idProyecto;
+
+    -- TAREAS
+    SELECT t.idTarea, t.Titulo, t.Descripcion, t.Fecha_creacion, t.Fecha_fin_estimada, t.Fecha_fin_real, t.Estado, t.Prioridad,
+           t.Horas_estimadas, t.EsAutomatizacion, t.EsReutilizado
+    FROM tarea t
+    JOIN tmp_tareas_delta d ON d.idTarea = t.idTarea
+    ORDER BY t.idTarea;
+
+    -- ASIGNACIONES DE LOS PROYECTOS TOCADOS
+    SELECT a.idAsignacion, a.Tarea_idTarea, a.Empleado_idEmpleado, a.Fecha_asignacion, a.Horas_estimadas, a.Horas_reales, a.Proyecto_idProyecto
+    FROM asignacion_tarea a
+    JOIN tmp_proyectos_delta d ON d.idProyecto = a.Proyecto_idProyecto
+    ORDER BY a.idAsignacion;
+
+    -- INCIDENTES DE LOS PROYECTOS TOCADOS
+    SELECT i.idIncidente, i.Proyecto_idProyecto, i.Fecha_reporte, i.Severidad, i.Estado, i.idTarea, i.CostoCorreccion
+    FROM incidente i
+    JOIN tmp_proyectos_delta d ON d.idProyecto = i.Proyecto_idProyecto
+    ORDER BY i.idIncidente;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_tareas_delta;
+    DROP TEMPORARY TABLE IF EXISTS tmp_proyectos_delta;
+END//
+
+DELIMITER ;
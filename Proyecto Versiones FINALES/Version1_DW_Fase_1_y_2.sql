@@ -158,3 +158,75 @@ CREATE TABLE hecho_incidente (
     FOREIGN KEY (idCalidad) REFERENCES dim_calidad(idCalidad)
 );
 
+-- --------------------------------------
+-- Índices de las FKs de los hechos (y de dim_tarea por proyecto)
+-- InnoDB reutiliza estos índices para las FOREIGN KEY en lugar de crear
+-- los suyos; con nombre explícito quedan documentados y sirven también a
+-- los conteos por proyecto de resumen_proyecto
+-- --------------------------------------
+CREATE INDEX idx_tarea_proyecto ON dim_tarea (idProyecto);
+CREATE INDEX idx_hp_proyecto ON hecho_proyecto (idProyecto);
+CREATE INDEX idx_hp_cliente ON hecho_proyecto (idCliente);
+CREATE INDEX idx_hp_equipo ON hecho_proyecto (idEquipo);
+CREATE INDEX idx_hp_tiempo ON hecho_proyecto (idTiempo);
+CREATE INDEX idx_hp_estado ON hecho_proyecto (idEstado);
+CREATE INDEX idx_hi_proyecto ON hecho_incidente (idProyecto);
+CREATE INDEX idx_hi_tarea ON hecho_incidente (idTarea);
+CREATE INDEX idx_hi_calidad ON hecho_incidente (idCalidad);
+
+-- --------------------------------------
+-- Resúmenes del Balanced Scorecard (los mantiene etl_dw.actualizar_resumenes
+-- en la misma transacción de la carga; el exportador lee solo estas tablas)
+-- anio = 0: proyecto sin año de cierre; industria = '': cliente sin industria
+-- --------------------------------------
+CREATE TABLE resumen_anio (
+    anio INT NOT NULL,
+    estado VARCHAR(20) NOT NULL,
+    industria VARCHAR(50) NOT NULL,
+    proyectos INT NOT NULL,
+    dentro_presupuesto INT NOT NULL,       -- costo_real <= presupuesto
+    PRIMARY KEY (anio, estado, industria)
+);
+
+CREATE TABLE resumen_proyecto (
+    idProyecto INT PRIMARY KEY,            -- todo proyecto con tareas o incidentes en el DW
+    tareas_total INT NOT NULL,
+    tareas_automatizadas INT NOT NULL,     -- es_automatizacion = 1
+    incidentes INT NOT NULL
+);
+
+-- --------------------------------------
+-- Control del ETL incremental (watermark)
+-- Se actualiza en la misma transacción que la carga
+-- --------------------------------------
+CREATE TABLE etl_watermark (
+    proceso VARCHAR(50) PRIMARY KEY,
+    ultimo_idIncidente INT NOT NULL DEFAULT 0,
+    ultimo_idProyecto INT NOT NULL DEFAULT 0,
+    ultima_modificacion DATETIME NOT NULL DEFAULT '1970-01-01 00:00:00',
+    fecha_ejecucion DATETIME
+);
+
+-- --------------------------------------
+-- Datos de entrenamiento del modelo de defectos (modelo_rayleigh.py)
+-- Una sola consulta por conjuntos en lugar de llamar contar_tareas y
+-- calcular_semanas_proyecto por cada proyecto. Supuestos:
+--   Total_Tareas   = COUNT(*) de dim_tarea del proyecto (0 si no tiene)
+--   Tiempo_Semanas = semanas completas entre fecha_inicio y fecha_fin_real
+--                    (TIMESTAMPDIFF(WEEK, ...); 0 si falta alguna fecha)
+--   Total_Defectos = hecho_proyecto.defectos_reportados
+-- El conteo usa el índice de la FK dim_tarea(idProyecto).
+-- --------------------------------------
+CREATE OR REPLACE VIEW v_entrenamiento_defectos AS
+SELECT
+    p.idProyecto,
+    COALESCE(t.total_tareas, 0) AS Total_Tareas,
+    COALESCE(TIMESTAMPDIFF(WEEK, p.fecha_inicio, p.fecha_fin_real), 0) AS Tiempo_Semanas,
+    h.defectos_reportados AS Total_Defectos
+FROM dim_proyecto p
+JOIN hecho_proyecto h ON h.idProyecto = p.idProyecto
+LEFT JOIN (
+    SELECT idProyecto, COUNT(*) AS total_tareas
+    FROM dim_tarea
+    GROUP BY idProyecto
+) t ON t.idProyecto = p.idProyecto;
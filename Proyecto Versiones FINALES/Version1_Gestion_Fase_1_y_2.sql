@@ -60,7 +60,9 @@ CREATE TABLE tarea (
     Prioridad ENUM('BAJA','MEDIA','ALTA','CRITICA') NOT NULL DEFAULT 'MEDIA',
     Horas_estimadas INT NOT NULL DEFAULT 0, -- KPI: Horas estimadas vs reales en asignacion_tarea
     EsAutomatizacion TINYINT(1) DEFAULT 0, -- FASE 2 NUEVO: Marcar si la tarea involucra automatización (KPI 11)
-    EsReutilizado TINYINT(1) DEFAULT 0     -- FASE 2 NUEVO: Marcar si la tarea es reutilizable (KPI 10)
+    EsReutilizado TINYINT(1) DEFAULT 0,    -- FASE 2 NUEVO: Marcar si la tarea es reutilizable (KPI 10)
+    Fecha_modificacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP, -- ETL incremental (watermark)
+    INDEX idx_tarea_modificacion (Fecha_modificacion)
 );
 
 -- -------------------------
@@ -103,6 +105,8 @@ CREATE TABLE proyecto (
     Estadisticas_Proyecto_idEstadistica INT,
     MetricaClienteFinal DECIMAL(15,2) DEFAULT NULL,          -- FASE 2 NUEVO: Valor de negocio después del uso (KPI 8)
     CertificacionSeguridad TINYINT(1) DEFAULT 0,             -- FASE 2 NUEVO: Cumplimiento de políticas de seguridad/datos (KPI 12)
+    Fecha_modificacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP, -- ETL incremental (watermark)
+    INDEX idx_proyecto_modificacion (Fecha_modificacion),
     FOREIGN KEY (Cliente_idCliente) REFERENCES cliente(idCliente) ON UPDATE CASCADE,
     FOREIGN KEY (Estadisticas_Proyecto_idEstadistica) REFERENCES estadisticas_proyecto(idEstadistica)
 );
@@ -120,6 +124,8 @@ CREATE TABLE asignacion_tarea (
     Horas_estimadas INT NOT NULL, -- KPI: Esfuerzo estimado
     Horas_reales INT DEFAULT NULL, -- KPI: Esfuerzo real
     Proyecto_idProyecto INT NOT NULL,
+    Fecha_modificacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP, -- ETL incremental (watermark)
+    INDEX idx_asignacion_modificacion (Fecha_modificacion),
     UNIQUE KEY asignacion_unica (Tarea_idTarea, Empleado_idEmpleado),
     FOREIGN KEY (Tarea_idTarea) REFERENCES tarea(idTarea) ON DELETE CASCADE ON UPDATE CASCADE,
     FOREIGN KEY (Empleado_idEmpleado) REFERENCES empleado(idEmpleado) ON UPDATE CASCADE,
@@ -139,6 +145,17 @@ CREATE TABLE incidente (
     Estado ENUM('ABIERTO','EN_REVISION','CERRADO') NOT NULL DEFAULT 'ABIERTO',
     idTarea INT DEFAULT NULL,                       -- Opcional, tarea involucrada
     CostoCorreccion DECIMAL(15,2) DEFAULT NULL,     -- Costo de la corrección
+    Fecha_modificacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP, -- ETL incremental (watermark)
+    INDEX idx_incidente_modificacion (Fecha_modificacion),
     FOREIGN KEY (Proyecto_idProyecto) REFERENCES proyecto(idProyecto),
     FOREIGN KEY (idTarea) REFERENCES tarea(idTarea)
 );
+
+-- -------------------------
+-- MIGRACIÓN PARA BASES YA CREADAS (ETL incremental)
+-- Ejecutar solo si las tablas se crearon antes de agregar Fecha_modificacion.
+-- -------------------------
+-- ALTER TABLE proyecto ADD COLUMN Fecha_modificacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP, ADD INDEX idx_proyecto_modificacion (Fecha_modificacion);
+-- ALTER TABLE tarea ADD COLUMN Fecha_modificacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP, ADD INDEX idx_tarea_modificacion (Fecha_modificacion);
+-- ALTER TABLE asignacion_tarea ADD COLUMN Fecha_modificacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP, ADD INDEX idx_asignacion_modificacion (Fecha_modificacion);
+-- ALTER TABLE incidente ADD COLUMN Fecha_modificacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP, ADD INDEX idx_incidente_modificacion (Fecha_modificacion);
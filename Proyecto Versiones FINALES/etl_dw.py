@@ -0,0 +1,953 @@
+import pandas as pd
+import numpy as np
+from datetime import datetime as dt, timedelta
+
+from registro_etl import etapa, contar
+
+# =========================================================================
+# SECCIÓN 1: UTILIDADES DE LIMPIEZA Y CONVERSIÓN
+# =========================================================================
+
+def safe_strip_cols(df):
+    if not df.empty:
+        df.columns = [str(col).strip() for col in df.columns]
+    return df
+
+def safe_index(df, colname):
+    if colname in df.columns and not df.empty:
+        df = df.dropna(subset=[colname])
+        df = df.loc[~df[colname].duplicated()]
+        return df.set_index(colname, drop=False)
+    return pd.DataFrame()
+
+def strict_lookup(df_indexed, key):
+    try:
+        if key in df_indexed.index:
+            return df_indexed.loc[key]
+        return None
+    except:
+        return None
+
+def safe_int(val):
+    try: return int(val)
+    except: return 0
+
+def safe_float(val):
+    try: return float(val)
+    except: return 0.0
+
+def descomponer_fecha(fecha, id_tiempo):
+    if fecha is None or pd.isna(fecha):
+        fecha = dt.now()
+    if isinstance(fecha, str):
+        try: fecha = dt.strptime(fecha, "%Y-%m-%d")
+        except: fecha = dt.now()
+    elif isinstance(fecha, pd.Timestamp):
+        fecha = fecha.to_pydatetime()
+
+    return {
+        "idTiempo": id_tiempo,
+        "fecha_completa": fecha.strftime("%Y-%m-%d"),
+        "anio": fecha.year,
+        "trimestre": (fecha.month - 1) // 3 + 1,
+        "mes": fecha.month,
+        "semana": fecha.isocalendar()[1],
+        "dia": fecha.day
+    }
+
+# =========================================================================
+# SECCIÓN 2: ESQUEMA DEL DATA WAREHOUSE
+# =========================================================================
+
+# Columnas de cada tabla en el mismo orden que los VALUES de cargar_todo_dw.
+# El orden de las llaves respeta las FKs, así que también es el orden de carga.
+COLUMNAS_DW = {
+    "dim_cliente": ["idCliente", "nombre", "email", "telefono", "industria", "metrica_base_roi"],
+    "dim_equipo": ["idEquipo", "nombre", "activo"],
+    "dim_empleado": ["idEmpleado", "nombre", "email", "salario", "salarioxhora", "idEquipo"],
+    "dim_estado_proyecto": ["idEstado", "estado"],
+    "dim_proyecto": [
+        "idProyecto", "nombre_proyecto", "tipo_proyecto", "descripcion", "presupuesto", "costo_real",
+        "metrica_final_roi", "certificacion_seguridad", "fecha_inicio", "fecha_fin_estimada", "fecha_fin_real",
+        "idCliente", "idEquipo", "idEstado"
+    ],
+    "dim_tarea": [
+        "idTarea", "nombre", "descripcion", "fecha_creacion", "fecha_fin_estimada", "fecha_fin_real",
+        "prioridad", "es_automatizacion", "es_reutilizado", "idProyecto"
+    ],
+    "dim_tiempo": ["idTiempo", "fecha_completa", "anio", "trimestre", "mes", "semana", "dia"],
+    "dim_calidad": ["idCalidad", "severidad_defecto", "tipo_incidente", "certificacion_seguridad"],
+    "hecho_proyecto": [
+        "idFact", "idProyecto", "idCliente", "idEquipo", "idTiempo", "idEstado",
+        "presupuesto", "costo_real", "desviacion_presupuestal", "metrica_base_roi", "metrica_final_roi",
+        "tareas_automatizacion_total", "tareas_reutilizadas_total", "defectos_reportados", "costo_defecto",
+        "avance_proyecto", "horas_estimadas_total", "horas_reales_total"
+    ],
+    "hecho_incidente": [
+        "idIncidente", "idProyecto", "idTarea", "idCalidad", "fecha_reporte",
+        "severidad", "estado", "costo_correccion"
+    ],
+}
+
+# Coerción de las columnas numéricas al construir cada tabla (construir_tablas_dw).
+# "int" = safe_int y "float" = safe_float aplicados a la columna completa: lo que
+# no convierte queda en 0 / 0.0 y un NaN numérico se conserva en las float.
+TIPOS_DW = {
+    "dim_cliente": {"metrica_base_roi": "float"},
+    "dim_equipo": {"activo": "int"},
+    "dim_empleado": {"salario": "float", "salarioxhora": "float"},
+    "dim_proyecto": {
+        "presupuesto": "float", "costo_real": "float", "metrica_final_roi": "float",
+        "certificacion_seguridad": "int", "idCliente": "int",
+    },
+    "dim_tarea": {"es_automatizacion": "int", "es_reutilizado": "int"},
+    "hecho_proyecto": {
+        "presupuesto": "float", "costo_real": "float", "metrica_base_roi": "float", "metrica_final_roi": "float",
+    },
+    "hecho_incidente": {"costo_correccion": "float"},
+}
+
+MAPA_PRIORIDAD = {"BAJA": 1, "MEDIA": 2, "ALTA": 3, "CRITICA": 4, "CRÍTICA": 4}
+
+METRICAS_VACIAS = {"tareas_auto": 0, "tareas_reutil": 0, "horas_est": 0.0, "horas_real": 0.0, "avance": 0.0, "costo_defecto": 0.0, "defectos": 0}
+
+MOTIVOS_OMISION = {
+    "proyecto": "Proyecto {pid} no esta Finalizafo o Cancelado.",
+    "cliente": "Cliente no encontrado.",
+    "equipo": "No se encontró Equipo via asignación",
+}
+
+# =========================================================================
+# SECCIÓN 3: MÉTRICAS POR PROYECTO (UNA SOLA AGREGACIÓN)
+# =========================================================================
+
+def parciales_asignacion(asignacion_df, tarea_df):
+    """
+    Sumas por proyecto de un bloque de asignaciones (unidas con su tarea). Los
+    parciales de varios bloques se combinan con sumar_parciales.
+    """
+    if asignacion_df.empty or tarea_df.empty:
+        return None
+    asig = asignacion_df[["Proyecto_idProyecto", "Tarea_idTarea", "Horas_estimadas", "Horas_reales"]].merge(
+        tarea_df[["idTarea", "EsAutomatizacion", "EsReutilizado", "Estado"]],
+        left_on="Tarea_idTarea", right_on="idTarea", how="left"
+    )
+    return asig.assign(
+        _auto=pd.to_numeric(asig["EsAutomatizacion"], errors="coerce") == 1,
+        _reutil=pd.to_numeric(asig["EsReutilizado"], errors="coerce") == 1,
+        _est=pd.to_numeric(asig["Horas_estimadas"], errors="coerce"),
+        _real=pd.to_numeric(asig["Horas_reales"], errors="coerce"),
+        _compl=asig["Estado"] == "COMPLETADA",
+    ).groupby("Proyecto_idProyecto", sort=False).agg(
+        tareas_auto=("_auto", "sum"),
+        tareas_reutil=("_reutil", "sum"),
+        horas_est=("_est", "sum"),
+        horas_real=("_real", "sum"),
+        _compl=("_compl", "sum"),
+        _total=("_compl", "size"),
+    )
+
+def parciales_incidente(incidente_df):
+    """Costo de corrección y número de incidentes por proyecto de un bloque de incidentes."""
+    if incidente_df.empty:
+        return None
+    return incidente_df.assign(
+        _costo=pd.to_numeric(incidente_df["CostoCorreccion"], errors="coerce")
+    ).groupby("Proyecto_idProyecto", sort=False).agg(
+        costo_defecto=("_costo", "sum"),
+        defectos=("_costo", "size"),
+    )
+
+def sumar_parciales(acumulado, parcial):
+    if acumulado is None:
+        return parcial
+    if parcial is None:
+        return acumulado
+    return acumulado.add(parcial, fill_value=0)
+
+def metricas_desde_parciales(ids_proyecto, por_asig, por_inc):
+    """Arma el DataFrame de métricas (indexado por idProyecto) a partir de los parciales."""
+    metricas = pd.DataFrame(index=pd.Index(ids_proyecto, name="idProyecto"))
+    if por_asig is not None:
+        por_asig = por_asig.assign(avance=por_asig["_compl"] / por_asig["_total"] * 100.0)
+        metricas = metricas.join(por_asig.drop(columns=["_compl", "_total"]))
+    if por_inc is not None:
+        metricas = metricas.join(por_inc)
+
+    for col, vacio in METRICAS_VACIAS.items():
+        metricas[col] = metricas[col].fillna(vacio).astype(type(vacio)) if col in metricas.columns else vacio
+    return metricas[list(METRICAS_VACIAS)]
+
+def calcular_metricas_proyectos(proyecto_df, tarea_df, asignacion_df, incidente_df):
+    """
+    Calcula en un solo groupby las métricas de hecho_proyecto para todos los
+    proyectos: tareas_auto, tareas_reutil, horas_est, horas_real, avance,
+    costo_defecto y defectos (número de incidentes). Regresa un DataFrame
+    indexado por idProyecto; los proyectos sin datos quedan en cero.
+    """
+    ids = proyecto_df["idProyecto"].unique() if not proyecto_df.empty else []
+    # Asignaciones + tarea: cada fila de asignación cuenta como una tarea del proyecto
+    return metricas_desde_parciales(ids, parciales_asignacion(asignacion_df, tarea_df), parciales_incidente(incidente_df))
+
+# =========================================================================
+# SECCIÓN 4: ÍNDICE DE ASIGNACIONES (EMPLEADO Y EQUIPO POR INCIDENTE)
+# =========================================================================
+
+def _equipo_de_empleado(ids_empleado, empleado_by_id, equipo_by_id):
+    """
+    Para cada idEmpleado regresa el idEquipo de su equipo, o NaN si el empleado
+    o el equipo no existen (mismas reglas que strict_lookup).
+    """
+    if empleado_by_id.empty or equipo_by_id.empty:
+        return pd.Series(np.nan, index=ids_empleado.index)
+    equipos = ids_empleado.map(empleado_by_id["Equipo_idEquipo"])
+    return equipos.where(equipos.isin(equipo_by_id.index))
+
+def construir_indice_asignacion(asignacion_df, empleado_by_id, equipo_by_id):
+    """
+    Precalcula la resolución de get_empleado_y_equipo para todas las asignaciones:
+      - "por_tarea": DataFrame indexado por (Proyecto_idProyecto, Tarea_idTarea)
+        con idEmpleado e idEquipo ya validados.
+      - "por_proyecto": Series Proyecto_idProyecto -> idEquipo (respaldo sin empleado).
+    En ambos casos gana la primera asignación, igual que match.iloc[0]; una clave
+    cuya primera asignación no resuelve equipo no se busca en las siguientes.
+    """
+    indice = {
+        "por_tarea": pd.DataFrame(
+            columns=["idEmpleado", "idEquipo"],
+            index=pd.MultiIndex.from_arrays([[], []], names=["Proyecto_idProyecto", "Tarea_idTarea"])
+        ),
+        "por_proyecto": pd.Series(dtype=float),
+        "empleado_by_id": empleado_by_id,
+        "equipo_by_id": equipo_by_id,
+    }
+    if asignacion_df.empty:
+        return indice
+
+    por_tarea = asignacion_df.drop_duplicates(["Proyecto_idProyecto", "Tarea_idTarea"], keep="first")
+    por_tarea = pd.DataFrame({
+        "Proyecto_idProyecto": por_tarea["Proyecto_idProyecto"],
+        "Tarea_idTarea": por_tarea["Tarea_idTarea"],
+        "idEmpleado": por_tarea["Empleado_idEmpleado"],
+        "idEquipo": _equipo_de_empleado(por_tarea["Empleado_idEmpleado"], empleado_by_id, equipo_by_id),
+    }).dropna(subset=["idEquipo", "Tarea_idTarea"])
+    indice["por_tarea"] = por_tarea.set_index(["Proyecto_idProyecto", "Tarea_idTarea"])
+
+    por_proyecto = asignacion_df.drop_duplicates("Proyecto_idProyecto", keep="first").set_index("Proyecto_idProyecto")
+    indice["por_proyecto"] = _equipo_de_empleado(por_proyecto["Empleado_idEmpleado"], empleado_by_id, equipo_by_id).dropna()
+    return indice
+
+def acumular_primeras_asignaciones(acumulado, bloque):
+    """
+    Para extracción por bloques: conserva solo la primera asignación de cada
+    (proyecto, tarea). La primera de cada proyecto también queda incluida, así que
+    construir_indice_asignacion sobre el acumulado da el mismo índice que sobre la
+    tabla completa, con memoria proporcional a los pares distintos y no a las filas.
+    """
+    bloque = bloque[["Proyecto_idProyecto", "Tarea_idTarea", "Empleado_idEmpleado"]]
+    if acumulado is not None:
+        bloque = pd.concat([acumulado, bloque], ignore_index=True)
+    return bloque.drop_duplicates(["Proyecto_idProyecto", "Tarea_idTarea"], keep="first").reset_index(drop=True)
+
+def resolver_asignaciones(indice, pids, tids):
+    """
+    Resuelve (idEmpleado, idEquipo) para arreglos de proyecto/tarea en una sola
+    pasada sobre el índice. idEmpleado solo se llena cuando resolvió la tarea.
+    """
+    pids = pd.Series(pids).reset_index(drop=True)
+    tids = pd.Series(tids).reset_index(drop=True)
+    emp = pd.Series(np.nan, index=pids.index)
+    eq = pd.Series(np.nan, index=pids.index)
+
+    con_tarea = tids.notna() & (tids != 0)
+    if con_tarea.any() and not indice["por_tarea"].empty:
+        claves = pd.MultiIndex.from_arrays([pids[con_tarea], tids[con_tarea]])
+        encontrados = indice["por_tarea"].reindex(claves)
+        emp.loc[con_tarea] = encontrados["idEmpleado"].to_numpy()
+        eq.loc[con_tarea] = encontrados["idEquipo"].to_numpy()
+
+    # Relacionar proyecto y equipo (sin empleado)
+    sin_equipo = eq.isna()
+    eq.loc[sin_equipo] = pids[sin_equipo].map(indice["por_proyecto"])
+    return emp, eq
+
+def _diccionarios_asignacion(indice):
+    # Vista en dicts del índice para búsquedas O(1) de una sola clave
+    if "dict_tarea" not in indice:
+        por_tarea = indice["por_tarea"]
+        ids_emp = por_tarea["idEmpleado"].unique()
+        ids_eq = np.union1d(por_tarea["idEquipo"].unique(), indice["por_proyecto"].unique())
+        indice["dict_tarea"] = dict(zip(por_tarea.index, zip(por_tarea["idEmpleado"], por_tarea["idEquipo"])))
+        indice["dict_proyecto"] = indice["por_proyecto"].to_dict()
+        indice["filas_empleado"] = indice["empleado_by_id"].loc[ids_emp].to_dict("index") if len(ids_emp) else {}
+        indice["filas_equipo"] = indice["equipo_by_id"].loc[ids_eq].to_dict("index") if len(ids_eq) else {}
+    return indice
+
+def get_empleado_y_equipo(indice, pid, tid):
+    """
+    Misma respuesta que el get_empleado_y_equipo original (emp, eq) pero en O(1):
+    emp y eq son dicts con las columnas de empleado/equipo, o None.
+    """
+    indice = _diccionarios_asignacion(indice)
+    # Relación de tarea y proyecto
+    if tid and tid != 0:
+        par = indice["dict_tarea"].get((pid, tid))
+        if par is not None:
+            return indice["filas_empleado"][par[0]], indice["filas_equipo"][par[1]]
+
+    # Relacionar proyecto y equipo
+    eq = indice["dict_proyecto"].get(pid)
+    if eq is not None:
+        return None, indice["filas_equipo"][eq]
+    return None, None
+
+# =========================================================================
+# SECCIÓN 5: TRANSFORMACIÓN POR CONJUNTOS (DIMENSIONES Y HECHOS)
+# =========================================================================
+
+def _texto(serie):
+    # Igual que str(valor) en el ETL original (None -> "None")
+    return serie.map(str)
+
+# Coerción por columna completa con la misma semántica que safe_float/safe_int.
+# Las columnas ya tipadas por extraccion_oltp (float64/int64) se convierten de
+# una vez; en columnas object solo las celdas que pd.to_numeric no resuelve
+# (None, texto sucio) pasan por la función escalar.
+
+def _a_float(serie):
+    if pd.api.types.is_numeric_dtype(serie) and not isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+        return serie.astype("float64")
+    valores = pd.to_numeric(serie, errors="coerce").astype("float64")
+    fallas = valores.isna().to_numpy()
+    if fallas.any():
+        # float(nan) sigue siendo NaN y float(None) es 0.0: se decide celda por celda.
+        # astype(object) para que <NA> de Int64/Float64 también llegue a safe_float
+        # (map sobre esos tipos lo salta y quedaría NaN)
+        valores[fallas] = serie[fallas].astype(object).map(safe_float).astype("float64").to_numpy()
+    return valores
+
+# Solo los flotantes en [-2**63, 2**63) se truncan directo a int64; fuera de ese
+# rango astype da basura (INT64_MIN) y safe_int conserva el valor exacto
+LIMITE_INT64 = 2.0 ** 63
+
+def _en_rango_int64(valores):
+    return np.isfinite(valores) & (valores >= -LIMITE_INT64) & (valores < LIMITE_INT64)
+
+def _a_int(serie):
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_integer_dtype(serie):
+        if not serie.hasnans:
+            return serie.astype("int64")
+    if pd.api.types.is_float_dtype(serie) and not isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+        # int(x) trunca hacia cero; NaN e infinito fallan y quedan en 0
+        valores = serie.to_numpy()
+        directos = _en_rango_int64(valores)
+    else:
+        # object (o entero con nulos): los números se truncan, el resto con safe_int
+        # (int("3.5") falla aunque pd.to_numeric sí lo acepte)
+        valores = pd.to_numeric(serie, errors="coerce").astype("float64").to_numpy()
+        directos = _en_rango_int64(valores) & (serie.map(type) != str).to_numpy()
+    enteros = np.zeros(len(serie), dtype="int64")
+    enteros[directos] = np.trunc(valores[directos]).astype("int64")
+    if not directos.all():
+        resto = serie[~directos].astype(object).map(safe_int).tolist()
+        try:
+            enteros[~directos] = resto
+        except OverflowError:
+            # Algún entero no cabe en int64: la columna queda en object, como con safe_int
+            enteros = enteros.astype(object)
+            enteros[~directos] = resto
+    return pd.Series(enteros, index=serie.index)
+
+COERCION = {"int": _a_int, "float": _a_float}
+
+def coercionar(df, tabla):
+    """Aplica TIPOS_DW[tabla] a las columnas de df (cada una se convierte completa, una sola vez)."""
+    for col, tipo in TIPOS_DW.get(tabla, {}).items():
+        if col in df.columns:
+            df[col] = COERCION[tipo](df[col]).to_numpy()
+    return df
+
+def tiempo_por_proyecto(ids_proyecto, fechas):
+    """
+    Filas de dim_tiempo (idTiempo = idProyecto) para todos los proyectos de una
+    vez, con la semántica de descomponer_fecha: sin fecha, o con un texto que no
+    es AAAA-MM-DD, se usa la fecha de hoy. Los atributos del calendario
+    (strftime, trimestre, semana ISO...) se calculan una vez por fecha distinta.
+    """
+    fechas = pd.Series(fechas).reset_index(drop=True)
+    if pd.api.types.is_datetime64_any_dtype(fechas):
+        convertidas = fechas
+    else:
+        es_texto = (fechas.map(type) == str).to_numpy()
+        convertidas = pd.to_datetime(fechas.where(~es_texto), errors="coerce")
+        if es_texto.any():
+            convertidas[es_texto] = pd.to_datetime(fechas[es_texto], format="%Y-%m-%d", errors="coerce").to_numpy()
+    dias = convertidas.fillna(pd.Timestamp(dt.now())).dt.normalize()
+
+    unicas = pd.DatetimeIndex(dias.unique())
+    calendario = pd.DataFrame({
+        "fecha_completa": unicas.strftime("%Y-%m-%d"),
+        "anio": unicas.year.astype("int64"),
+        "trimestre": ((unicas.month - 1) // 3 + 1).astype("int64"),
+        "mes": unicas.month.astype("int64"),
+        "semana": unicas.isocalendar()["week"].astype("int64").to_numpy(),
+        "dia": unicas.day.astype("int64"),
+    }, index=unicas)
+    tiempo = calendario.reindex(dias.to_numpy()).reset_index(drop=True)
+    tiempo.insert(0, "idTiempo", np.asarray(ids_proyecto, dtype="int64"))
+    return tiempo[COLUMNAS_DW["dim_tiempo"]]
+
+def _indice_o_vacio(df_indexed):
+    return df_indexed.index if not df_indexed.empty else pd.Index([])
+
+def construir_tablas_dw(cliente_df, equipo_df, empleado_df, proyecto_df, tarea_df, asignacion_df, incidente_df,
+                        metricas=None, indice_asignacion=None):
+    """
+    Construye de una sola vez los DataFrames de todas las tablas del DW a partir
+    de los result sets de obtener_todo (ya filtrados). metricas es el DataFrame de
+    calcular_metricas_proyectos e indice_asignacion el de construir_indice_asignacion;
+    si no se pasan se calculan aquí. Regresa (tablas, omitidos):
+    tablas es un dict tabla -> DataFrame con las columnas de COLUMNAS_DW y
+    omitidos un DataFrame con idIncidente, Proyecto_idProyecto y motivo.
+    """
+    tablas = {nombre: pd.DataFrame(columns=cols) for nombre, cols in COLUMNAS_DW.items()}
+    omitidos = pd.DataFrame(columns=["idIncidente", "Proyecto_idProyecto", "motivo"])
+    if incidente_df.empty:
+        return tablas, omitidos
+
+    cliente_by_id = safe_index(cliente_df, "idCliente")
+    equipo_by_id = safe_index(equipo_df, "idEquipo")
+    empleado_by_id = safe_index(empleado_df, "idEmpleado")
+    proyecto_by_id = safe_index(proyecto_df, "idProyecto")
+    tarea_by_id = safe_index(tarea_df, "idTarea")
+
+    inc = incidente_df.reset_index(drop=True)
+    pid = inc["Proyecto_idProyecto"]
+
+    # VALIDACIONES (mismo orden que el ETL fila por fila)
+    motivo = pd.Series(None, index=inc.index, dtype=object)
+    existe_proy = pid.isin(_indice_o_vacio(proyecto_by_id))
+    motivo[~existe_proy] = "proyecto"
+
+    id_cliente = pid.map(proyecto_by_id["Cliente_idCliente"]) if not proyecto_by_id.empty else pd.Series(np.nan, index=inc.index)
+    existe_cli = id_cliente.isin(_indice_o_vacio(cliente_by_id))
+    motivo[motivo.isna() & ~existe_cli] = "cliente"
+
+    if indice_asignacion is None:
+        indice_asignacion = construir_indice_asignacion(asignacion_df, empleado_by_id, equipo_by_id)
+    id_empleado, id_equipo = resolver_asignaciones(indice_asignacion, pid, inc["idTarea"])
+    motivo[motivo.isna() & id_equipo.isna()] = "equipo"
+
+    validos = motivo.isna()
+    omitidos = pd.DataFrame({
+        "idIncidente": inc.loc[~validos, "idIncidente"],
+        "Proyecto_idProyecto": pid[~validos],
+        "motivo": motivo[~validos],
+    }).reset_index(drop=True)
+    if not validos.any():
+        return tablas, omitidos
+
+    val = inc[validos].assign(
+        _pid=pid[validos].astype(int),
+        _cli=id_cliente[validos].astype(int),
+        _emp=id_empleado[validos],
+        _eq=id_equipo[validos].astype(int),
+    )
+    val["_tarea"] = val["idTarea"].isin(_indice_o_vacio(tarea_by_id))
+
+    # Estado del proyecto
+    proy = proyecto_by_id.loc[val["_pid"].unique()]
+    estado_proy = proy["Estado"].map(lambda e: str(e).strip().upper())
+    id_estado = np.where(estado_proy == "CANCELADO", 3, 1)
+    proy = proy.assign(_estado=estado_proy, _idEstado=id_estado)
+
+    # Primer incidente de cada proyecto: define el equipo (INSERT IGNORE conserva el primero)
+    primero = val.drop_duplicates("_pid", keep="first").set_index("_pid")
+    proy = proy.assign(_eq=primero["_eq"].reindex(proy.index).to_numpy(), _cli=primero["_cli"].reindex(proy.index).to_numpy())
+
+    # --- dim_cliente ---
+    cli = cliente_by_id.loc[val["_cli"].unique()]
+    tablas["dim_cliente"] = coercionar(pd.DataFrame({
+        "idCliente": cli["idCliente"].astype(int).to_numpy(),
+        "nombre": _texto(cli["Nombre"]).to_numpy(),
+        "email": _texto(cli["Email"]).to_numpy(),
+        "telefono": _texto(cli["Telefono"]).to_numpy(),
+        "industria": _texto(cli["Industria"]).to_numpy(),
+        "metrica_base_roi": cli["MetricaClienteInicial"].to_numpy(),
+    }), "dim_cliente")
+
+    # --- dim_equipo ---
+    eq = equipo_by_id.loc[val["_eq"].unique()]
+    tablas["dim_equipo"] = coercionar(pd.DataFrame({
+        "idEquipo": eq["idEquipo"].astype(int).to_numpy(),
+        "nombre": _texto(eq["Nombre"]).to_numpy(),
+        "activo": eq["Activo"].to_numpy(),
+    }), "dim_equipo")
+
+    # --- dim_empleado (solo cuando la asignación de la tarea resolvió empleado) ---
+    ids_emp = val["_emp"].dropna().unique()
+    emp = empleado_by_id.loc[ids_emp] if len(ids_emp) else empleado_by_id.iloc[0:0]
+    if not emp.empty:
+        tablas["dim_empleado"] = coercionar(pd.DataFrame({
+            "idEmpleado": emp["idEmpleado"].astype(int).to_numpy(),
+            "nombre": _texto(emp["Nombre"]).to_numpy(),
+            "email": _texto(emp["Email"]).to_numpy(),
+            "salario": emp["Salario"].to_numpy(),
+            "salarioxhora": emp["SalarioxHora"].to_numpy(),
+            "idEquipo": emp["Equipo_idEquipo"].astype(int).to_numpy(),
+        }), "dim_empleado")
+
+    # --- dim_estado_proyecto ---
+    estados = proy.drop_duplicates("_idEstado", keep="first")
+    tablas["dim_estado_proyecto"] = pd.DataFrame({
+        "idEstado": estados["_idEstado"].astype(int).to_numpy(),
+        "estado": estados["_estado"].to_numpy(),
+    })
+
+    # --- dim_proyecto ---
+    tablas["dim_proyecto"] = coercionar(pd.DataFrame({
+        "idProyecto": proy["idProyecto"].astype(int).to_numpy(),
+        "nombre_proyecto": _texto(proy["Nombre"]).to_numpy(),
+        "tipo_proyecto": _texto(proy["Tipo"]).to_numpy(),
+        "descripcion": _texto(proy["Descripcion"]).to_numpy(),
+        "presupuesto": proy["Presupuesto"].to_numpy(),
+        "costo_real": proy["Costo_real"].to_numpy(),
+        "metrica_final_roi": proy["MetricaClienteFinal"].to_numpy(),
+        "certificacion_seguridad": proy["CertificacionSeguridad"].to_numpy(),
+        "fecha_inicio": proy["Fecha_inicio"].to_numpy(),
+        "fecha_fin_estimada": proy["Fecha_fin_estimada"].to_numpy(),
+        "fecha_fin_real": proy["Fecha_fin_real"].to_numpy(),
+        "idCliente": proy["Cliente_idCliente"].to_numpy(),
+        "idEquipo": proy["_eq"].astype(int).to_numpy(),
+        "idEstado": proy["_idEstado"].astype(int).to_numpy(),
+    }), "dim_proyecto")
+
+    # --- dim_tarea (la tarea 0 representa "sin tarea", como en el ETL original) ---
+    tareas_inc = val.drop_duplicates("idTarea", keep="first")
+    con_tarea = tareas_inc[tareas_inc["_tarea"]]
+    tar = tarea_by_id.loc[con_tarea["idTarea"]] if not con_tarea.empty else None
+    filas_tarea = []
+    if tar is not None:
+        filas_tarea.append(coercionar(pd.DataFrame({
+            "idTarea": tar["idTarea"].astype(int).to_numpy(),
+            "nombre": _texto(tar["Titulo"]).to_numpy(),
+            "descripcion": _texto(tar["Descripcion"]).to_numpy(),
+            "fecha_creacion": tar["Fecha_creacion"].to_numpy(),
+            "fecha_fin_estimada": tar["Fecha_fin_estimada"].to_numpy(),
+            "fecha_fin_real": tar["Fecha_fin_real"].to_numpy(),
+            "prioridad": tar["Prioridad"].map(lambda p: MAPA_PRIORIDAD.get(str(p).strip().upper(), 0)).to_numpy(),
+            "es_automatizacion": tar["EsAutomatizacion"].to_numpy(),
+            "es_reutilizado": tar["EsReutilizado"].to_numpy(),
+            "idProyecto": con_tarea["_pid"].to_numpy(),
+        }), "dim_tarea"))
+    sin_tarea = val[~val["_tarea"]]
+    if not sin_tarea.empty:
+        filas_tarea.append(pd.DataFrame({
+            "idTarea": [0], "nombre": [""], "descripcion": [""],
+            "fecha_creacion": [None], "fecha_fin_estimada": [None], "fecha_fin_real": [None],
+            "prioridad": [None], "es_automatizacion": [0], "es_reutilizado": [0],
+            "idProyecto": [int(sin_tarea["_pid"].iloc[0])],
+        }))
+    if filas_tarea:
+        tablas["dim_tarea"] = pd.concat(filas_tarea, ignore_index=True).drop_duplicates("idTarea", keep="first")
+
+    # --- dim_tiempo (fecha de cierre del proyecto, idTiempo = idProyecto) ---
+    tablas["dim_tiempo"] = tiempo_por_proyecto(proy["idProyecto"].astype(int), proy["Fecha_fin_real"])
+
+    # --- dim_calidad (un solo registro, gana el primer incidente) ---
+    tablas["dim_calidad"] = pd.DataFrame({
+        "idCalidad": [1],
+        "severidad_defecto": [str(val["Severidad"].iloc[0])],
+        "tipo_incidente": ["INCIDENTE"],
+        "certificacion_seguridad": [0],
+    })
+
+    # --- hecho_proyecto ---
+    if metricas is None:
+        metricas = calcular_metricas_proyectos(proyecto_df, tarea_df, asignacion_df, incidente_df)
+    mets = metricas.reindex(proy.index)
+    for col, vacio in METRICAS_VACIAS.items():
+        mets[col] = mets[col].fillna(vacio)
+    hecho = coercionar(pd.DataFrame({
+        "idFact": proy["idProyecto"].astype(int).to_numpy(),
+        "idProyecto": proy["idProyecto"].astype(int).to_numpy(),
+        "idCliente": proy["_cli"].astype(int).to_numpy(),
+        "idEquipo": proy["_eq"].astype(int).to_numpy(),
+        "idTiempo": proy["idProyecto"].astype(int).to_numpy(),
+        "idEstado": proy["_idEstado"].astype(int).to_numpy(),
+        "presupuesto": proy["Presupuesto"].to_numpy(),
+        "costo_real": proy["Costo_real"].to_numpy(),
+        "desviacion_presupuestal": 0.0,
+        "metrica_base_roi": proy["_cli"].map(cliente_by_id["MetricaClienteInicial"]).to_numpy(),
+        "metrica_final_roi": proy["MetricaClienteFinal"].to_numpy(),
+        "tareas_automatizacion_total": mets["tareas_auto"].astype(int).to_numpy(),
+        "tareas_reutilizadas_total": mets["tareas_reutil"].astype(int).to_numpy(),
+        "defectos_reportados": mets["defectos"].astype(int).to_numpy(),
+        "costo_defecto": mets["costo_defecto"].astype(float).to_numpy(),
+        "avance_proyecto": mets["avance"].astype(float).to_numpy(),
+        "horas_estimadas_total": mets["horas_est"].astype(float).to_numpy(),
+        "horas_reales_total": mets["horas_real"].astype(float).to_numpy(),
+    }), "hecho_proyecto")
+    hecho["desviacion_presupuestal"] = hecho["presupuesto"] - hecho["costo_real"]
+    tablas["hecho_proyecto"] = hecho
+
+    # --- hecho_incidente ---
+    tablas["hecho_incidente"] = coercionar(pd.DataFrame({
+        "idIncidente": val["idIncidente"].astype(int).to_numpy(),
+        "idProyecto": val["_pid"].to_numpy(),
+        "idTarea": np.where(val["_tarea"], val["idTarea"].fillna(0), 0).astype(int),
+        "idCalidad": 1,
+        "fecha_reporte": val["Fecha_reporte"].to_numpy(),
+        "severidad": _texto(val["Severidad"]).to_numpy(),
+        "estado": _texto(val["Estado"]).to_numpy(),
+        "costo_correccion": val["CostoCorreccion"].to_numpy(),
+    }), "hecho_incidente").drop_duplicates("idIncidente", keep="first")
+
+    return tablas, omitidos
+
+# =========================================================================
+# SECCIÓN 6: CARGA MASIVA (INSERTS MULTI-FILA POR LOTES)
+# =========================================================================
+
+# Tablas cuyas filas cambian los resúmenes de su proyecto (ver SECCIÓN 9)
+TABLAS_CON_PROYECTO = ("dim_proyecto", "dim_tarea", "hecho_proyecto", "hecho_incidente")
+
+SENTENCIAS_INSERT = {
+    "mysql": ("INSERT IGNORE INTO {tabla} ({columnas}) VALUES ({marcas})", "%s"),
+    "sqlite": ("INSERT OR IGNORE INTO {tabla} ({columnas}) VALUES ({marcas})", "?"),
+}
+
+# Para las tablas que una carga incremental debe recalcular (la PK es la primera
+# columna): plantilla y forma de cada asignación del UPDATE
+SENTENCIAS_UPSERT = {
+    "mysql": (
+        "INSERT INTO {tabla} ({columnas}) VALUES ({marcas}) ON DUPLICATE KEY UPDATE {actualizar}",
+        "{col} = VALUES({col})",
+    ),
+    "sqlite": (
+        "INSERT INTO {tabla} ({columnas}) VALUES ({marcas}) ON CONFLICT ({llave}) DO UPDATE SET {actualizar}",
+        "{col} = excluded.{col}",
+    ),
+}
+
+# Columnas que el upsert no sobrescribe en una fila existente: las recalcula
+# conciliar_incremental, que necesita ver su valor anterior
+COLUMNAS_CONSERVADAS = {"dim_tarea": ("idProyecto",)}
+
+def _a_python(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return None if pd.isna(valor) else valor.to_pydatetime()
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and np.isnan(valor):
+        return None
+    if valor is pd.NaT:
+        return None
+    return valor
+
+def filas_para_insert(df):
+    """Convierte un DataFrame en tuplas de tipos nativos (NaN/NaT -> None) para el conector."""
+    columnas = []
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            valores = pd.DatetimeIndex(serie).to_pydatetime()
+            valores[serie.isna().to_numpy()] = None
+            valores = valores.tolist()
+        else:
+            valores = [_a_python(v) for v in serie.astype(object).tolist()]
+        columnas.append(valores)
+    return list(zip(*columnas))
+
+def sentencia_insert(tabla, dialecto="mysql", upsert=False):
+    plantilla, marca = SENTENCIAS_INSERT[dialecto]
+    asignacion = ""
+    if upsert:
+        plantilla, asignacion = SENTENCIAS_UPSERT[dialecto]
+    columnas = COLUMNAS_DW[tabla]
+    conservadas = COLUMNAS_CONSERVADAS.get(tabla, ())
+    return plantilla.format(
+        tabla=tabla, columnas=", ".join(columnas), marcas=", ".join([marca] * len(columnas)), llave=columnas[0],
+        actualizar=", ".join(asignacion.format(col=c) for c in columnas[1:] if c not in conservadas)
+    )
+
+def cargar_tablas_dw(cursor, tablas, tam_lote=5000, dialecto="mysql", actualizar=(), registro=None,
+                     proyectos_tocados=None):
+    """
+    Inserta cada tabla con executemany en lotes de tam_lote filas. mysql.connector
+    reescribe cada lote como un solo INSERT multi-fila. Las tablas listadas en
+    actualizar se escriben con upsert en vez de INSERT IGNORE. No hace commit:
+    el llamador controla la transacción. Regresa un dict tabla -> filas enviadas.
+    Con registro se mide la etapa carga.<tabla>. Si se pasa un set en
+    proyectos_tocados se le agregan los idProyecto enviados (para actualizar_resumenes).
+    """
+    enviados = {}
+    for tabla in COLUMNAS_DW:
+        df = tablas.get(tabla)
+        if df is None or df.empty:
+            enviados[tabla] = 0
+            continue
+        if proyectos_tocados is not None and tabla in TABLAS_CON_PROYECTO:
+            proyectos_tocados.update(int(p) for p in df["idProyecto"].dropna().unique())
+        with etapa(registro, f"carga.{tabla}"):
+            sql = sentencia_insert(tabla, dialecto, upsert=tabla in actualizar)
+            filas = filas_para_insert(df[COLUMNAS_DW[tabla]])
+            for inicio in range(0, len(filas), tam_lote):
+                cursor.executemany(sql, filas[inicio:inicio + tam_lote])
+        contar(registro, f"carga.{tabla}", len(filas))
+        enviados[tabla] = len(filas)
+    return enviados
+
+# =========================================================================
+# SECCIÓN 7: CARGA INCREMENTAL (WATERMARK)
+# =========================================================================
+
+# En modo incremental estas tablas se reescriben para los proyectos tocados;
+# el resto conserva la semántica de INSERT IGNORE. dim_tarea y dim_calidad
+# dependen del primer incidente (de todo el DW) y se ajustan después con
+# conciliar_incremental.
+TABLAS_RECALCULADAS = ("dim_proyecto", "dim_tarea", "dim_tiempo", "hecho_proyecto", "hecho_incidente")
+
+# preparar_delta filtra Fecha_modificacion >= ultima_modificacion - MARGEN_WATERMARK.
+# NOW() tiene resolución de un segundo y una transacción puede sellar la fila
+# antes de NOW() y confirmar después de abrir la foto: el margen vuelve a pedir
+# esas filas. Reprocesar un proyecto ya cargado no cambia el DW (upsert).
+MARGEN_WATERMARK = timedelta(minutes=5)
+
+WATERMARK_INICIAL = {
+    "ultimo_idIncidente": 0,
+    "ultimo_idProyecto": 0,
+    "ultima_modificacion": dt(1970, 1, 1),
+}
+
+CONSULTAS_WATERMARK = {
+    "mysql": {
+        "leer": "SELECT ultimo_idIncidente, ultimo_idProyecto, ultima_modificacion FROM etl_watermark WHERE proceso = %s",
+        "guardar": (
+            "INSERT INTO etl_watermark (proceso, ultimo_idIncidente, ultimo_idProyecto, ultima_modificacion, fecha_ejecucion) "
+            "VALUES (%s, %s, %s, %s, NOW()) ON DUPLICATE KEY UPDATE "
+            "ultimo_idIncidente = VALUES(ultimo_idIncidente), ultimo_idProyecto = VALUES(ultimo_idProyecto), "
+            "ultima_modificacion = VALUES(ultima_modificacion), fecha_ejecucion = NOW()"
+        ),
+    },
+    "sqlite": {
+        "leer": "SELECT ultimo_idIncidente, ultimo_idProyecto, ultima_modificacion FROM etl_watermark WHERE proceso = ?",
+        "guardar": (
+            "INSERT OR REPLACE INTO etl_watermark (proceso, ultimo_idIncidente, ultimo_idProyecto, ultima_modificacion, fecha_ejecucion) "
+            "VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)"
+        ),
+    },
+}
+
+def leer_watermark(cursor, proceso="etl_gestion", dialecto="mysql"):
+    """Regresa el último watermark guardado en etl_watermark o WATERMARK_INICIAL."""
+    cursor.execute(CONSULTAS_WATERMARK[dialecto]["leer"], (proceso,))
+    fila = cursor.fetchone()
+    if not fila:
+        return dict(WATERMARK_INICIAL)
+    if isinstance(fila, dict):
+        fila = (fila["ultimo_idIncidente"], fila["ultimo_idProyecto"], fila["ultima_modificacion"])
+    ultima = fila[2]
+    if isinstance(ultima, str):
+        ultima = dt.fromisoformat(ultima)
+    return {"ultimo_idIncidente": int(fila[0]), "ultimo_idProyecto": int(fila[1]), "ultima_modificacion": ultima}
+
+def avanzar_watermark(previo, incidente_df, proyecto_df, inicio_extraccion):
+    """
+    Calcula el watermark siguiente. Se usa el máximo id visto en la extracción
+    (antes de filtrar por estado) y la hora del servidor OLTP al iniciar la
+    extracción, de modo que lo modificado durante la corrida entra en la siguiente
+    (con MARGEN_WATERMARK de traslape, ver argumentos_incremental).
+    """
+    def _maximo(df, col, actual):
+        if df.empty or col not in df.columns:
+            return actual
+        return max(actual, safe_int(pd.to_numeric(df[col], errors="coerce").max()))
+
+    return {
+        "ultimo_idIncidente": _maximo(incidente_df, "idIncidente", previo["ultimo_idIncidente"]),
+        "ultimo_idProyecto": _maximo(proyecto_df, "idProyecto", previo["ultimo_idProyecto"]),
+        "ultima_modificacion": inicio_extraccion,
+    }
+
+def guardar_watermark(cursor, watermark, proceso="etl_gestion", dialecto="mysql"):
+    """Guarda el watermark; debe ir en la misma transacción que la carga."""
+    cursor.execute(CONSULTAS_WATERMARK[dialecto]["guardar"], (
+        proceso, int(watermark["ultimo_idIncidente"]), int(watermark["ultimo_idProyecto"]),
+        watermark["ultima_modificacion"],
+    ))
+
+def argumentos_incremental(watermark):
+    """Parámetros de preparar_delta/obtener_todo_incremental en el orden del procedimiento (ya con el margen)."""
+    return [
+        int(watermark["ultimo_idIncidente"]),
+        int(watermark["ultimo_idProyecto"]),
+        watermark["ultima_modificacion"] - MARGEN_WATERMARK,
+    ]
+
+# En la carga completa la fila de dim_tarea toma el proyecto del primer incidente
+# (menor idIncidente) que usa la tarea, y dim_calidad la severidad del primer
+# incidente. En incremental solo llegan los incidentes de los proyectos tocados,
+# así que ambos se recalculan sobre hecho_incidente ya cargado.
+CONSULTAS_CONCILIACION = {
+    "proyectos_tarea": """
+SELECT DISTINCT idProyecto FROM dim_tarea
+WHERE idTarea IN (SELECT idTarea FROM hecho_incidente WHERE idProyecto IN ({marcas}))
+""",
+    "reasignar_tareas": """
+UPDATE dim_tarea SET idProyecto = COALESCE((
+    SELECT hi.idProyecto FROM hecho_incidente hi
+    WHERE hi.idTarea = dim_tarea.idTarea ORDER BY hi.idIncidente LIMIT 1
+), idProyecto)
+WHERE idTarea IN (SELECT idTarea FROM hecho_incidente WHERE idProyecto IN ({marcas}))
+""",
+    "calidad": """
+UPDATE dim_calidad SET severidad_defecto = COALESCE((
+    SELECT severidad FROM hecho_incidente ORDER BY idIncidente LIMIT 1
+), severidad_defecto)
+WHERE idCalidad = 1
+""",
+}
+
+def conciliar_incremental(cursor, proyectos_tocados, dialecto="mysql"):
+    """
+    Después de una carga incremental (actualizar=TABLAS_RECALCULADAS) deja
+    dim_tarea.idProyecto (que el upsert conserva, ver COLUMNAS_CONSERVADAS) y
+    dim_calidad como los dejaría una carga completa. Las
+    tareas que cambian de proyecto afectan resumen_proyecto del proyecto anterior
+    y del nuevo: ambos se agregan a proyectos_tocados. No hace commit; va antes de
+    actualizar_resumenes. Regresa proyectos_tocados.
+    """
+    ids = sorted(int(p) for p in proyectos_tocados)
+    for inicio in range(0, len(ids), TAM_LOTE_RESUMEN):
+        lote = ids[inicio:inicio + TAM_LOTE_RESUMEN]
+        marcas = ", ".join([MARCAS_DIALECTO[dialecto]] * len(lote))
+        cursor.execute(CONSULTAS_CONCILIACION["proyectos_tarea"].format(marcas=marcas), lote)
+        anteriores = [fila[0] for fila in cursor.fetchall()]
+        cursor.execute(CONSULTAS_CONCILIACION["reasignar_tareas"].format(marcas=marcas), lote)
+        cursor.execute(CONSULTAS_CONCILIACION["proyectos_tarea"].format(marcas=marcas), lote)
+        proyectos_tocados.update(int(p) for p in anteriores + [fila[0] for fila in cursor.fetchall()] if p is not None)
+    cursor.execute(CONSULTAS_CONCILIACION["calidad"])
+    return proyectos_tocados
+
+# =========================================================================
+# SECCIÓN 8: TRANSFORMACIÓN Y CARGA POR BLOQUES DE INCIDENTES
+# =========================================================================
+
+def cargar_incidentes_por_bloques(cursor, bloques_incidente, cliente_df, equipo_df, empleado_df, proyecto_df, tarea_df,
+                                  metricas, indice_asignacion, tam_lote=5000, dialecto="mysql", actualizar=(),
+                                  registro=None, proyectos_tocados=None):
+    """
+    Versión en streaming de construir_tablas_dw + cargar_tablas_dw: cada bloque de
+    incidentes se transforma y se envía al DW antes de leer el siguiente, así la
+    memoria depende del tamaño del bloque. metricas e indice_asignacion deben
+    calcularse antes sobre todas las asignaciones/incidentes (ver
+    sumar_parciales y acumular_primeras_asignaciones).
+    Un proyecto solo se escribe con el primer bloque donde aparece, igual que el
+    primer incidente define su equipo en la carga completa; el resto de tablas ya
+    respeta el primero con INSERT IGNORE. No hace commit. Con registro se miden
+    transformacion.lookups y carga.<tabla>, y se cuentan los omitidos por motivo.
+    proyectos_tocados funciona igual que en cargar_tablas_dw.
+    Regresa (enviados por tabla, omitidos).
+    """
+    enviados = dict.fromkeys(COLUMNAS_DW, 0)
+    omitidos = []
+    proyectos_cargados = pd.Index([])
+    for bloque in bloques_incidente:
+        if bloque.empty:
+            continue
+        with etapa(registro, "transformacion.lookups"):
+            tablas, omitidos_bloque = construir_tablas_dw(
+                cliente_df, equipo_df, empleado_df, proyecto_df, tarea_df, None, bloque,
+                metricas=metricas, indice_asignacion=indice_asignacion
+            )
+            for tabla, col in (("dim_proyecto", "idProyecto"), ("dim_tiempo", "idTiempo"), ("hecho_proyecto", "idProyecto")):
+                tablas[tabla] = tablas[tabla][~tablas[tabla][col].isin(proyectos_cargados)]
+            proyectos_cargados = proyectos_cargados.union(pd.Index(tablas["dim_proyecto"]["idProyecto"]))
+        contar(registro, "transformacion.incidentes", len(bloque))
+
+        for tabla, n in cargar_tablas_dw(cursor, tablas, tam_lote, dialecto, actualizar, registro,
+                                         proyectos_tocados).items():
+            enviados[tabla] += n
+        if not omitidos_bloque.empty:
+            omitidos.append(omitidos_bloque)
+            if registro is not None:
+                registro.registrar_omitidos(omitidos_bloque, MOTIVOS_OMISION)
+
+    if not omitidos:
+        return enviados, pd.DataFrame(columns=["idIncidente", "Proyecto_idProyecto", "motivo"])
+    return enviados, pd.concat(omitidos, ignore_index=True)
+
+# =========================================================================
+# SECCIÓN 9: TABLAS RESUMEN PARA EL DASHBOARD
+# =========================================================================
+# El Balanced Scorecard solo necesita conteos: por año/estado/industria
+# (presupuesto y cancelaciones) y por proyecto (tareas, automatizadas e
+# incidentes). El loader los mantiene en resumen_anio y resumen_proyecto, en la
+# misma transacción que la carga, y el exportador baja esos agregados en lugar
+# de todas las filas de dim_tarea y hecho_incidente.
+#   resumen_proyecto: se recalcula solo para los proyectos tocados en la carga
+#                     (usa los índices por idProyecto de dim_tarea y hecho_incidente)
+#   resumen_anio:     se recalcula completo; es una pasada por dim_proyecto y
+#                     así un proyecto que cambia de año no deja conteos viejos
+# anio = 0 e industria = '' representan "sin año de cierre" / "sin industria".
+
+# Proyectos por DELETE/INSERT ... SELECT (el IN lleva un parámetro por id)
+TAM_LOTE_RESUMEN = 500
+
+CONSULTAS_RESUMEN = {
+    "borrar_proyectos": "DELETE FROM resumen_proyecto WHERE idProyecto IN ({marcas})",
+    "insertar_proyectos": """
+INSERT INTO resumen_proyecto (idProyecto, tareas_total, tareas_automatizadas, incidentes)
+SELECT ids.idProyecto, COALESCE(t.tareas_total, 0), COALESCE(t.tareas_automatizadas, 0), COALESCE(i.incidentes, 0)
+FROM (
+    SELECT idProyecto FROM dim_tarea WHERE idProyecto IN ({marcas})
+    UNION
+    SELECT idProyecto FROM hecho_incidente WHERE idProyecto IN ({marcas})
+) ids
+LEFT JOIN (
+    SELECT idProyecto, COUNT(*) AS tareas_total,
+           SUM(CASE WHEN es_automatizacion = 1 THEN 1 ELSE 0 END) AS tareas_automatizadas
+    FROM dim_tarea WHERE idProyecto IN ({marcas}) GROUP BY idProyecto
+) t ON t.idProyecto = ids.idProyecto
+LEFT JOIN (
+    SELECT idProyecto, COUNT(*) AS incidentes
+    FROM hecho_incidente WHERE idProyecto IN ({marcas}) GROUP BY idProyecto
+) i ON i.idProyecto = ids.idProyecto
+""",
+    "borrar_anios": "DELETE FROM resumen_anio",
+    # Mismos joins que la consulta "proyectos" del exportador (datos_dashboard.CONSULTAS_EXPORTACION)
+    "insertar_anios": """
+INSERT INTO resumen_anio (anio, estado, industria, proyectos, dentro_presupuesto)
+SELECT COALESCE(dt.anio, 0), des.estado, COALESCE(dc.industria, ''), COUNT(*),
+       SUM(CASE WHEN dp.costo_real <= dp.presupuesto THEN 1 ELSE 0 END)
+FROM dim_proyecto dp
+INNER JOIN dim_estado_proyecto des ON dp.idEstado = des.idEstado
+INNER JOIN dim_cliente dc ON dp.idCliente = dc.idCliente
+LEFT JOIN dim_tiempo dt ON dp.idProyecto = dt.idTiempo
+GROUP BY COALESCE(dt.anio, 0), des.estado, COALESCE(dc.industria, '')
+""",
+}
+
+MARCAS_DIALECTO = {"mysql": "%s", "sqlite": "?"}
+
+def actualizar_resumenes(cursor, proyectos_tocados=None, dialecto="mysql"):
+    """
+    Recalcula resumen_proyecto para proyectos_tocados (todos los del DW si es
+    None) y resumen_anio completo. No hace commit: va en la transacción de la
+    carga, antes de guardar el watermark. Regresa el número de proyectos recalculados.
+    """
+    if proyectos_tocados is None:
+        cursor.execute("SELECT idProyecto FROM dim_tarea UNION SELECT idProyecto FROM hecho_incidente")
+        proyectos_tocados = [fila[0] for fila in cursor.fetchall() if fila[0] is not None]
+    ids = sorted(int(p) for p in proyectos_tocados)
+    for inicio in range(0, len(ids), TAM_LOTE_RESUMEN):
+        lote = ids[inicio:inicio + TAM_LOTE_RESUMEN]
+        marcas = ", ".join([MARCAS_DIALECTO[dialecto]] * len(lote))
+        cursor.execute(CONSULTAS_RESUMEN["borrar_proyectos"].format(marcas=marcas), lote)
+        cursor.execute(CONSULTAS_RESUMEN["insertar_proyectos"].format(marcas=marcas), lote * 4)
+    cursor.execute(CONSULTAS_RESUMEN["borrar_anios"])
+    cursor.execute(CONSULTAS_RESUMEN["insertar_anios"])
+    return len(ids)
@@ -0,0 +1,200 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from registro_etl import etapa, contar
+
+# =========================================================================
+# EXTRACCIÓN DEL OLTP POR BLOQUES (STREAMING)
+# =========================================================================
+# En lugar de callproc("obtener_todo") + fetchall() (que trae cada result set
+# completo a memoria), cada tabla se lee con su propio SELECT sobre un cursor
+# sin buffer y fetchmany(tam_bloque). Cada bloque llega como un DataFrame ya
+# tipado, así que la memoria máxima depende del bloque y no del tamaño de
+# incidente o asignacion_tarea.
+#
+# Nota: un cursor sin buffer de mysql.connector ocupa la conexión hasta leer la
+# última fila; los bloques se deben consumir antes de ejecutar otra consulta
+# en la misma conexión.
+
+TAM_BLOQUE = 50000
+
+# Conexiones simultáneas al OLTP en extraer_en_paralelo
+MAX_CONCURRENCIA = 4
+
+# Consultas que no dependen de preparar_delta (iguales en ambos modos): se pueden
+# leer en otras conexiones, fuera de la transacción con foto consistente
+CATALOGOS = ["cliente", "equipo", "empleado", "estadisticas_proyecto"]
+
+# Mismas columnas que los result sets de obtener_todo, en el mismo orden.
+# Las tablas grandes se ordenan por su PK para que "la primera fila" sea la
+# misma en cada corrida (el ETL conserva la primera asignación/incidente).
+CONSULTAS_OLTP = {
+    "completa": {
+        "cliente": "SELECT idCliente, Nombre, Email, Telefono, Industria, MetricaClienteInicial FROM cliente",
+        "equipo": "SELECT idEquipo, Nombre, Activo FROM equipo",
+        "empleado": "SELECT idEmpleado, Nombre, Email, Salario, SalarioxHora, Equipo_idEquipo FROM empleado",
+        "estadisticas_proyecto": "SELECT idEstadistica, Fecha, Tareas_completadas, Tareas_pendientes, Horas_trabajadas, Costo_diario FROM estadisticas_proyecto",
+        "proyecto": (
+            "SELECT idProyecto, Nombre, Descripcion, Tipo, Fecha_inicio, Fecha_fin_estimada, Fecha_fin_real, Estado, Presupuesto, "
+            "Costo_real, Cliente_idCliente, Estadisticas_Proyecto_idEstadistica, MetricaClienteFinal, CertificacionSeguridad "
+            "FROM proyecto ORDER BY idProyecto"
+        ),
+        "tarea": (
+            "SELECT idTarea, Titulo, Descripcion, Fecha_creacion, Fecha_fin_estimada, Fecha_fin_real, Estado, Prioridad, "
+            "Horas_estimadas, EsAutomatizacion, EsReutilizado FROM tarea ORDER BY idTarea"
+        ),
+        "asignacion_tarea": (
+            "SELECT idAsignacion, Tarea_idTarea, Empleado_idEmpleado, Fecha_asignacion, Horas_estimadas, Horas_reales, "
+            "Proyecto_idProyecto FROM asignacion_tarea ORDER BY idAsignacion"
+        ),
+        "incidente": (
+            "SELECT idIncidente, Proyecto_idProyecto, Fecha_reporte, Severidad, Estado, idTarea, CostoCorreccion "
+            "FROM incidente ORDER BY idIncidente"
+        ),
+        # Solo lo necesario para las métricas por proyecto y el watermark
+        "costos_incidente": "SELECT idIncidente, Proyecto_idProyecto, CostoCorreccion FROM incidente ORDER BY idIncidente",
+    },
+    # Requieren CALL preparar_delta(...) antes, en la misma conexión (tablas temporales)
+    "incremental": {
+        "cliente": "SELECT idCliente, Nombre, Email, Telefono, Industria, MetricaClienteInicial FROM cliente",
+        "equipo": "SELECT idEquipo, Nombre, Activo FROM equipo",
+        "empleado": "SELECT idEmpleado, Nombre, Email, Salario, SalarioxHora, Equipo_idEquipo FROM empleado",
+        "estadisticas_proyecto": "SELECT idEstadistica, Fecha, Tareas_completadas, Tareas_pendientes, Horas_trabajadas, Costo_diario FROM estadisticas_proyecto",
+        "proyecto": (
+            "SELECT p.idProyecto, p.Nombre, p.Descripcion, p.Tipo, p.Fecha_inicio, p.Fecha_fin_estimada, p.Fecha_fin_real, p.Estado, "
+            "p.Presupuesto, p.Costo_real, p.Cliente_idCliente, p.Estadisticas_Proyecto_idEstadistica, p.MetricaClienteFinal, "
+            "p.CertificacionSeguridad FROM proyecto p JOIN tmp_proyectos_delta d ON d.idProyecto = p.idProyecto ORDER BY p.idProyecto"
+        ),
+        "tarea": (
+            "SELECT t.idTarea, t.Titulo, t.Descripcion, t.Fecha_creacion, t.Fecha_fin_estimada, t.Fecha_fin_real, t.Estado, "
+            "t.Prioridad, t.Horas_estimadas, t.EsAutomatizacion, t.EsReutilizado "
+            "FROM tarea t JOIN tmp_tareas_delta d ON d.idTarea = t.idTarea ORDER BY t.idTarea"
+        ),
+        "asignacion_tarea": (
+            "SELECT a.idAsignacion, a.Tarea_idTarea, a.Empleado_idEmpleado, a.Fecha_asignacion, a.Horas_estimadas, a.Horas_reales, "
+            "a.Proyecto_idProyecto FROM asignacion_tarea a JOIN tmp_proyectos_delta d ON d.idProyecto = a.Proyecto_idProyecto "
+            "ORDER BY a.idAsignacion"
+        ),
+        "incidente": (
+            "SELECT i.idIncidente, i.Proyecto_idProyecto, i.Fecha_reporte, i.Severidad, i.Estado, i.idTarea, i.CostoCorreccion "
+            "FROM incidente i JOIN tmp_proyectos_delta d ON d.idProyecto = i.Proyecto_idProyecto ORDER BY i.idIncidente"
+        ),
+        "costos_incidente": (
+            "SELECT i.idIncidente, i.Proyecto_idProyecto, i.CostoCorreccion "
+            "FROM incidente i JOIN tmp_proyectos_delta d ON d.idProyecto = i.Proyecto_idProyecto ORDER BY i.idIncidente"
+        ),
+    },
+}
+
+# Tipos de cada columna según Version1_Gestion_Fase_1_y_2.sql. Las columnas que
+# aceptan NULL quedan en float64 (NaN), igual que las deja pandas con fetchall;
+# los ENUM se guardan como category y las fechas como datetime64.
+TIPOS_OLTP = {
+    "cliente": {"idCliente": "int64", "MetricaClienteInicial": "float64"},
+    "equipo": {"idEquipo": "int64"},
+    "empleado": {"idEmpleado": "int64", "Salario": "float64", "SalarioxHora": "float64", "Equipo_idEquipo": "float64"},
+    "estadisticas_proyecto": {"idEstadistica": "int64", "Fecha": "fecha"},
+    "proyecto": {
+        "idProyecto": "int64", "Fecha_inicio": "fecha", "Fecha_fin_estimada": "fecha", "Fecha_fin_real": "fecha",
+        "Estado": "category", "Presupuesto": "float64", "Costo_real": "float64", "Cliente_idCliente": "int64",
+        "MetricaClienteFinal": "float64",
+    },
+    "tarea": {
+        "idTarea": "int64", "Fecha_creacion": "fecha", "Fecha_fin_estimada": "fecha", "Fecha_fin_real": "fecha",
+        "Estado": "category", "Prioridad": "category", "Horas_estimadas": "float64",
+        "EsAutomatizacion": "float64", "EsReutilizado": "float64",
+    },
+    "asignacion_tarea": {
+        "idAsignacion": "int64", "Tarea_idTarea": "int64", "Empleado_idEmpleado": "int64", "Fecha_asignacion": "fecha",
+        "Horas_estimadas": "float64", "Horas_reales": "float64", "Proyecto_idProyecto": "int64",
+    },
+    "incidente": {
+        "idIncidente": "int64", "Proyecto_idProyecto": "int64", "Fecha_reporte": "fecha", "Severidad": "category",
+        "Estado": "category", "idTarea": "float64", "CostoCorreccion": "float64",
+    },
+    "costos_incidente": {"idIncidente": "int64", "Proyecto_idProyecto": "int64", "CostoCorreccion": "float64"},
+}
+
+def tipar_bloque(df, tipos):
+    """Convierte las columnas de un bloque a los tipos de TIPOS_OLTP (Decimal -> float, fechas -> datetime64)."""
+    for col, tipo in (tipos or {}).items():
+        if col not in df.columns:
+            continue
+        if tipo == "fecha":
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif tipo == "category":
+            df[col] = df[col].astype("category")
+        elif tipo == "float64":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        else:
+            df[col] = df[col].astype(tipo)
+    return df
+
+def leer_por_bloques(conn, consulta, tam_bloque=TAM_BLOQUE, tipos=None, parametros=None, registro=None, nombre="consulta"):
+    """
+    Generador de DataFrames tipados de hasta tam_bloque filas. Usa un cursor sin
+    buffer (el servidor va entregando filas conforme se piden) y fetchmany.
+    Si la consulta no regresa filas se entrega un solo bloque vacío con las columnas.
+    Con registro (registro_etl.RegistroEjecucion) se mide la etapa
+    extraccion.<nombre>: solo la lectura, no lo que haga quien consume los bloques.
+    """
+    cursor = conn.cursor()
+    try:
+        with etapa(registro, f"extraccion.{nombre}"):
+            cursor.execute(consulta, parametros or ())
+            columnas = [d[0] for d in cursor.description]
+            filas = cursor.fetchmany(tam_bloque)
+        if not filas:
+            yield pd.DataFrame(columns=columnas)
+        while filas:
+            with etapa(registro, f"extraccion.{nombre}"):
+                bloque = tipar_bloque(pd.DataFrame.from_records(filas, columns=columnas), tipos)
+            contar(registro, f"extraccion.{nombre}", len(bloque))
+            yield bloque
+            with etapa(registro, f"extraccion.{nombre}"):
+                filas = cursor.fetchmany(tam_bloque)
+    finally:
+        cursor.close()
+
+def bloques_tabla(conn, tabla, modo="completa", tam_bloque=TAM_BLOQUE, registro=None):
+    """Bloques de una tabla del OLTP (nombre de CONSULTAS_OLTP) con sus tipos."""
+    return leer_por_bloques(conn, CONSULTAS_OLTP[modo][tabla], tam_bloque, TIPOS_OLTP.get(tabla), registro=registro, nombre=tabla)
+
+def extraer_tabla(conn, tabla, modo="completa", tam_bloque=TAM_BLOQUE, registro=None):
+    """Tabla completa (para catálogos pequeños), leída por bloques y concatenada."""
+    bloques = list(bloques_tabla(conn, tabla, modo, tam_bloque, registro))
+    return bloques[0] if len(bloques) == 1 else pd.concat(bloques, ignore_index=True)
+
+# =========================================================================
+# EXTRACCIÓN EN PARALELO (UNA CONEXIÓN POR TABLA)
+# =========================================================================
+
+def _extraer_con_conexion(conectar, tabla, modo, tam_bloque, registro):
+    conn = conectar()
+    try:
+        return extraer_tabla(conn, tabla, modo, tam_bloque, registro)
+    finally:
+        conn.close()
+
+def extraer_en_paralelo(conectar, tablas=CATALOGOS, modo="completa", tam_bloque=TAM_BLOQUE,
+                        max_concurrencia=MAX_CONCURRENCIA, registro=None):
+    """
+    Lanza la lectura de cada tabla en su propio hilo, con su propia conexión
+    (conectar() la abre o la toma de un pool), a lo más max_concurrencia a la vez.
+    Regresa de inmediato {tabla: Future}; future.result() da el DataFrame. Mientras
+    tanto la conexión principal puede seguir leyendo las tablas grandes.
+    Solo para tablas que no usan las temporales de preparar_delta (ver CATALOGOS):
+    cada conexión ve su propia foto del OLTP.
+    """
+    ejecutor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrencia, len(tablas))), thread_name_prefix="extraccion")
+    futuros = {tabla: ejecutor.submit(_extraer_con_conexion, conectar, tabla, modo, tam_bloque, registro) for tabla in tablas}
+    # Las lecturas pendientes siguen corriendo; los hilos terminan solos al acabar
+    ejecutor.shutdown(wait=False)
+    return futuros
+
+def extraer_tablas(conectar, tablas=CATALOGOS, modo="completa", tam_bloque=TAM_BLOQUE,
+                   max_concurrencia=MAX_CONCURRENCIA, registro=None):
+    """Como extraer_en_paralelo pero espera a todas: regresa {tabla: DataFrame}."""
+    futuros = extraer_en_paralelo(conectar, tablas, modo, tam_bloque, max_concurrencia, registro)
+    return {tabla: futuro.result() for tabla, futuro in futuros.items()}
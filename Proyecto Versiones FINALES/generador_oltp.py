@@ -0,0 +1,369 @@
+import os
+import tempfile
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# =========================================================================
+# GENERADOR DE DATOS SINTÉTICOS PARA db_gestion (VECTORIZADO, POR BLOQUES)
+# =========================================================================
+# Misma lógica que VFinal_Datos_Sinteticos_y_Población_gestion.ipynb (mismos
+# rangos, catálogos y columnas), pero cada columna sale de NumPy de un jalón y
+# las tablas se producen en bloques de TAM_BLOQUE filas. Con la misma semilla,
+# cantidades, offsets y tam_bloque se generan exactamente los mismos datos, así
+# que sirve para probar el ETL y el Dashboard con millones de filas.
+#
+# Diferencias con el notebook:
+#   - las asignaciones (tarea, empleado) únicas se muestrean sin armar el
+#     producto cartesiano (muestrear_pares_unicos)
+#   - el Email de empleado lleva el id (la columna es UNIQUE y con millones de
+#     filas los nombres aleatorios se repiten)
+#   - la carga es con executemany por lotes o con LOAD DATA LOCAL INFILE
+
+TAM_BLOQUE = 100000
+SEMILLA = 42
+
+# Mismo servidor que el notebook (db_gestion)
+CONEXION_GESTION = {
+    "host": "192.168.0.103",
+    "port": 3307,
+    "user": "etl_user",
+    "password": "TuPasswordFuerte",
+    "database": "db_gestion",
+}
+
+# Cantidades del notebook; el orden de las llaves respeta las FKs (orden de carga)
+CANTIDADES = {
+    "cliente": 10,
+    "equipo": 5,
+    "empleado": 30,
+    "estadisticas_proyecto": 20,
+    "proyecto": 150,
+    "tarea": 200,
+    "asignacion_tarea": 100,
+    "incidente": 120,
+}
+
+LLAVES = {
+    "cliente": "idCliente",
+    "equipo": "idEquipo",
+    "empleado": "idEmpleado",
+    "estadisticas_proyecto": "idEstadistica",
+    "proyecto": "idProyecto",
+    "tarea": "idTarea",
+    "asignacion_tarea": "idAsignacion",
+    "incidente": "idIncidente",
+}
+
+DOMINIOS = ["gmail.com", "outlook.com", "empresa.com"]
+INDUSTRIAS = ["Fintech", "Educación", "Salud", "Retail", "Transporte"]
+ESTADOS_TAREA = ["PENDIENTE", "EN_PROGRESO", "EN_REVISION", "COMPLETADA", "BLOQUEADA"]
+ESTADOS_PROYECTO = ["ACTIVO", "CANCELADO", "EN_PRUEBAS", "EN_PLANEACION", "FINALIZADO", "PAUSADO"]
+PRIORIDADES = ["BAJA", "MEDIA", "ALTA", "CRITICA"]
+TIPOS_PROYECTO = ["WEB", "MOVIL", "ESCRITORIO", "EMBEBIDO"]
+DESCRIPCIONES_PROYECTO = ["Sistema web de ventas", "App móvil", "ERP", "Control escolar", "Dashboard BI"]
+DESCRIPCIONES_TAREA = ["frontend", "backend", "API", "deploy", "test", "analytics"]
+
+# =========================================================================
+# SECCIÓN 1: GENERADORES BÁSICOS (VECTORIZADOS)
+# =========================================================================
+
+def _nombres(rng, n):
+    # 6 letras mayúsculas por fila (random_nombre del notebook)
+    letras = rng.integers(ord("A"), ord("Z") + 1, size=(n, 6), dtype=np.uint8)
+    return letras.view("S6").ravel().astype(str)
+
+def _emails(rng, nombres, sufijos):
+    dominios = np.asarray(DOMINIOS)[rng.integers(0, len(DOMINIOS), len(nombres))]
+    return pd.Series(nombres).str.lower() + pd.Series(sufijos).astype(str) + "@" + dominios
+
+def _fechas(rng, n, base):
+    # base - (1 a 1000) días, como random_fecha
+    return base - rng.integers(1, 1001, n).astype("timedelta64[D]")
+
+def _elegir(rng, opciones, n):
+    return np.asarray(opciones)[rng.integers(0, len(opciones), n)]
+
+def _uniforme(rng, minimo, maximo, n):
+    return rng.uniform(minimo, maximo, n).round(2)
+
+def _entero(rng, minimo, maximo, n):
+    # randint del notebook: ambos extremos incluidos
+    return rng.integers(minimo, maximo + 1, n)
+
+def _fk(rng, inicios, cantidades, tabla, n):
+    return inicios[tabla] + rng.integers(0, cantidades[tabla], n)
+
+def muestrear_pares_unicos(rng, n_tareas, n_empleados, k):
+    """
+    k índices distintos de tarea * n_empleados + empleado, sin armar el producto
+    cartesiano: se sortean índices con reemplazo y se quitan repetidos hasta
+    juntar k. La memoria depende de k, no de n_tareas * n_empleados. Regresa dos
+    arreglos (posición de la tarea, posición del empleado) en orden aleatorio.
+    """
+    total = n_tareas * n_empleados
+    k = min(k, total)
+    if 2 * k >= total:
+        # Casi todas las combinaciones: una permutación (acotada por 2k) es más barata
+        elegidos = rng.permutation(total)[:k]
+    else:
+        elegidos = np.empty(0, dtype=np.int64)
+        while len(elegidos) < k:
+            faltan = k - len(elegidos)
+            elegidos = np.union1d(elegidos, rng.integers(0, total, faltan + faltan // 10 + 16))
+        # union1d los deja ordenados: se barajan antes de recortar para no sesgar
+        elegidos = rng.permutation(elegidos)[:k]
+    return elegidos // n_empleados, elegidos % n_empleados
+
+# =========================================================================
+# SECCIÓN 2: GENERACIÓN POR TABLA
+# =========================================================================
+# Cada función recibe el generador del bloque, los ids del bloque y el contexto
+# (cantidades, offsets, fecha base) y regresa el DataFrame con las columnas del
+# notebook. Las fechas quedan como datetime64[D].
+
+def _cliente(rng, ids, ctx):
+    nombres = _nombres(rng, len(ids))
+    return pd.DataFrame({
+        "idCliente": ids,
+        "Nombre": nombres,
+        "Email": _emails(rng, nombres, _entero(rng, 1, 99, len(ids))),
+        "Telefono": "+52" + pd.Series(_entero(rng, 2220000000, 2299999999, len(ids))).astype(str),
+        "Industria": _elegir(rng, INDUSTRIAS, len(ids)),
+        "MetricaClienteInicial": _uniforme(rng, 50000, 200000, len(ids)),
+    })
+
+def _equipo(rng, ids, ctx):
+    letras = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))[rng.integers(0, 26, len(ids))]
+    return pd.DataFrame({
+        "idEquipo": ids,
+        "Nombre": "Equipo_" + pd.Series(letras) + "_" + pd.Series(_entero(rng, 10, 99, len(ids))).astype(str),
+        "Activo": rng.integers(0, 2, len(ids)),
+    })
+
+def _empleado(rng, ids, ctx):
+    nombres = _nombres(rng, len(ids))
+    return pd.DataFrame({
+        "idEmpleado": ids,
+        "Nombre": nombres,
+        "Email": _emails(rng, nombres, ids),
+        "Salario": _uniforme(rng, 8000, 22000, len(ids)),
+        "SalarioxHora": _uniforme(rng, 100, 300, len(ids)),
+        "Equipo_idEquipo": _fk(rng, ctx["inicios"], ctx["cantidades"], "equipo", len(ids)),
+    })
+
+def _estadisticas_proyecto(rng, ids, ctx):
+    return pd.DataFrame({
+        "idEstadistica": ids,
+        "Fecha": _fechas(rng, len(ids), ctx["base"]),
+        "Tareas_completadas": _entero(rng, 5, 100, len(ids)),
+        "Tareas_pendientes": _entero(rng, 0, 25, len(ids)),
+        "Horas_trabajadas": _uniforme(rng, 10, 100, len(ids)),
+        "Costo_diario": _uniforme(rng, 500, 20000, len(ids)),
+    })
+
+def _proyecto(rng, ids, ctx):
+    n = len(ids)
+    fecha_inicio = _fechas(rng, n, ctx["base"])
+    fecha_fin_estimada = fecha_inicio + _entero(rng, 30, 180, n).astype("timedelta64[D]")
+    fecha_fin_real = fecha_fin_estimada + _entero(rng, -10, 20, n).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "idProyecto": ids,
+        "Nombre": np.char.add("Proyecto_", _nombres(rng, n)),
+        "Descripcion": _elegir(rng, DESCRIPCIONES_PROYECTO, n),
+        "Tipo": _elegir(rng, TIPOS_PROYECTO, n),
+        "Fecha_inicio": fecha_inicio,
+        "Fecha_fin_estimada": fecha_fin_estimada,
+        "Fecha_fin_real": fecha_fin_real,
+        "Estado": _elegir(rng, ESTADOS_PROYECTO, n),
+        "Presupuesto": _uniforme(rng, 50000, 350000, n),
+        "Costo_real": _uniforme(rng, 50000, 350000, n),
+        "Cliente_idCliente": _fk(rng, ctx["inicios"], ctx["cantidades"], "cliente", n),
+        "Estadisticas_Proyecto_idEstadistica": _fk(rng, ctx["inicios"], ctx["cantidades"], "estadisticas_proyecto", n),
+        "MetricaClienteFinal": _uniforme(rng, 50000, 350000, n),
+        "CertificacionSeguridad": rng.integers(0, 2, n),
+    })
+
+def _tarea(rng, ids, ctx):
+    n = len(ids)
+    fecha_creacion = _fechas(rng, n, ctx["base"])
+    fecha_fin_estimada = fecha_creacion + _entero(rng, 5, 30, n).astype("timedelta64[D]")
+    fecha_fin_real = fecha_fin_estimada + _entero(rng, -3, 5, n).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "idTarea": ids,
+        "Titulo": np.char.add("Tarea_", _nombres(rng, n)),
+        "Descripcion": np.char.add("Implementar ", _elegir(rng, DESCRIPCIONES_TAREA, n)),
+        "Fecha_creacion": fecha_creacion,
+        "Fecha_fin_estimada": fecha_fin_estimada,
+        "Fecha_fin_real": fecha_fin_real,
+        "Estado": _elegir(rng, ESTADOS_TAREA, n),
+        "Prioridad": _elegir(rng, PRIORIDADES, n),
+        "Horas_estimadas": _entero(rng, 5, 120, n),
+        "EsAutomatizacion": rng.integers(0, 2, n),
+        "EsReutilizado": rng.integers(0, 2, n),
+    })
+
+def _asignacion_tarea(rng, ids, ctx):
+    n = len(ids)
+    # Los pares únicos se sortean una vez para toda la tabla (ctx["pares"])
+    posicion = ids - ctx["inicios"]["asignacion_tarea"]
+    tareas, empleados = ctx["pares"]
+    return pd.DataFrame({
+        "idAsignacion": ids,
+        "Tarea_idTarea": ctx["inicios"]["tarea"] + tareas[posicion],
+        "Empleado_idEmpleado": ctx["inicios"]["empleado"] + empleados[posicion],
+        "Fecha_asignacion": _fechas(rng, n, ctx["base"]),
+        "Horas_estimadas": _entero(rng, 5, 120, n),
+        "Horas_reales": _entero(rng, 5, 120, n),
+        "Proyecto_idProyecto": _fk(rng, ctx["inicios"], ctx["cantidades"], "proyecto", n),
+    })
+
+def _incidente(rng, ids, ctx):
+    n = len(ids)
+    return pd.DataFrame({
+        "idIncidente": ids,
+        "Proyecto_idProyecto": _fk(rng, ctx["inicios"], ctx["cantidades"], "proyecto", n),
+        "Fecha_reporte": _fechas(rng, n, ctx["base"]),
+        "Severidad": _elegir(rng, PRIORIDADES, n),
+        "Estado": "CERRADO",
+        "idTarea": _fk(rng, ctx["inicios"], ctx["cantidades"], "tarea", n),
+        "CostoCorreccion": _uniforme(rng, 100, 2500, n),
+    })
+
+GENERADORES = {
+    "cliente": _cliente,
+    "equipo": _equipo,
+    "empleado": _empleado,
+    "estadisticas_proyecto": _estadisticas_proyecto,
+    "proyecto": _proyecto,
+    "tarea": _tarea,
+    "asignacion_tarea": _asignacion_tarea,
+    "incidente": _incidente,
+}
+
+def generar_bloques(cantidades=None, inicios=None, semilla=SEMILLA, tam_bloque=TAM_BLOQUE, base=None):
+    """
+    Genera (tabla, DataFrame) por bloques de tam_bloque filas, tabla por tabla en
+    orden de carga. inicios es el primer id de cada tabla (siguientes_ids); sin
+    él los ids empiezan en 1. Cada bloque tiene su propio generador derivado de
+    (semilla, tabla, bloque), así que el resultado es reproducible.
+    """
+    cantidades = {**CANTIDADES, **(cantidades or {})}
+    inicios = {**{tabla: 1 for tabla in CANTIDADES}, **(inicios or {})}
+    ctx = {
+        "cantidades": cantidades,
+        "inicios": inicios,
+        "base": np.datetime64(base or date.today(), "D"),
+    }
+    for indice, (tabla, generador) in enumerate(GENERADORES.items()):
+        n = cantidades[tabla]
+        if tabla == "asignacion_tarea":
+            # Igual que el notebook: no más asignaciones que combinaciones posibles
+            ctx["pares"] = muestrear_pares_unicos(
+                np.random.default_rng([semilla, indice]), cantidades["tarea"], cantidades["empleado"], n
+            )
+            n = len(ctx["pares"][0])
+        for numero, desde in enumerate(range(0, n, tam_bloque)):
+            rng = np.random.default_rng([semilla, indice, numero + 1])
+            ids = inicios[tabla] + np.arange(desde, min(desde + tam_bloque, n), dtype=np.int64)
+            yield tabla, generador(rng, ids, ctx)
+
+# =========================================================================
+# SECCIÓN 3: CARGA MASIVA (EXECUTEMANY POR LOTES O LOAD DATA)
+# =========================================================================
+
+def conectar_gestion(local_infile=False):
+    import mysql.connector
+    return mysql.connector.connect(**CONEXION_GESTION, allow_local_infile=local_infile)
+
+def siguientes_ids(conn):
+    """MAX(id) + 1 de cada tabla en una sola consulta (1 si la tabla está vacía)."""
+    consulta = "SELECT " + ", ".join(
+        f"(SELECT COALESCE(MAX({llave}), 0) + 1 FROM {tabla})" for tabla, llave in LLAVES.items()
+    )
+    cursor = conn.cursor()
+    cursor.execute(consulta)
+    fila = cursor.fetchone()
+    cursor.close()
+    return {tabla: int(valor) for tabla, valor in zip(LLAVES, fila)}
+
+def _como_texto_fechas(df):
+    # Fechas como 'YYYY-MM-DD': las aceptan tanto MySQL como SQLite (sin tocar el bloque original)
+    return df.assign(**{
+        col: np.datetime_as_string(df[col].to_numpy().astype("datetime64[D]"))
+        for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])
+    })
+
+def filas_bloque(df):
+    """Tuplas con tipos nativos de Python para executemany."""
+    return list(zip(*(df[col].tolist() for col in df.columns)))
+
+def insertar_bloque(cursor, tabla, df, dialecto="mysql", tam_lote=5000):
+    # mysql.connector reescribe cada executemany como un solo INSERT multi-fila
+    marca = "%s" if dialecto == "mysql" else "?"
+    sql = f"INSERT INTO {tabla} ({', '.join(df.columns)}) VALUES ({', '.join([marca] * len(df.columns))})"
+    filas = filas_bloque(_como_texto_fechas(df))
+    for inicio in range(0, len(filas), tam_lote):
+        cursor.executemany(sql, filas[inicio:inicio + tam_lote])
+
+def load_data_bloque(cursor, tabla, df, carpeta=None):
+    """
+    Escribe el bloque en un CSV temporal y lo carga con LOAD DATA LOCAL INFILE
+    (la conexión necesita allow_local_infile=True y el servidor local_infile=ON).
+    """
+    descriptor, ruta = tempfile.mkstemp(suffix=".csv", dir=carpeta)
+    os.close(descriptor)
+    try:
+        _como_texto_fechas(df).to_csv(ruta, index=False, header=False, lineterminator="\n")
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE '{ruta.replace(os.sep, '/')}' INTO TABLE {tabla} "
+            "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            f"LINES TERMINATED BY '\\n' ({', '.join(df.columns)})"
+        )
+    finally:
+        os.remove(ruta)
+
+def poblar(conn, bloques, metodo="insert", dialecto="mysql", tam_lote=5000):
+    """
+    Carga los bloques de generar_bloques con metodo="insert" (executemany por
+    lotes) o "load_data" (solo MySQL). Hace commit por bloque para que la
+    transacción no crezca con la tabla. Regresa filas insertadas por tabla.
+    """
+    insertadas = {}
+    cursor = conn.cursor()
+    try:
+        for tabla, df in bloques:
+            if metodo == "load_data":
+                load_data_bloque(cursor, tabla, df)
+            else:
+                insertar_bloque(cursor, tabla, df, dialecto, tam_lote)
+            conn.commit()
+            insertadas[tabla] = insertadas.get(tabla, 0) + len(df)
+            print(f"  {tabla}: {insertadas[tabla]} filas")
+    finally:
+        cursor.close()
+    return insertadas
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Genera y carga datos sintéticos en db_gestion")
+    parser.add_argument("--escala", type=float, default=1.0, help="Multiplica todas las CANTIDADES")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--tam-bloque", type=int, default=TAM_BLOQUE)
+    parser.add_argument("--metodo", choices=["insert", "load_data"], default="insert")
+    args = parser.parse_args()
+
+    conn = conectar_gestion(local_infile=args.metodo == "load_data")
+    inicios = siguientes_ids(conn)
+    print(f"--- Puntos de inicio detectados: {inicios} ---")
+    cantidades = {tabla: max(1, int(n * args.escala)) for tabla, n in CANTIDADES.items()}
+    try:
+        poblar(conn, generar_bloques(cantidades, inicios, args.semilla, args.tam_bloque), args.metodo)
+        print("\n--- PROCESO COMPLETADO EXITOSAMENTE ---")
+    except Exception as e:
+        conn.rollback()
+        print(f"\nERROR DURANTE LA INSERCIÓN SQL: {e}")
+    finally:
+        conn.close()
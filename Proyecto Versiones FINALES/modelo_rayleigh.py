@@ -1,85 +1,192 @@
 import pandas as pd
 import numpy as np
 import mysql.connector
-from scipy.optimize import curve_fit
+from mysql.connector import pooling
 from sklearn.linear_model import LinearRegression 
 import matplotlib.pyplot as plt
 import json
-import random
+import os
+import functools
+import threading
+import time
+import atexit
+from collections import OrderedDict
+from datetime import datetime
 
 # =========================================================================
-# SECCIÓN 1: EXTRACCIÓN DE DATOS (FUNCIÓN ORIGINAL PARA OBTENER TOTALES)
+# SECCIÓN 1: EXTRACCIÓN DE DATOS (TOTALES PARA LA REGRESIÓN)
 # =========================================================================
 
-def obtener_totales_proyectos():
+CONEXION_DW = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "database": "db_soporte",
+}
+
+# Las predicciones y el reentrenamiento (incluido el hilo de programar_reentrenamiento)
+# piden conexiones a un pool en lugar de abrir una nueva cada vez
+TAM_POOL_DW = 4
+_pool_dw = None
+_candado_pool = threading.Lock()
+
+def conectar_dw():
+    """Conexión del pool; close() la regresa al pool en lugar de cerrarla."""
+    global _pool_dw
+    with _candado_pool:
+        if _pool_dw is None:
+            _pool_dw = pooling.MySQLConnectionPool(pool_name="dw_modelo", pool_size=TAM_POOL_DW, **CONEXION_DW)
+    return _pool_dw.get_connection()
+
+def usar_pool(pool):
+    """
+    Reemplaza el pool de MySQL por otro con el mismo get_connection() (por ejemplo
+    el PoolSQLite de servicio_prediccion.py para correr contra un DW local).
+    """
+    global _pool_dw
+    with _candado_pool:
+        _pool_dw = pool
+
+# Vista v_entrenamiento_defectos (Version1_DW_Fase_1_y_2.sql): Total_Tareas,
+# Tiempo_Semanas y Total_Defectos de todos los proyectos en una sola consulta
+CONSULTA_TOTALES = """
+    SELECT idProyecto, Tiempo_Semanas, Total_Defectos, Total_Tareas
+    FROM v_entrenamiento_defectos
+"""
+
+RUTA_CACHE_TOTALES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "totales_proyectos.parquet")
+
+def guardar_cache_totales(df, ruta, version):
+    # La versión del DW va en los metadatos del Parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}), b"version_datos": str(version).encode()})
+    pq.write_table(tabla, ruta + ".tmp")
+    os.replace(ruta + ".tmp", ruta)
+
+def leer_cache_totales(ruta, version):
+    """Regresa los totales en caché si son de esta versión del DW, si no None."""
+    try:
+        import pyarrow.parquet as pq
+        metadatos = pq.read_schema(ruta).metadata or {}
+        if metadatos.get(b"version_datos", b"").decode() != str(version):
+            return None
+        return pq.read_table(ruta).to_pandas()
+    except (ImportError, OSError, ValueError):
+        # ValueError incluye ArrowInvalid (archivo corrupto): se vuelve a consultar el DW
+        return None
+
+def obtener_totales_proyectos(conn=None, ruta_cache=None, version=None):
     """
     Extrae los datos TOTALES de todos los proyectos, necesarios para la Regresión.
+    Con ruta_cache el resultado se guarda en Parquet y se reutiliza mientras la
+    versión del DW no cambie. conn es opcional (cualquier conexión DB-API); sin
+    ella se usa una del pool.
     """
+    propia = conn is None
     try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="db_soporte"
-        )
-        cursor = conn.cursor(dictionary=True)
-
-        cursor.execute("""
-            SELECT 
-                p.idProyecto,
-                p.nombre_proyecto,
-                h.defectos_reportados
-            FROM dim_proyecto p
-            JOIN hecho_proyecto h ON h.idProyecto = p.idProyecto;
-        """)
-        proyectos = cursor.fetchall()
-        registros = []
-
-        for proyecto in proyectos:
-            idp = proyecto["idProyecto"]
-            
-            # === Uso de Procedimientos Almacenados ===
-            
-            # Tamaño (contar_tareas)
-            cursor2 = conn.cursor() 
-            args_tareas = [idp, 0] 
-            resultado_tareas = cursor2.callproc("contar_tareas", args_tareas)
-            total_tareas = resultado_tareas[1]
-            cursor2.close()
-
-            # Tiempo (calcular_semanas_proyecto)
-            cursor2 = conn.cursor()
-            args_semanas = [idp, 0]
-            resultado_semanas = cursor2.callproc("calcular_semanas_proyecto", args_semanas)
-            semanas = resultado_semanas[1]
-            cursor2.close()
-            
-            # =========================================
+        if propia:
+            conn = conectar_dw()
+
+        if ruta_cache:
+            version = version or version_datos_dw(conn)
+            df_totales = leer_cache_totales(ruta_cache, version)
+            if df_totales is not None:
+                return df_totales
 
-            # La predicción usará Total_Tareas y Tiempo_Semanas como variables predictoras (X)
-            registros.append({
-                "idProyecto": idp,
-                "Tiempo_Semanas": semanas,
-                "Total_Defectos": proyecto["defectos_reportados"], # Y (Target)
-                "Total_Tareas": total_tareas, # X1
-            })
+        # La predicción usará Total_Tareas y Tiempo_Semanas como variables predictoras (X)
+        # y Total_Defectos como Y (Target)
+        cursor = conn.cursor()
+        cursor.execute(CONSULTA_TOTALES)
+        df_totales = pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+        cursor.close()
 
-        print(pd.DataFrame(registros).head())
-        return pd.DataFrame(registros)
+        if ruta_cache:
+            guardar_cache_totales(df_totales, ruta_cache, version)
+
+        print(df_totales.head())
+        return df_totales
 
     except mysql.connector.Error as err:
         print(f"Error de MySQL al obtener datos totales: {err}")
         return pd.DataFrame()
         
     finally:
-        if 'conn' in locals() and conn.is_connected():
-            cursor.close()
+        if propia and conn is not None:
             conn.close()
 
 # =========================================================================
 # SECCIÓN 2: MODELO RAYLEIGH (SOLO DISTRIBUCIÓN)
 # =========================================================================
 
+# Las proporciones de cada curva dependen solo de (semanas, b): se calculan una
+# vez y se reutilizan. distribuir_rayleigh_lote reparte muchos totales a la vez
+# (un broadcast por cada curva distinta) y corrige el redondeo con el mismo
+# criterio que la versión por proyecto, así que cada curva es idéntica a la que
+# daba ModeloRayleighDistribucion.
+
+TAM_CACHE_CURVAS = 1024
+
+@functools.lru_cache(maxsize=TAM_CACHE_CURVAS)
+def proporciones_rayleigh(duracion, b):
+    """Proporción de defectos por semana (PDF de Rayleigh normalizado), solo lectura."""
+    time_points = np.arange(1, duracion + 1)
+    
+    # PDF del modelo ajustado: 2 * b * t * exp(-b * t^2)
+    pdf_values = 2 * b * time_points * np.exp(-b * time_points**2)
+    
+    proportions = pdf_values / np.sum(pdf_values)
+    proportions.flags.writeable = False
+    return proportions
+
+def distribuir_rayleigh_lote(totales, semanas, historic_b=0.005, tam_bloque=100000):
+    """
+    Curvas de Rayleigh para muchos proyectos. totales (enteros), semanas y
+    historic_b pueden ser arreglos o escalares. Regresa una matriz
+    (proyectos x max(semanas)) de int32 donde las semanas que no aplican a un
+    proyecto quedan en 0.
+    """
+    totales = np.atleast_1d(np.asarray(totales, dtype=np.int64))
+    semanas = np.maximum(np.broadcast_to(np.asarray(semanas, dtype=np.int64), totales.shape), 0)
+    b = np.broadcast_to(np.asarray(historic_b, dtype=float), totales.shape)
+    max_semanas = int(semanas.max()) if len(semanas) else 0
+    curvas = np.zeros((len(totales), max_semanas), dtype=np.int32)
+    if max_semanas == 0:
+        return curvas
+
+    # Filas agrupadas por curva (semanas, b): cada grupo es un solo broadcast
+    # total x proporciones, sin relleno
+    valores_b, indice_b = np.unique(b, return_inverse=True)
+    clave = semanas * len(valores_b) + indice_b.ravel()
+    orden = np.argsort(clave, kind="stable")
+    cortes = np.flatnonzero(np.diff(clave[orden])) + 1
+
+    for grupo in np.split(orden, cortes):
+        duracion = int(semanas[grupo[0]])
+        if duracion == 0:
+            continue
+        proportions = proporciones_rayleigh(duracion, float(b[grupo[0]]))
+
+        # Por bloques de filas para acotar la memoria de la matriz de flotantes
+        for inicio in range(0, len(grupo), tam_bloque):
+            filas = grupo[inicio:inicio + tam_bloque]
+            defects_float = totales[filas, None] * proportions[None, :]
+            defects = np.round(defects_float).astype(np.int64)
+
+            # Ajuste fino (para asegurar que el total entero sea exacto), con el mismo
+            # argsort de la versión por proyecto, solo en las filas que lo necesitan
+            diff = totales[filas] - defects.sum(axis=1)
+            ajustar = np.flatnonzero(diff != 0)
+            if len(ajustar):
+                decimal_parts = defects_float[ajustar] - defects[ajustar]
+                indices = np.argsort(decimal_parts, axis=1)[:, ::-1]
+                renglon, posicion = np.nonzero(np.arange(duracion)[None, :] < np.abs(diff[ajustar])[:, None])
+                defects[ajustar[renglon], indices[renglon, posicion]] += np.sign(diff[ajustar])[renglon]
+
+            curvas[filas, :duracion] = defects
+    return curvas
+
 def ModeloRayleighDistribucion(total_defects, duration_weeks, historic_b=0.005):
     """
     Distribuye el total de defectos predicho a lo largo de las semanas
@@ -91,81 +198,594 @@ def ModeloRayleighDistribucion(total_defects, duration_weeks, historic_b=0.005):
     # 1. Parámetro 'b' fijo (para la forma de la curva).
     b_ajustado = historic_b 
 
-    # 2. Distribución Temporal (Curva de riesgo)
-    time_points = np.arange(1, duracion_hist + 1)
-    
-    # PDF del modelo ajustado: 2 * b * t * exp(-b * t^2)
-    pdf_values = 2 * b_ajustado * time_points * np.exp(-b_ajustado * time_points**2)
-    
-    proportions = pdf_values / np.sum(pdf_values)
-    defects_per_week_float = total_defectos_estimados * proportions
-    defects_per_week = np.round(defects_per_week_float).astype(int)
-    
-    # Ajuste fino (para asegurar que el total entero sea exacto)
-    diff = total_defectos_estimados - np.sum(defects_per_week)
-    if diff != 0:
-        decimal_parts = defects_per_week_float - defects_per_week
-        indices_to_adjust = np.argsort(decimal_parts)[::-1][:abs(diff)]
-        defects_per_week[indices_to_adjust] += np.sign(diff)
-    
-    df_distribucion = pd.DataFrame({
-        'Semana': time_points, 
-        'Defectos': defects_per_week
-    })
+    # 2. Distribución Temporal (Curva de riesgo), con el ajuste fino del total
+    defects_per_week = distribuir_rayleigh_lote([total_defectos_estimados], [duracion_hist], b_ajustado)[0]
     
     return {
         "Total_Defectos_Estimados": total_defectos_estimados,
-        "Curva_Riesgo_Rayleigh": df_distribucion.to_dict('records'),
+        "Curva_Riesgo_Rayleigh": [
+            {"Semana": semana, "Defectos": defectos}
+            for semana, defectos in enumerate(defects_per_week.tolist(), start=1)
+        ],
         "Parametro_Rayleigh_b": float(b_ajustado) 
     }
 
 # =========================================================================
-# SECCIÓN 3: API/SCRIPT ENDPOINT (MODELO HÍBRIDO SIMPLIFICADO)
+# SECCIÓN 3: MODELO DE REGRESIÓN PERSISTIDO (ENTRENAR UNA VEZ, CARGAR AL INICIO)
 # =========================================================================
+# La regresión (Total_Defectos ~ Total_Tareas + Tiempo_Semanas) se entrena una
+# sola vez y se guarda en RUTA_MODELO (coeficientes + versión de los datos del
+# DW con los que se entrenó). Las predicciones solo hacen la aritmética con los
+# coeficientes; se reentrena cuando cambia el DW, a pedido (actualizar_modelo)
+# o periódicamente (programar_reentrenamiento).
+
+RUTA_MODELO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modelo_defectos.json")
 
-def predecir_riesgo_defecto(total_tareas_nuevo, semanas_estimadas_nuevo):
+# Agregados baratos de las tablas de las que sale el entrenamiento: si alguno
+# cambia (proyectos, tareas o defectos nuevos/recalculados) el modelo está viejo
+CONSULTA_VERSION_DW = """
+    SELECT
+        (SELECT COUNT(*) FROM hecho_proyecto),
+        (SELECT COALESCE(SUM(defectos_reportados), 0) FROM hecho_proyecto),
+        (SELECT COUNT(*) FROM dim_proyecto),
+        (SELECT MAX(fecha_fin_real) FROM dim_proyecto),
+        (SELECT COUNT(*) FROM dim_tarea),
+        (SELECT COALESCE(MAX(idTarea), 0) FROM dim_tarea)
+"""
+
+_modelo_actual = None
+_candado_modelo = threading.Lock()
+
+def version_datos_dw(conn=None):
     """
-    Función API simplificada: predice el total de defectos basándose en Tareas/Semanas
-    y distribuye el riesgo con Rayleigh.
+    Sello de versión de los datos de entrenamiento. Acepta cualquier conexión
+    DB-API (MySQL o SQLite); sin conexión abre una al DW.
+    """
+    propia = conn is None
+    if propia:
+        conn = conectar_dw()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(CONSULTA_VERSION_DW)
+        fila = cursor.fetchone()
+        cursor.close()
+    finally:
+        if propia:
+            conn.close()
+    return "|".join(str(valor) for valor in fila)
+
+def entrenar_modelo(df_totales, version=None):
+    """
+    Ajusta la regresión lineal con el histórico (mismas columnas que
+    obtener_totales_proyectos) y regresa solo lo necesario para predecir.
     """
-    print(f"Calculando predicción para proyecto nuevo (Tareas: {total_tareas_nuevo}, Semanas: {semanas_estimadas_nuevo})")
-    
-    # 1. Obtener todos los datos históricos (USA TODOS LOS PROYECTOS)
-    df_totales = obtener_totales_proyectos()
-    
-    if df_totales.empty:
-        return json.dumps({"Error": "No se encontraron datos históricos para entrenar el modelo."}, indent=4)
-        
-    # 2. ENTRENAMIENTO DEL MODELO DE REGRESIÓN (Predicción del Total de Defectos)
-    
     X = df_totales[['Total_Tareas', 'Tiempo_Semanas']].values
     y = df_totales['Total_Defectos'].values
-    
+
     modelo_regresion = LinearRegression()
     modelo_regresion.fit(X, y)
-    
-    # 3. PREDICCIÓN DEL TOTAL DE DEFECTOS PARA EL NUEVO PROYECTO
-    new_project_data = np.array([[total_tareas_nuevo, semanas_estimadas_nuevo]]) 
-    total_defects_pred = modelo_regresion.predict(new_project_data)[0]
-    total_defects_pred = np.maximum(1, total_defects_pred) 
-    
-    print(f"-> Regresión Lineal predijo un total de {int(total_defects_pred)} defectos.")
 
-    # 4. DISTRIBUCIÓN RAYLEIGH (Cumplimiento del Requisito)
-    resultado_modelo = ModeloRayleighDistribucion(
-        total_defects_pred, 
-        semanas_estimadas_nuevo
+    return {
+        "coeficientes": [float(c) for c in modelo_regresion.coef_],
+        "intercepto": float(modelo_regresion.intercept_),
+        "n_proyectos": int(len(df_totales)),
+        "version_datos": version,
+        "entrenado": datetime.now().isoformat(timespec="seconds"),
+    }
+
+def guardar_modelo(modelo, ruta=RUTA_MODELO):
+    # Escritura atómica: un proceso que arranca nunca lee un archivo a medias
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(modelo, f, indent=2)
+    os.replace(ruta + ".tmp", ruta)
+
+def cargar_modelo(ruta=RUTA_MODELO):
+    """Regresa el modelo guardado, o None si no existe o no se puede leer."""
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            modelo = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if "coeficientes" not in modelo or "intercepto" not in modelo:
+        return None
+    return modelo
+
+def actualizar_modelo(forzar=False, ruta=RUTA_MODELO, ruta_cache=RUTA_CACHE_TOTALES):
+    """
+    Reentrena solo si la versión del DW es distinta a la del modelo guardado
+    (o si forzar=True). Regresa (modelo, reentrenado). Si el DW no responde se
+    sigue con el modelo anterior, que es None si nunca se entrenó.
+    """
+    global _modelo_actual
+    with _candado_modelo:
+        modelo = _modelo_actual or cargar_modelo(ruta)
+        try:
+            version = version_datos_dw()
+            if modelo is not None and not forzar and modelo.get("version_datos") == version:
+                _modelo_actual = modelo
+                return modelo, False
+
+            df_totales = obtener_totales_proyectos(ruta_cache=ruta_cache, version=version)
+        except mysql.connector.Error as err:
+            print(f"Error de MySQL al revisar la versión del modelo: {err}")
+            _modelo_actual = modelo
+            return modelo, False
+
+        if df_totales.empty:
+            # Sin histórico se sigue usando el modelo anterior (si había)
+            _modelo_actual = modelo
+            return modelo, False
+
+        modelo = entrenar_modelo(df_totales, version)
+        guardar_modelo(modelo, ruta)
+        _modelo_actual = modelo
+        # Las llaves del caché llevan la versión del modelo: lo anterior ya no se usa
+        _cache_predicciones.limpiar()
+        print(f"Modelo reentrenado con {modelo['n_proyectos']} proyectos (versión DW {version})")
+        return modelo, True
+
+def obtener_modelo(ruta=RUTA_MODELO):
+    """
+    Modelo en memoria. La primera llamada lo carga del archivo y solo si no
+    existe lo entrena; después no vuelve a tocar el DW.
+    """
+    global _modelo_actual
+    if _modelo_actual is None:
+        modelo = cargar_modelo(ruta)
+        if modelo is None:
+            modelo, _ = actualizar_modelo(ruta=ruta)
+        _modelo_actual = modelo
+    return _modelo_actual
+
+def programar_reentrenamiento(intervalo_s=3600, ruta=RUTA_MODELO):
+    """
+    Revisa la versión del DW cada intervalo_s segundos en un hilo de fondo y
+    reentrena si cambió; también suma a la calibración de b los incidentes
+    nuevos. Regresa el Event que lo detiene (evento.set()).
+    """
+    detener = threading.Event()
+
+    def ciclo():
+        while not detener.wait(intervalo_s):
+            try:
+                actualizar_modelo(ruta=ruta)
+                actualizar_calibracion()
+            except Exception as e:
+                print(f"No se pudo revisar/reentrenar el modelo: {e}")
+
+    threading.Thread(target=ciclo, daemon=True, name="reentrenar_modelo_defectos").start()
+    return detener
+
+def predecir_total_defectos(modelo, total_tareas, semanas):
+    # Misma predicción que LinearRegression.predict, con los coeficientes guardados
+    coef_tareas, coef_semanas = modelo["coeficientes"]
+    total = total_tareas * coef_tareas + semanas * coef_semanas + modelo["intercepto"]
+    return max(1.0, total)
+
+# =========================================================================
+# SECCIÓN 4: CALIBRACIÓN DE b POR SEGMENTO (tipo_proyecto / Industria)
+# =========================================================================
+# b se estima con las llegadas históricas de defectos: semana de cada
+# hecho_incidente.fecha_reporte respecto a dim_proyecto.fecha_inicio. Para el
+# PDF 2*b*t*exp(-b*t^2) el estimador de máxima verosimilitud es b = n / suma(t^2),
+# así que por segmento solo se guardan n y suma(t^2): son sumables, y cada
+# recalibración lee únicamente los incidentes con idIncidente mayor al último
+# procesado (mismo criterio que el watermark del ETL). t es el número de semana
+# contado desde 1 (semanas completas desde el inicio + 1): la misma escala con la
+# que proporciones_rayleigh evalúa la semana t de la curva predicha.
+# La tabla ajustada se guarda en RUTA_CALIBRACION y se consulta en memoria al
+# predecir; un segmento con pocos incidentes usa el nivel más general que sí
+# tenga datos: (tipo, industria) -> (tipo, *) -> (*, industria) -> (*, *) -> B_DEFECTO.
+
+RUTA_CALIBRACION = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibracion_rayleigh.json")
+B_DEFECTO = 0.005
+MIN_INCIDENTES_SEGMENTO = 30
+TODOS = "*"
+SIN_DATO = "SIN_DATO"
+# Escala de t con la que se guardaron los estadísticos: un archivo con otra escala
+# (t = semanas + 0.5 en versiones anteriores) se descarta y se recalibra completo
+ESCALA_T = "semana_desde_1"
+
+CONSULTA_LLEGADAS = """
+    SELECT i.idIncidente, i.fecha_reporte, p.fecha_inicio, p.tipo_proyecto, c.industria
+    FROM hecho_incidente i
+    JOIN dim_proyecto p ON p.idProyecto = i.idProyecto
+    LEFT JOIN dim_cliente c ON c.idCliente = p.idCliente
+    WHERE i.idIncidente > {ultimo}
+    ORDER BY i.idIncidente
+"""
+
+_calibracion_actual = None
+_SIN_CALIBRACION = {"b": {}}  # marca de "no hay archivo de calibración"
+_candado_calibracion = threading.Lock()
+
+def estadisticos_llegadas(bloque):
+    """n y suma(t^2) por (tipo_proyecto, industria) para un bloque de incidentes."""
+    reporte = pd.to_datetime(bloque["fecha_reporte"], errors="coerce")
+    inicio = pd.to_datetime(bloque["fecha_inicio"], errors="coerce")
+    t = (reporte - inicio).dt.days // 7 + 1
+    validos = t.notna() & (t > 0)
+    llegadas = pd.DataFrame({
+        "tipo_proyecto": bloque["tipo_proyecto"].fillna(SIN_DATO).astype(str).str.strip()[validos],
+        "industria": bloque["industria"].fillna(SIN_DATO).astype(str).str.strip()[validos],
+        "t2": t[validos] ** 2,
+    })
+    return (
+        llegadas.groupby(["tipo_proyecto", "industria"])
+        .agg(n=("t2", "size"), suma_t2=("t2", "sum"))
+        .reset_index()
+    )
+
+def sumar_estadisticos(acumulado, parcial):
+    if acumulado is None or acumulado.empty:
+        return parcial
+    if parcial.empty:
+        return acumulado
+    return (
+        pd.concat([acumulado, parcial])
+        .groupby(["tipo_proyecto", "industria"], as_index=False)[["n", "suma_t2"]]
+        .sum()
+    )
+
+def ajustar_b(estadisticos):
+    """
+    Tabla de b por segmento (incluye los niveles agregados con TODOS). Solo
+    entran los segmentos con al menos MIN_INCIDENTES_SEGMENTO incidentes.
+    """
+    if estadisticos is None or estadisticos.empty:
+        return {}
+    niveles = [
+        estadisticos,
+        estadisticos.assign(industria=TODOS),
+        estadisticos.assign(tipo_proyecto=TODOS),
+        estadisticos.assign(tipo_proyecto=TODOS, industria=TODOS),
+    ]
+    tabla = (
+        pd.concat(niveles)
+        .groupby(["tipo_proyecto", "industria"], as_index=False)[["n", "suma_t2"]]
+        .sum()
     )
+    tabla = tabla[(tabla["n"] >= MIN_INCIDENTES_SEGMENTO) & (tabla["suma_t2"] > 0)]
+    b = tabla["n"] / tabla["suma_t2"]
+    return {f"{tipo}|{industria}": float(valor) for tipo, industria, valor in zip(tabla["tipo_proyecto"], tabla["industria"], b)}
+
+def guardar_calibracion(calibracion, ruta=RUTA_CALIBRACION):
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(calibracion, f, indent=2, ensure_ascii=False)
+    os.replace(ruta + ".tmp", ruta)
+
+def cargar_calibracion(ruta=RUTA_CALIBRACION):
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            calibracion = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if "b" not in calibracion or calibracion.get("escala_t") != ESCALA_T:
+        return None
+    return calibracion
+
+def actualizar_calibracion(conn=None, ruta=RUTA_CALIBRACION, tam_bloque=50000):
+    """
+    Suma a la calibración guardada los incidentes nuevos del DW, reajusta b y la
+    guarda. conn es opcional (cualquier conexión DB-API). Regresa la calibración.
+    """
+    global _calibracion_actual
+    with _candado_calibracion:
+        anterior = cargar_calibracion(ruta) or {}
+        ultimo = int(anterior.get("ultimo_idIncidente", 0))
+        estadisticos = pd.DataFrame(anterior.get("estadisticos", []), columns=["tipo_proyecto", "industria", "n", "suma_t2"])
+
+        propia = conn is None
+        if propia:
+            conn = conectar_dw()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(CONSULTA_LLEGADAS.format(ultimo=ultimo))
+            columnas = [d[0] for d in cursor.description]
+            nuevos = 0
+            while True:
+                filas = cursor.fetchmany(tam_bloque)
+                if not filas:
+                    break
+                bloque = pd.DataFrame(filas, columns=columnas)
+                estadisticos = sumar_estadisticos(estadisticos, estadisticos_llegadas(bloque))
+                ultimo = max(ultimo, int(bloque["idIncidente"].max()))
+                nuevos += len(bloque)
+            cursor.close()
+        finally:
+            if propia:
+                conn.close()
+
+        if nuevos == 0 and anterior:
+            _calibracion_actual = anterior
+            return anterior
+
+        calibracion = {
+            "escala_t": ESCALA_T,
+            "ultimo_idIncidente": ultimo,
+            "actualizado": datetime.now().isoformat(timespec="seconds"),
+            "estadisticos": estadisticos.to_dict("records"),
+            "b": ajustar_b(estadisticos),
+        }
+        guardar_calibracion(calibracion, ruta)
+        _calibracion_actual = calibracion
+        print(f"Calibración de b actualizada con {nuevos} incidentes nuevos ({len(calibracion['b'])} segmentos)")
+        return calibracion
+
+def obtener_calibracion(ruta=RUTA_CALIBRACION):
+    """
+    Calibración en memoria (se lee del archivo una vez; no consulta el DW), o None
+    si no hay archivo. La ausencia también se recuerda: no se vuelve a buscar el
+    archivo en cada predicción, solo hasta actualizar_calibracion.
+    """
+    global _calibracion_actual
+    if _calibracion_actual is None:
+        _calibracion_actual = cargar_calibracion(ruta) or _SIN_CALIBRACION
+    return None if _calibracion_actual is _SIN_CALIBRACION else _calibracion_actual
+
+def b_segmento(tipo_proyecto=None, industria=None, calibracion=None):
+    """b ajustada para el segmento, con respaldo a niveles más generales."""
+    tabla = (calibracion or obtener_calibracion() or {}).get("b", {})
+    tipo = TODOS if tipo_proyecto is None else str(tipo_proyecto).strip()
+    ind = TODOS if industria is None else str(industria).strip()
+    for clave in (f"{tipo}|{ind}", f"{tipo}|{TODOS}", f"{TODOS}|{ind}", f"{TODOS}|{TODOS}"):
+        if clave in tabla:
+            return tabla[clave]
+    return B_DEFECTO
+
+def b_segmentos(tipos_proyecto, industrias, calibracion=None):
+    """b_segmento para arreglos: se resuelve una vez por par distinto."""
+    calibracion = calibracion or obtener_calibracion()
+    pares = pd.DataFrame({"tipo": tipos_proyecto, "industria": industrias})
+    grupos = pares.groupby(["tipo", "industria"], sort=False, dropna=False)
+    codigos = grupos.ngroup().to_numpy()
+    unicos = pares.drop_duplicates().to_numpy()
+    valores = np.array([
+        b_segmento(None if pd.isna(t) else t, None if pd.isna(i) else i, calibracion) for t, i in unicos
+    ])
+    return valores[codigos]
+
+# =========================================================================
+# SECCIÓN 5: CACHÉ DE PREDICCIONES (LRU CON CADUCIDAD)
+# =========================================================================
+# Los planeadores piden una y otra vez las mismas combinaciones (tareas, semanas).
+# calcular_riesgo guarda cada resultado con la llave (versión del modelo, tareas,
+# semanas, b): un reentrenamiento cambia la versión y con eso invalida lo anterior
+# aunque el caché venga de disco (persistir_cache_predicciones).
+
+TAM_CACHE_PREDICCIONES = 4096
+TTL_CACHE_PREDICCIONES_S = 24 * 3600
+RUTA_CACHE_PREDICCIONES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_predicciones.json")
+
+class CachePredicciones:
+    """
+    LRU acotado a tam_max entradas que además descarta las de más de ttl_s
+    segundos. Los valores se comparten entre llamadas: son de solo lectura.
+    """
+    def __init__(self, tam_max=TAM_CACHE_PREDICCIONES, ttl_s=TTL_CACHE_PREDICCIONES_S):
+        self.tam_max = tam_max
+        self.ttl_s = ttl_s
+        self._entradas = OrderedDict()  # clave -> (marca de tiempo, valor)
+        self._candado = threading.Lock()
+        self.contadores = {"aciertos": 0, "fallos": 0, "desalojos": 0, "caducadas": 0}
+
+    def _vigente(self, marca, ahora):
+        return self.ttl_s is None or ahora - marca < self.ttl_s
+
+    def obtener(self, clave, calcular):
+        """Valor guardado para clave, o calcular() (que se guarda) si no está o caducó."""
+        ahora = time.time()
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                if self._vigente(entrada[0], ahora):
+                    self._entradas.move_to_end(clave)
+                    self.contadores["aciertos"] += 1
+                    return entrada[1]
+                del self._entradas[clave]
+                self.contadores["caducadas"] += 1
+            self.contadores["fallos"] += 1
+
+        valor = calcular()
+        self._agregar(clave, ahora, valor)
+        return valor
+
+    def _agregar(self, clave, marca, valor):
+        with self._candado:
+            self._entradas[clave] = (marca, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.tam_max:
+                self._entradas.popitem(last=False)
+                self.contadores["desalojos"] += 1
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        with self._candado:
+            consultas = self.contadores["aciertos"] + self.contadores["fallos"]
+            return {
+                **self.contadores,
+                "entradas": len(self._entradas),
+                "tam_max": self.tam_max,
+                "tasa_aciertos": round(self.contadores["aciertos"] / consultas, 4) if consultas else None,
+            }
+
+    def guardar(self, ruta=RUTA_CACHE_PREDICCIONES):
+        # Del más viejo al más reciente, para que cargar conserve el orden LRU
+        with self._candado:
+            entradas = [[list(clave), marca, valor] for clave, (marca, valor) in self._entradas.items()]
+        with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(entradas, f)
+        os.replace(ruta + ".tmp", ruta)
+
+    def cargar(self, ruta=RUTA_CACHE_PREDICCIONES):
+        """Agrega las entradas vigentes del archivo; regresa cuántas se cargaron."""
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                entradas = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        ahora = time.time()
+        cargadas = 0
+        for clave, marca, valor in entradas:
+            if self._vigente(marca, ahora):
+                self._agregar(tuple(clave), marca, valor)
+                cargadas += 1
+        return cargadas
+
+_cache_predicciones = CachePredicciones()
+
+def version_modelo(modelo):
+    # Dos entrenamientos distintos nunca comparten versión (aunque el DW no cambie)
+    return f"{modelo.get('version_datos')}|{modelo.get('entrenado')}"
+
+def estadisticas_cache_predicciones():
+    """Aciertos, fallos, desalojos y caducadas del caché de calcular_riesgo."""
+    return _cache_predicciones.estadisticas()
+
+def persistir_cache_predicciones(ruta=RUTA_CACHE_PREDICCIONES):
+    """
+    Carga el caché guardado en ruta (si existe) y lo vuelve a guardar al terminar
+    el proceso, para que sobreviva reinicios. Regresa las entradas cargadas.
+    """
+    cargadas = _cache_predicciones.cargar(ruta)
+    atexit.register(_cache_predicciones.guardar, ruta)
+    return cargadas
+
+# =========================================================================
+# SECCIÓN 6: API/SCRIPT ENDPOINT (MODELO HÍBRIDO SIMPLIFICADO)
+# =========================================================================
+
+def calcular_riesgo(total_tareas, semanas, modelo=None, tipo_proyecto=None, industria=None):
+    """
+    Predicción de un proyecto como dict (la misma salida que predecir_riesgo_defecto
+    antes de serializar), o None si no hay modelo entrenado. Sin impresiones: es la
+    que usa servicio_prediccion.py. Pasa por el caché de predicciones.
+    """
+    modelo = modelo or obtener_modelo()
+    if modelo is None:
+        return None
+    b = b_segmento(tipo_proyecto, industria)
+
+    def calcular():
+        total_defects_pred = predecir_total_defectos(modelo, total_tareas, semanas)
+        return ModeloRayleighDistribucion(total_defects_pred, semanas, b)
+
+    clave = (version_modelo(modelo), float(total_tareas), float(semanas), float(b))
+    return _cache_predicciones.obtener(clave, calcular)
+
+def predecir_riesgo_defecto(total_tareas_nuevo, semanas_estimadas_nuevo, modelo=None, tipo_proyecto=None, industria=None):
+    """
+    Función API simplificada: predice el total de defectos basándose en Tareas/Semanas
+    y distribuye el riesgo con Rayleigh. Usa el modelo persistido (obtener_modelo)
+    en lugar de reentrenar con todo el histórico en cada llamada, y la b calibrada
+    para el segmento (tipo_proyecto / industria) si se indica.
+    """
+    print(f"Calculando predicción para proyecto nuevo (Tareas: {total_tareas_nuevo}, Semanas: {semanas_estimadas_nuevo})")
+    
+    # 1. Modelo ya entrenado (se carga una vez al inicio)
+    modelo = modelo or obtener_modelo()
+    
+    if modelo is None:
+        return json.dumps({"Error": "No se encontraron datos históricos para entrenar el modelo."}, indent=4)
     
+    # 2. PREDICCIÓN DEL TOTAL DE DEFECTOS Y DISTRIBUCIÓN RAYLEIGH (Cumplimiento del Requisito)
+    # calcular_riesgo ya trae el total (del caché si el escenario se repite)
+    resultado_modelo = calcular_riesgo(total_tareas_nuevo, semanas_estimadas_nuevo, modelo, tipo_proyecto, industria)
+
+    print(f"-> Regresión Lineal predijo un total de {resultado_modelo['Total_Defectos_Estimados']} defectos.")
+
     # Aquí iría la validación del Punto 5 (Control de Accesos)
     return json.dumps(resultado_modelo, indent=4)
 
 
 # =========================================================================
-# SECCIÓN 4: EJECUCIÓN DEL FLUJO COMPLETO (PRUEBA FINAL)
+# SECCIÓN 7: API POR LOTES (MUCHOS ESCENARIOS EN UNA SOLA LLAMADA)
+# =========================================================================
+# Para barrer miles de escenarios (tareas, semanas) sin un predecir_riesgo_defecto
+# por escenario: la regresión se aplica a todo el arreglo y las curvas salen de
+# distribuir_rayleigh_lote. Cada fila da exactamente lo mismo que
+# ModeloRayleighDistribucion.
+
+def predecir_riesgo_lote(tareas, semanas, modelo=None, formato="matriz", como_json=False, historic_b=None,
+                         tipo_proyecto=None, industria=None):
+    """
+    Predicción de muchos escenarios a la vez. tareas y semanas son arreglos del
+    mismo tamaño. formato="matriz" regresa un dict con Total_Defectos_Estimados,
+    Semanas y Curvas (matriz escenarios x semanas, rellena con 0); formato="largo"
+    regresa un DataFrame (Escenario, Semana, Defectos, Total_Defectos_Estimados).
+    como_json=True regresa el resultado serializado. historic_b puede ser un
+    escalar o un arreglo con la b de cada escenario; si no se da, se toma de la
+    calibración por segmento (tipo_proyecto / industria: escalares o arreglos).
+    Lanza ValueError si algún escenario trae tareas o semanas no finitas.
+    """
+    modelo = modelo or obtener_modelo()
+    if modelo is None:
+        raise RuntimeError("No se encontraron datos históricos para entrenar el modelo.")
+
+    tareas = np.asarray(tareas, dtype=float)
+    semanas_float = np.asarray(semanas, dtype=float)
+    if tareas.shape != semanas_float.shape:
+        raise ValueError("tareas y semanas deben tener el mismo tamaño")
+    # NaN o infinito se volverían INT64_MIN al convertir a entero
+    invalidos = np.flatnonzero(~(np.isfinite(tareas) & np.isfinite(semanas_float)))
+    if invalidos.size:
+        raise ValueError(f"tareas y semanas deben ser números finitos (escenarios {invalidos.tolist()})")
+
+    # Misma aritmética que predecir_total_defectos, sobre todo el arreglo
+    coef_tareas, coef_semanas = modelo["coeficientes"]
+    totales_pred = np.maximum(1.0, tareas * coef_tareas + semanas_float * coef_semanas + modelo["intercepto"])
+    totales = np.round(totales_pred).astype(np.int64)
+    semanas_int = np.maximum(semanas_float.astype(np.int64), 0)
+
+    if historic_b is None:
+        if np.ndim(tipo_proyecto) == 0 and np.ndim(industria) == 0:
+            historic_b = b_segmento(tipo_proyecto, industria)
+        else:
+            historic_b = b_segmentos(
+                np.broadcast_to(np.asarray(tipo_proyecto, dtype=object), totales.shape),
+                np.broadcast_to(np.asarray(industria, dtype=object), totales.shape),
+            )
+    curvas = distribuir_rayleigh_lote(totales, semanas_int, historic_b)
+
+    if formato == "largo":
+        escenario, semana = np.nonzero(np.arange(curvas.shape[1])[None, :] < semanas_int[:, None])
+        resultado = pd.DataFrame({
+            "Escenario": escenario,
+            "Semana": semana + 1,
+            "Defectos": curvas[escenario, semana],
+            "Total_Defectos_Estimados": totales[escenario],
+        })
+        return resultado.to_json(orient="records") if como_json else resultado
+
+    b = np.asarray(historic_b, dtype=float)
+    resultado = {
+        "Total_Defectos_Estimados": totales,
+        "Semanas": semanas_int,
+        "Curvas": curvas,
+        "Parametro_Rayleigh_b": float(b) if b.ndim == 0 else b,
+    }
+    if como_json:
+        return json.dumps({
+            "Total_Defectos_Estimados": totales.tolist(),
+            "Curvas_Riesgo_Rayleigh": [curva[:n].tolist() for curva, n in zip(curvas, semanas_int)],
+            "Parametro_Rayleigh_b": b.tolist(),
+        })
+    return resultado
+
+# =========================================================================
+# SECCIÓN 8: EJECUCIÓN DEL FLUJO COMPLETO (PRUEBA FINAL)
 # =========================================================================
 
 if __name__ == "__main__":
+    import sys
+
+    # --entrenar: reentrena aunque la versión del DW no haya cambiado
+    if "--entrenar" in sys.argv:
+        actualizar_modelo(forzar=True)
+        actualizar_calibracion()
     
     # No necesitamos el ID en la función, pero lo usamos para la etiqueta de la gráfica.
     NEW_PROJECT_TAG = "Nuevo_Proyecto_X" 
@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import subprocess
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# =========================================================================
+# INSTRUMENTACIÓN DEL ETL (TIEMPOS POR ETAPA, CONTADORES Y REPORTE JSON)
+# =========================================================================
+# En lugar de un print por incidente omitido, el ETL acumula en un
+# RegistroEjecucion: segundos y llamadas por etapa (extracción por result set,
+# índice, métricas, lookups, carga por tabla), filas por etapa y omitidos por
+# motivo. Al final se imprime un resumen corto y se guarda el reporte en JSON.
+# Todas las funciones del ETL aceptan registro=None, y entonces no miden nada.
+# Se puede usar desde varios hilos (extracción en paralelo); en ese caso los
+# segundos de etapas simultáneas se traslapan y los pct pueden sumar más de 100.
+#
+# Perfilado opcional: perfil="cprofile" (cProfile en el mismo proceso, guarda
+# el .prof y las funciones más costosas en el reporte) o perfil="py-spy"
+# (lanza py-spy record sobre este proceso si está instalado).
+
+CARPETA_REPORTES = os.path.dirname(os.path.abspath(__file__))
+
+# Ejemplos de omitidos que se guardan en el reporte (el resto solo se cuenta)
+MAX_EJEMPLOS_OMITIDOS = 20
+
+class RegistroEjecucion:
+    def __init__(self, proceso="etl_gestion", perfil=None, carpeta=None):
+        self.proceso = proceso
+        self.perfil = perfil
+        self.carpeta = carpeta or CARPETA_REPORTES
+        self.inicio = datetime.now()
+        self._reloj = time.perf_counter()
+        self.etapas = {}
+        self.filas = {}
+        self.omitidos = {}
+        self.ejemplos_omitidos = []
+        self.datos = {}
+        self._candado = threading.Lock()
+        self._perfilador = None
+        self._py_spy = None
+        self._archivo_perfil = None
+        if perfil == "cprofile":
+            import cProfile
+            self._perfilador = cProfile.Profile()
+            self._perfilador.enable()
+        elif perfil == "py-spy":
+            self._iniciar_py_spy()
+
+    # ------------------------- medición -------------------------
+
+    @contextmanager
+    def etapa(self, nombre):
+        """Suma el tiempo del bloque with a la etapa (se puede repetir por bloque de datos)."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            with self._candado:
+                acumulado = self.etapas.setdefault(nombre, {"s": 0.0, "llamadas": 0})
+                acumulado["s"] += segundos
+                acumulado["llamadas"] += 1
+
+    def contar(self, nombre, n):
+        with self._candado:
+            self.filas[nombre] = self.filas.get(nombre, 0) + int(n)
+
+    def registrar_omitidos(self, omitidos_df, motivos=None):
+        """Cuenta los omitidos por motivo y guarda unos cuantos ejemplos."""
+        if omitidos_df is None or omitidos_df.empty:
+            return
+        for motivo, n in omitidos_df["motivo"].value_counts().items():
+            self.omitidos[motivo] = self.omitidos.get(motivo, 0) + int(n)
+        faltan = MAX_EJEMPLOS_OMITIDOS - len(self.ejemplos_omitidos)
+        for om in omitidos_df.head(max(faltan, 0)).itertuples(index=False):
+            ejemplo = {"idIncidente": int(om.idIncidente), "Proyecto_idProyecto": int(om.Proyecto_idProyecto), "motivo": om.motivo}
+            if motivos:
+                ejemplo["mensaje"] = motivos[om.motivo].format(pid=om.Proyecto_idProyecto)
+            self.ejemplos_omitidos.append(ejemplo)
+
+    def anotar(self, **datos):
+        """Datos libres para el reporte (modo, watermark, tam_bloque...)."""
+        self.datos.update(datos)
+
+    # ------------------------- perfilado -------------------------
+
+    def _iniciar_py_spy(self):
+        ejecutable = shutil.which("py-spy")
+        if ejecutable is None:
+            print("py-spy no está instalado; se corre sin perfil.")
+            return
+        self._archivo_perfil = os.path.join(self.carpeta, f"perfil_{self.proceso}_{self.inicio:%Y%m%d_%H%M%S}.svg")
+        self._py_spy = subprocess.Popen(
+            [ejecutable, "record", "--pid", str(os.getpid()), "--output", self._archivo_perfil],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+    def _terminar_perfil(self, top=25):
+        if self._perfilador is not None:
+            import io
+            import pstats
+            self._perfilador.disable()
+            self._archivo_perfil = os.path.join(self.carpeta, f"perfil_{self.proceso}_{self.inicio:%Y%m%d_%H%M%S}.prof")
+            self._perfilador.dump_stats(self._archivo_perfil)
+            salida = io.StringIO()
+            pstats.Stats(self._perfilador, stream=salida).sort_stats("cumulative").print_stats(top)
+            self.datos["perfil_top"] = salida.getvalue().splitlines()
+            self._perfilador = None
+        if self._py_spy is not None:
+            # py-spy escribe el flamegraph al recibir SIGINT
+            self._py_spy.send_signal(signal.SIGINT)
+            try:
+                self._py_spy.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self._py_spy.kill()
+            self._py_spy = None
+
+    # ------------------------- reporte -------------------------
+
+    def reporte(self):
+        total = time.perf_counter() - self._reloj
+        etapas = {
+            nombre: {
+                "s": round(e["s"], 4),
+                "llamadas": e["llamadas"],
+                "pct": round(e["s"] / total * 100, 1) if total else None,
+            }
+            for nombre, e in sorted(self.etapas.items(), key=lambda par: -par[1]["s"])
+        }
+        reporte = {
+            "proceso": self.proceso,
+            "inicio": self.inicio.isoformat(timespec="seconds"),
+            "duracion_s": round(total, 3),
+            "etapas": etapas,
+            "filas": self.filas,
+            "omitidos": self.omitidos,
+            "ejemplos_omitidos": self.ejemplos_omitidos,
+            "perfil": self._archivo_perfil,
+            "python": sys.version.split()[0],
+            **self.datos,
+        }
+        try:
+            import resource
+            # ru_maxrss está en KB en Linux
+            reporte["memoria_max_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        except ImportError:
+            pass
+        return reporte
+
+    def terminar(self, ruta=None, imprimir=True):
+        """Detiene el perfil, imprime el resumen y guarda el reporte JSON. Regresa el reporte."""
+        self._terminar_perfil()
+        reporte = self.reporte()
+        ruta = ruta or os.path.join(self.carpeta, f"reporte_{self.proceso}_{self.inicio:%Y%m%d_%H%M%S}.json")
+        with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(ruta + ".tmp", ruta)
+        if imprimir:
+            imprimir_resumen(reporte)
+            print(f"Reporte de la ejecución en {ruta}")
+        return reporte
+
+def etapa(registro, nombre):
+    """registro.etapa(nombre), o un with que no hace nada si no hay registro."""
+    return registro.etapa(nombre) if registro is not None else nullcontext()
+
+def contar(registro, nombre, n):
+    if registro is not None:
+        registro.contar(nombre, n)
+
+def imprimir_resumen(reporte, top=10):
+    print(f"\n--- RESUMEN {reporte['proceso']}: {reporte['duracion_s']} s ---")
+    for nombre, e in list(reporte["etapas"].items())[:top]:
+        print(f"  {nombre:<40} {e['s']:>9.3f} s  {e['pct']:>5}%  ({e['llamadas']} llamadas)")
+    for motivo, n in reporte["omitidos"].items():
+        print(f"  [OMITIDOS] {motivo}: {n}")
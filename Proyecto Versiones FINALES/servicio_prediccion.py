@@ -0,0 +1,355 @@
+import asyncio
+import hashlib
+import http.client
+import json
+import math
+import queue
+import sqlite3
+import time
+from bisect import bisect_left
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+
+import modelo_rayleigh as mr
+
+# =========================================================================
+# SERVICIO HTTP DE PREDICCIÓN (API DE modelo_rayleigh.py)
+# =========================================================================
+# Servidor asyncio (solo biblioteca estándar) que deja el modelo, la calibración
+# de b y el pool de conexiones al DW cargados en memoria, para que la página
+# "Modelo de Predicción" no tenga que correr el script en cada consulta.
+#
+#   GET  /salud                         modelo cargado y su versión de datos
+#   GET  /predecir?tareas=35&semanas=12 predecir_riesgo_defecto (tipo_proyecto e
+#                                       industria opcionales); también POST con JSON
+#   POST /predecir_lote                 predecir_riesgo_lote con {"tareas": [...], "semanas": [...]}
+#   GET  /metricas                      histogramas de latencia por ruta, contadores y caché
+#   POST /recargar                      actualizar_modelo + actualizar_calibracion
+#
+# Las predicciones se calculan en un hilo (la primera puede entrenar el modelo
+# contra el DW) y las solicitudes idénticas que llegan mientras otra igual se
+# está calculando esperan ese mismo resultado en lugar de calcularlo otra vez.
+
+PUERTO = 8050
+
+# Límites superiores (ms) de las cubetas del histograma
+CUBETAS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000]
+
+class HistogramaLatencia:
+    """Cubetas fijas para el histograma y las últimas muestras para los percentiles."""
+    def __init__(self, muestras=10000):
+        self.cubetas = [0] * (len(CUBETAS_MS) + 1)
+        self.total = 0
+        self.suma_ms = 0.0
+        self.recientes = deque(maxlen=muestras)
+
+    def registrar(self, ms):
+        self.cubetas[bisect_left(CUBETAS_MS, ms)] += 1
+        self.total += 1
+        self.suma_ms += ms
+        self.recientes.append(ms)
+
+    def resumen(self):
+        ordenadas = sorted(self.recientes)
+        def percentil(p):
+            return round(ordenadas[min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))], 3) if ordenadas else None
+        etiquetas = [f"<={c}ms" for c in CUBETAS_MS] + [f">{CUBETAS_MS[-1]}ms"]
+        return {
+            "solicitudes": self.total,
+            "promedio_ms": round(self.suma_ms / self.total, 3) if self.total else None,
+            "p50_ms": percentil(50),
+            "p90_ms": percentil(90),
+            "p99_ms": percentil(99),
+            "cubetas": dict(zip(etiquetas, self.cubetas)),
+        }
+
+# =========================================================================
+# POOL SQLITE (DW LOCAL PARA PRUEBAS)
+# =========================================================================
+
+class _ConexionPool:
+    # close() regresa la conexión al pool, como las de MySQLConnectionPool
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def cursor(self):
+        return self._conn.cursor()
+
+    def close(self):
+        self._pool._libres.put(self._conn)
+
+class PoolSQLite:
+    """Pool mínimo de conexiones SQLite con la interfaz get_connection() de MySQLConnectionPool."""
+    def __init__(self, ruta, tam=mr.TAM_POOL_DW):
+        self._libres = queue.Queue()
+        for _ in range(tam):
+            self._libres.put(sqlite3.connect(ruta, check_same_thread=False))
+
+    def get_connection(self):
+        return _ConexionPool(self, self._libres.get())
+
+# =========================================================================
+# SERVICIO
+# =========================================================================
+
+class ErrorSolicitud(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+def _parametro(datos, nombre, tipo=None, requerido=True):
+    valor = datos.get(nombre)
+    if isinstance(valor, list):
+        valor = valor[0]
+    if valor is None:
+        if requerido:
+            raise ErrorSolicitud(400, f"Falta el parámetro '{nombre}'")
+        return None
+    if tipo is None:
+        return valor
+    try:
+        convertido = tipo(valor)
+    except (TypeError, ValueError, OverflowError):
+        raise ErrorSolicitud(400, f"Parámetro '{nombre}' inválido: {valor}")
+    # float("nan") e "inf" se convierten sin error pero no son una predicción válida
+    if isinstance(convertido, float) and not math.isfinite(convertido):
+        raise ErrorSolicitud(400, f"Parámetro '{nombre}' inválido: {valor}")
+    return convertido
+
+def _cuerpo_json(cuerpo):
+    try:
+        datos = json.loads(cuerpo)
+    except ValueError:
+        raise ErrorSolicitud(400, "El cuerpo debe ser JSON")
+    if not isinstance(datos, dict):
+        raise ErrorSolicitud(400, "El cuerpo debe ser un objeto JSON")
+    return datos
+
+class ServicioPrediccion:
+    def __init__(self):
+        self.rutas = {
+            ("GET", "/salud"): self.salud,
+            ("GET", "/predecir"): self.predecir,
+            ("POST", "/predecir"): self.predecir,
+            ("POST", "/predecir_lote"): self.predecir_lote,
+            ("GET", "/metricas"): self.metricas,
+            ("POST", "/recargar"): self.recargar,
+        }
+        self.latencias = {ruta: HistogramaLatencia() for _, ruta in self.rutas}
+        self.contadores = {"solicitudes": 0, "coalescidas": 0, "errores": 0}
+        self._en_vuelo = {}
+
+    def calentar(self):
+        """Carga modelo y calibración y hace una predicción para dejar todo en memoria."""
+        modelo = mr.obtener_modelo()
+        mr.obtener_calibracion()
+        if modelo is not None:
+            mr.calcular_riesgo(10, 10, modelo)
+        return modelo
+
+    async def _coalescer(self, clave, calcular, en_hilo=False):
+        # Si ya hay una solicitud idéntica en curso se espera su resultado
+        loop = asyncio.get_running_loop()
+        futuro = self._en_vuelo.get(clave)
+        if futuro is not None:
+            self.contadores["coalescidas"] += 1
+            return await asyncio.shield(futuro)
+
+        futuro = loop.create_future()
+        self._en_vuelo[clave] = futuro
+        try:
+            resultado = await loop.run_in_executor(None, calcular) if en_hilo else calcular()
+            futuro.set_result(resultado)
+            return resultado
+        except BaseException as e:
+            # También si se cancela esta solicitud: las que esperan no deben quedarse colgadas
+            if isinstance(e, asyncio.CancelledError):
+                e = ErrorSolicitud(503, "Se canceló la solicitud idéntica que calculaba este resultado")
+            futuro.set_exception(e)
+            futuro.exception()  # marcado como leído si nadie más lo esperaba
+            raise
+        finally:
+            del self._en_vuelo[clave]
+
+    # ------------------------- rutas -------------------------
+
+    async def salud(self, consulta, cuerpo):
+        modelo = mr.obtener_modelo()
+        return 200, {
+            "modelo_cargado": modelo is not None,
+            "version_datos": modelo.get("version_datos") if modelo else None,
+            "calibracion_cargada": mr.obtener_calibracion() is not None,
+        }
+
+    async def predecir(self, consulta, cuerpo):
+        datos = _cuerpo_json(cuerpo) if cuerpo else consulta
+        tareas = _parametro(datos, "tareas", float)
+        semanas = _parametro(datos, "semanas", int)
+        tipo = _parametro(datos, "tipo_proyecto", requerido=False)
+        industria = _parametro(datos, "industria", requerido=False)
+
+        # En un hilo: sin modelo entrenado, obtener_modelo consulta el DW
+        resultado = await self._coalescer(
+            ("predecir", tareas, semanas, tipo, industria),
+            lambda: mr.calcular_riesgo(tareas, semanas, tipo_proyecto=tipo, industria=industria),
+            en_hilo=True,
+        )
+        if resultado is None:
+            raise ErrorSolicitud(503, "No se encontraron datos históricos para entrenar el modelo.")
+        return 200, resultado
+
+    async def predecir_lote(self, consulta, cuerpo):
+        datos = _cuerpo_json(cuerpo or b"{}")
+        tareas = datos.get("tareas")
+        semanas = datos.get("semanas")
+        if not isinstance(tareas, list) or not isinstance(semanas, list) or len(tareas) != len(semanas):
+            raise ErrorSolicitud(400, "tareas y semanas deben ser listas del mismo tamaño")
+
+        def calcular():
+            return mr.predecir_riesgo_lote(
+                tareas, semanas, como_json=True,
+                tipo_proyecto=datos.get("tipo_proyecto"), industria=datos.get("industria")
+            )
+
+        # Los lotes pueden tardar: se calculan en un hilo para no detener las demás solicitudes
+        try:
+            texto = await self._coalescer(("lote", hashlib.sha1(cuerpo).hexdigest()), calcular, en_hilo=True)
+        except (TypeError, ValueError) as e:
+            # Escenarios que no son números finitos
+            raise ErrorSolicitud(400, f"Lote inválido: {e}")
+        return 200, texto
+
+    async def metricas(self, consulta, cuerpo):
+        return 200, {
+            "contadores": self.contadores,
+            "cache_predicciones": mr.estadisticas_cache_predicciones(),
+            "latencias": {ruta: h.resumen() for ruta, h in self.latencias.items()},
+        }
+
+    async def recargar(self, consulta, cuerpo):
+        loop = asyncio.get_running_loop()
+        modelo, reentrenado = await loop.run_in_executor(None, mr.actualizar_modelo)
+        await loop.run_in_executor(None, mr.actualizar_calibracion)
+        return 200, {"reentrenado": reentrenado, "version_datos": modelo.get("version_datos") if modelo else None}
+
+    # ------------------------- HTTP -------------------------
+
+    async def atender(self, reader, writer):
+        # Una conexión puede traer varias solicitudes (keep-alive)
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                inicio = time.perf_counter()
+                try:
+                    metodo, destino, version = linea.decode("latin-1").split()
+                except ValueError:
+                    break
+                encabezados = {}
+                while True:
+                    linea = await reader.readline()
+                    if linea in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = linea.decode("latin-1").partition(":")
+                    encabezados[nombre.strip().lower()] = valor.strip()
+                largo = int(encabezados.get("content-length", 0) or 0)
+                cuerpo = await reader.readexactly(largo) if largo else b""
+
+                partes = urlsplit(destino)
+                estado, respuesta = await self.despachar(metodo, partes.path, parse_qs(partes.query), cuerpo)
+                datos = (respuesta if isinstance(respuesta, str) else json.dumps(respuesta)).encode("utf-8")
+
+                cerrar = encabezados.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+                writer.write(
+                    f"HTTP/1.1 {estado} {http.client.responses.get(estado, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(datos)}\r\n"
+                    f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n".encode("latin-1") + datos
+                )
+                await writer.drain()
+                if partes.path in self.latencias:
+                    self.latencias[partes.path].registrar((time.perf_counter() - inicio) * 1000)
+                if cerrar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def despachar(self, metodo, ruta, consulta, cuerpo):
+        self.contadores["solicitudes"] += 1
+        manejador = self.rutas.get((metodo, ruta))
+        if manejador is None:
+            return 404, {"Error": f"Ruta no encontrada: {metodo} {ruta}"}
+        try:
+            return await manejador(consulta, cuerpo)
+        except ErrorSolicitud as e:
+            self.contadores["errores"] += 1
+            return e.estado, {"Error": str(e)}
+        except Exception as e:
+            self.contadores["errores"] += 1
+            return 500, {"Error": f"{type(e).__name__}: {e}"}
+
+async def iniciar_servicio(host="127.0.0.1", puerto=PUERTO, servicio=None):
+    """Arranca el servidor (ya con el modelo en memoria) y lo regresa junto con el servicio."""
+    servicio = servicio or ServicioPrediccion()
+    await asyncio.get_running_loop().run_in_executor(None, servicio.calentar)
+    servidor = await asyncio.start_server(servicio.atender, host, puerto)
+    return servidor, servicio
+
+# =========================================================================
+# CLIENTE (PARA LA PÁGINA DE STREAMLIT Y LOS BENCHMARKS)
+# =========================================================================
+
+class ClientePrediccion:
+    """Cliente con una conexión keep-alive al servicio."""
+    def __init__(self, host="127.0.0.1", puerto=PUERTO, timeout=5):
+        self._conn = http.client.HTTPConnection(host, puerto, timeout=timeout)
+
+    def _pedir(self, metodo, ruta, datos=None):
+        cuerpo = json.dumps(datos) if datos is not None else None
+        self._conn.request(metodo, ruta, body=cuerpo, headers={"Content-Type": "application/json"} if cuerpo else {})
+        respuesta = self._conn.getresponse()
+        return respuesta.status, json.loads(respuesta.read())
+
+    def predecir(self, tareas, semanas, tipo_proyecto=None, industria=None):
+        datos = {"tareas": tareas, "semanas": semanas, "tipo_proyecto": tipo_proyecto, "industria": industria}
+        return self._pedir("POST", "/predecir", datos)
+
+    def predecir_lote(self, tareas, semanas, **kwargs):
+        return self._pedir("POST", "/predecir_lote", {"tareas": list(tareas), "semanas": list(semanas), **kwargs})
+
+    def metricas(self):
+        return self._pedir("GET", "/metricas")
+
+    def cerrar(self):
+        self._conn.close()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servicio HTTP de predicción de defectos")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--sqlite", default=None, help="Ruta de un DW SQLite en lugar de MySQL (db_soporte)")
+    parser.add_argument("--reentrenar-cada", type=int, default=3600, help="Segundos entre revisiones del DW (0 = nunca)")
+    parser.add_argument("--cache-disco", action="store_true", help="Conservar el caché de predicciones entre reinicios")
+    args = parser.parse_args()
+
+    if args.cache_disco:
+        print(f"Caché de predicciones: {mr.persistir_cache_predicciones()} entradas cargadas")
+
+    if args.sqlite:
+        mr.usar_pool(PoolSQLite(args.sqlite))
+    if args.reentrenar_cada:
+        mr.programar_reentrenamiento(args.reentrenar_cada)
+
+    async def principal():
+        servidor, _ = await iniciar_servicio(args.host, args.puerto)
+        print(f"Servicio de predicción en http://{args.host}:{args.puerto}")
+        async with servidor:
+            await servidor.serve_forever()
+
+    asyncio.run(principal())
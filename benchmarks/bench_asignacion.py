@@ -0,0 +1,87 @@
+"""
+Microbenchmark de la resolución empleado/equipo por incidente.
+
+Para varios tamaños de asignacion_tarea mide el costo por incidente de:
+  - original: get_empleado_y_equipo con dos filtros booleanos sobre asignacion_df
+  - indice:   get_empleado_y_equipo sobre construir_indice_asignacion (O(1))
+  - conjunto: resolver_asignaciones para todos los incidentes a la vez
+El costo por incidente del índice debe mantenerse plano al crecer la tabla.
+
+Uso:
+    python benchmarks/bench_asignacion.py --asignaciones 1000 10000 100000 1000000
+"""
+import argparse
+import json
+
+import numpy as np
+
+from comun import medir, generar_oltp
+from etl_dw import (
+    safe_index, strict_lookup, construir_indice_asignacion, resolver_asignaciones, get_empleado_y_equipo,
+)
+
+def _original(asignacion_df, empleado_by_id, equipo_by_id):
+    def get_empleado_y_equipo_original(pid, tid):
+        if asignacion_df.empty: return None, None
+        if tid and tid != 0:
+            match = asignacion_df[(asignacion_df["Proyecto_idProyecto"] == pid) & (asignacion_df["Tarea_idTarea"] == tid)]
+            if not match.empty:
+                emp = strict_lookup(empleado_by_id, match.iloc[0]["Empleado_idEmpleado"])
+                if emp is not None:
+                    eq = strict_lookup(equipo_by_id, emp["Equipo_idEquipo"])
+                    if eq is not None: return emp, eq
+        match_proy = asignacion_df[asignacion_df["Proyecto_idProyecto"] == pid]
+        if not match_proy.empty:
+            emp = strict_lookup(empleado_by_id, match_proy.iloc[0]["Empleado_idEmpleado"])
+            if emp is not None:
+                eq = strict_lookup(equipo_by_id, emp["Equipo_idEquipo"])
+                if eq is not None: return None, eq
+        return None, None
+    return get_empleado_y_equipo_original
+
+def correr(tamanos, n_consultas, n_consultas_original, semilla=7):
+    resultados = []
+    for n in tamanos:
+        _, equipo_df, empleado_df, _, _, _, asignacion_df, _ = generar_oltp(n, semilla)
+        empleado_by_id = safe_index(empleado_df, "idEmpleado")
+        equipo_by_id = safe_index(equipo_df, "idEquipo")
+
+        # La mitad de las consultas coinciden con una asignación (proyecto, tarea)
+        rng = np.random.default_rng(semilla)
+        filas = rng.integers(0, len(asignacion_df), n_consultas)
+        pids = asignacion_df["Proyecto_idProyecto"].to_numpy()[filas]
+        tids = asignacion_df["Tarea_idTarea"].to_numpy()[filas].astype(float)
+        tids[::2] = -1
+
+        indice, t_indice = medir(construir_indice_asignacion, asignacion_df, empleado_by_id, equipo_by_id)
+        get_empleado_y_equipo(indice, pids[0], tids[0])  # construye la vista en dicts
+
+        _, t_dict = medir(lambda: [get_empleado_y_equipo(indice, p, t) for p, t in zip(pids, tids)], repeticiones=3)
+        _, t_conj = medir(resolver_asignaciones, indice, pids, tids, repeticiones=3)
+        original = _original(asignacion_df, empleado_by_id, equipo_by_id)
+        m = min(n_consultas_original, n_consultas)
+        _, t_orig = medir(lambda: [original(p, t) for p, t in zip(pids[:m], tids[:m])])
+
+        fila = {
+            "asignaciones": n,
+            "construir_indice_s": round(t_indice, 4),
+            "us_por_incidente_original": round(t_orig / m * 1e6, 2),
+            "us_por_incidente_indice": round(t_dict / n_consultas * 1e6, 3),
+            "us_por_incidente_conjunto": round(t_conj / n_consultas * 1e6, 3),
+        }
+        print(json.dumps(fila))
+        resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--asignaciones", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--consultas", type=int, default=100000)
+    parser.add_argument("--consultas-original", type=int, default=200)
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.asignaciones, args.consultas, args.consultas_original)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
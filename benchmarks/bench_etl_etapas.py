@@ -0,0 +1,132 @@
+"""
+Qué etapa domina el ETL conforme crece el OLTP.
+
+Para varios tamaños de incidente/asignacion_tarea vuelca datos sintéticos en un
+OLTP SQLite y corre el ETL por bloques (el flujo de ETL_Version_Final.ipynb)
+con un registro_etl.RegistroEjecucion. Imprime las etapas más costosas de cada
+tamaño (extracción por result set, parciales, métricas, índice de asignación,
+lookups, carga por tabla) y compara el tiempo total contra la misma corrida sin
+registro, para ver lo que cuesta la instrumentación. También verifica que con y
+sin registro el DW queda igual.
+
+Resultado de referencia (--tam-bloque 20000):
+    20000 incidentes:   sin registro 0.79 s  con registro 0.78 s
+        transformacion.lookups 13%  extraccion.asignacion_tarea 12%  extraccion.incidente 12%
+    100000 incidentes:  sin registro 4.32 s  con registro 4.35 s
+        transformacion.lookups 19%  extraccion.asignacion_tarea 14%  extraccion.tarea 11%
+Las filas de carga.<tabla> son las enviadas (las dimensiones se reenvían por bloque).
+
+Uso:
+    python benchmarks/bench_etl_etapas.py --tamanos 20000 100000 --tam-bloque 20000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+from comun import generar_oltp, crear_oltp_sqlite, crear_dw_sqlite, contar_filas
+from etl_dw import (
+    COLUMNAS_DW, safe_index, parciales_asignacion, parciales_incidente,
+    sumar_parciales, metricas_desde_parciales, acumular_primeras_asignaciones,
+    construir_indice_asignacion, cargar_incidentes_por_bloques,
+)
+from extraccion_oltp import bloques_tabla, extraer_tabla
+from registro_etl import RegistroEjecucion, etapa
+from bench_extraccion import CERRADOS, _dw_equivalente
+
+# =========================================================================
+# ETL POR BLOQUES CON REGISTRO (MISMO FLUJO QUE EL NOTEBOOK)
+# =========================================================================
+
+def etl_registrado(oltp, cursor_dw, tam_bloque, registro=None):
+    cliente_df = extraer_tabla(oltp, "cliente", registro=registro)
+    equipo_df = extraer_tabla(oltp, "equipo", registro=registro)
+    empleado_df = extraer_tabla(oltp, "empleado", registro=registro)
+    proyecto_df = extraer_tabla(oltp, "proyecto", registro=registro)
+    tarea_df = extraer_tabla(oltp, "tarea", registro=registro)
+
+    parciales_asig, primeras_asig = None, None
+    for bloque in bloques_tabla(oltp, "asignacion_tarea", tam_bloque=tam_bloque, registro=registro):
+        with etapa(registro, "transformacion.parciales_asignacion"):
+            parciales_asig = sumar_parciales(parciales_asig, parciales_asignacion(bloque, tarea_df))
+            primeras_asig = acumular_primeras_asignaciones(primeras_asig, bloque)
+    parciales_inc = None
+    for bloque in bloques_tabla(oltp, "costos_incidente", tam_bloque=tam_bloque, registro=registro):
+        with etapa(registro, "transformacion.parciales_incidente"):
+            parciales_inc = sumar_parciales(parciales_inc, parciales_incidente(bloque))
+
+    proyecto_df = proyecto_df[proyecto_df["Estado"].isin(CERRADOS)]
+    validos = set(proyecto_df["idProyecto"])
+    with etapa(registro, "transformacion.metricas"):
+        metricas = metricas_desde_parciales(list(validos), parciales_asig, parciales_inc)
+    with etapa(registro, "transformacion.indice_asignacion"):
+        indice = construir_indice_asignacion(primeras_asig, safe_index(empleado_df, "idEmpleado"), safe_index(equipo_df, "idEquipo"))
+
+    incidentes = (
+        b[b["Proyecto_idProyecto"].isin(validos)]
+        for b in bloques_tabla(oltp, "incidente", tam_bloque=tam_bloque, registro=registro)
+    )
+    enviados, _ = cargar_incidentes_por_bloques(
+        cursor_dw, incidentes, cliente_df, equipo_df, empleado_df, proyecto_df, tarea_df,
+        metricas, indice, dialecto="sqlite", registro=registro
+    )
+    return enviados
+
+def _correr_una(ruta, tam_bloque, registro):
+    oltp = sqlite3.connect(ruta)
+    dw = crear_dw_sqlite()
+    inicio = time.perf_counter()
+    etl_registrado(oltp, dw.cursor(), tam_bloque, registro)
+    dw.commit()
+    segundos = time.perf_counter() - inicio
+    oltp.close()
+    return dw, segundos
+
+# =========================================================================
+# COMPARACIÓN
+# =========================================================================
+
+def correr(tamanos, tam_bloque, top=6, semilla=42):
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        for n in tamanos:
+            ruta = os.path.join(carpeta, f"oltp_{n}.db")
+            crear_oltp_sqlite(ruta, generar_oltp(n, semilla)).close()
+
+            dw_sin, t_sin = _correr_una(ruta, tam_bloque, None)
+            registro = RegistroEjecucion(f"bench_{n}", carpeta=carpeta)
+            dw_con, t_con = _correr_una(ruta, tam_bloque, registro)
+            reporte = registro.terminar(imprimir=False)
+
+            fila = {
+                "incidentes": n,
+                "tam_bloque": tam_bloque,
+                "sin_registro_s": round(t_sin, 3),
+                "con_registro_s": round(t_con, 3),
+                "sobrecosto_pct": round((t_con - t_sin) / t_sin * 100, 1),
+                "etapas_top": {nombre: e["pct"] for nombre, e in list(reporte["etapas"].items())[:top]},
+                "filas": reporte["filas"],
+                "omitidos": reporte["omitidos"],
+                "filas_dw": contar_filas(dw_con, COLUMNAS_DW),
+                "dw_identico": _dw_equivalente(dw_sin, dw_con),
+            }
+            dw_sin.close()
+            dw_con.close()
+            print(json.dumps(fila, ensure_ascii=False))
+            resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--tam-bloque", type=int, default=20000)
+    parser.add_argument("--top", type=int, default=6, help="Etapas a mostrar por tamaño")
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.tamanos, args.tam_bloque, args.top)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,132 @@
+"""
+Exportación del DW: consultas en serie (una conexión) vs en paralelo.
+
+Crea un DW SQLite en archivo (comun.dw_sintetico) y exporta las consultas
+de datos_dashboard.CONSULTAS_EXPORTACION a CSV + Parquet:
+  - serie:      exportar_tabla una tras otra sobre la misma conexión (como antes
+                en Export_to_csvs.ipynb)
+  - paralelo_N: datos_dashboard.exportar_tablas con max_concurrencia N (una
+                conexión por consulta)
+y verifica que los CSV de cada forma son idénticos a los de la serie.
+
+SQLite local responde casi sin espera, así que el paralelismo aquí solo
+traslapa lo que suelta el GIL. Para acercarse a un DW remoto (el servidor tarda
+en resolver la consulta y cada bloque es un viaje de red) --latencia-ms agrega
+esa espera al execute y a cada fetchmany de la conexión.
+
+Resultado de referencia (20000 incidentes, --tam-bloque 5000):
+    --latencia-ms 0:    serie 0.16 s   paralelo_2 0.13 s   paralelo_4 0.15 s
+    --latencia-ms 200:  serie 2.76 s   paralelo_2 1.61 s   paralelo_4 0.95 s   (consulta más lenta 0.91 s)
+
+Uso:
+    python benchmarks/bench_exportacion.py --incidentes 20000 --concurrencia 2 4 --latencia-ms 0 200
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import warnings
+
+from comun import medir, dw_sintetico
+from datos_dashboard import CONSULTAS_EXPORTACION, ARCHIVOS, exportar_tabla, exportar_tablas, hash_archivo
+
+# pandas avisa que la conexión envuelta no es sqlite3 ni SQLAlchemy; funciona igual por DBAPI2
+warnings.filterwarnings("ignore", message="pandas only supports SQLAlchemy")
+
+# =========================================================================
+# CONEXIÓN CON LATENCIA SIMULADA
+# =========================================================================
+
+class _CursorLento:
+    def __init__(self, cursor, latencia):
+        self._cursor = cursor
+        self._latencia = latencia
+
+    def execute(self, *args):
+        time.sleep(self._latencia)
+        return self._cursor.execute(*args)
+
+    def fetchmany(self, n):
+        time.sleep(self._latencia)
+        return self._cursor.fetchmany(n)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+class ConexionLenta:
+    """Conexión SQLite que espera latencia segundos en cada execute y cada fetchmany."""
+    def __init__(self, ruta, latencia):
+        self._conn = sqlite3.connect(ruta, check_same_thread=False)
+        self._latencia = latencia
+
+    def cursor(self):
+        return _CursorLento(self._conn.cursor(), self._latencia)
+
+    def __getattr__(self, nombre):
+        return getattr(self._conn, nombre)
+
+# =========================================================================
+# COMPARACIÓN
+# =========================================================================
+
+def _exportar_serie(conectar, carpeta, tam_bloque):
+    conn = conectar()
+    filas = {tabla: exportar_tabla(conn, tabla, carpeta, tam_bloque) for tabla in CONSULTAS_EXPORTACION}
+    conn.close()
+    return filas
+
+def _hashes(carpeta):
+    return {tabla: hash_archivo(os.path.join(carpeta, f"{archivo}.csv")) for tabla, archivo in ARCHIVOS.items()}
+
+def correr(n_incidentes, concurrencias, latencias_ms, tam_bloque, semilla=42):
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "dw.db")
+        dw_sintetico(n_incidentes, semilla, ruta=ruta).close()
+        for latencia_ms in latencias_ms:
+            conectar = lambda: ConexionLenta(ruta, latencia_ms / 1000)
+            fila = {"incidentes": n_incidentes, "latencia_ms": latencia_ms, "tam_bloque": tam_bloque}
+
+            destino = os.path.join(carpeta, f"serie_{latencia_ms}")
+            os.makedirs(destino)
+            filas, t_serie = medir(_exportar_serie, conectar, destino, tam_bloque)
+            referencia = _hashes(destino)
+            fila["filas"] = filas
+            fila["serie_s"] = round(t_serie, 3)
+
+            # Consulta más lenta por sí sola: el mínimo al que puede llegar el paralelo
+            lentas = []
+            for tabla in CONSULTAS_EXPORTACION:
+                conn = conectar()
+                _, t = medir(exportar_tabla, conn, tabla, destino, tam_bloque)
+                conn.close()
+                lentas.append(t)
+            fila["consulta_mas_lenta_s"] = round(max(lentas), 3)
+
+            identicos = True
+            for n in concurrencias:
+                destino = os.path.join(carpeta, f"paralelo_{n}_{latencia_ms}")
+                os.makedirs(destino)
+                _, t = medir(exportar_tablas, conectar, None, destino, n, tam_bloque)
+                fila[f"paralelo_{n}_s"] = round(t, 3)
+                identicos = identicos and _hashes(destino) == referencia
+            fila["csv_identicos"] = identicos
+            print(json.dumps(fila, ensure_ascii=False))
+            resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incidentes", type=int, default=20000)
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--latencia-ms", type=float, nargs="+", default=[0, 200])
+    parser.add_argument("--tam-bloque", type=int, default=5000)
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.incidentes, args.concurrencia, args.latencia_ms, args.tam_bloque)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
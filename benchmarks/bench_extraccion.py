@@ -0,0 +1,148 @@
+"""
+Perfil de memoria de la extracción del OLTP.
+
+Para varios tamaños de incidente/asignacion_tarea vuelca datos sintéticos en un
+OLTP SQLite y corre el ETL completo (extracción + transformación + carga a un
+DW SQLite) de dos formas:
+  - fetchall: cada tabla completa a un DataFrame (como callproc + fetchall)
+  - bloques:  extraccion_oltp.leer_por_bloques + cargar_incidentes_por_bloques
+Reporta el pico de memoria de Python (tracemalloc) y el tiempo de cada una, y
+verifica que ambas dejan el mismo contenido en el DW. Por bloques el pico ya no
+crece con incidente/asignacion_tarea sino con los catálogos que sí se leen
+completos (proyecto, tarea) y con el índice de primeras asignaciones.
+
+Resultado de referencia (--tam-bloque 20000, pico de tracemalloc):
+    100000 incidentes:  fetchall  56.9 MB   bloques 37.4 MB
+    400000 incidentes:  fetchall 226.1 MB   bloques 92.6 MB
+
+Uso:
+    python benchmarks/bench_extraccion.py --tamanos 20000 100000 400000 --tam-bloque 20000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from comun import generar_oltp, crear_oltp_sqlite, crear_dw_sqlite, contar_filas
+from etl_dw import (
+    COLUMNAS_DW, safe_index, calcular_metricas_proyectos, construir_tablas_dw, cargar_tablas_dw,
+    parciales_asignacion, parciales_incidente, sumar_parciales, metricas_desde_parciales,
+    acumular_primeras_asignaciones, construir_indice_asignacion, cargar_incidentes_por_bloques,
+)
+from extraccion_oltp import CONSULTAS_OLTP, bloques_tabla, extraer_tabla
+
+CERRADOS = ["FINALIZADO", "CANCELADO"]
+
+def etl_fetchall(oltp, cursor_dw):
+    datos = {}
+    for tabla in ("cliente", "equipo", "empleado", "proyecto", "tarea", "asignacion_tarea", "incidente"):
+        cur = oltp.execute(CONSULTAS_OLTP["completa"][tabla])
+        datos[tabla] = pd.DataFrame(cur.fetchall(), columns=[d[0] for d in cur.description])
+    proyecto_df = datos["proyecto"][datos["proyecto"]["Estado"].isin(CERRADOS)]
+    incidente_df = datos["incidente"][datos["incidente"]["Proyecto_idProyecto"].isin(set(proyecto_df["idProyecto"]))]
+    metricas = calcular_metricas_proyectos(proyecto_df, datos["tarea"], datos["asignacion_tarea"], incidente_df)
+    tablas, _ = construir_tablas_dw(
+        datos["cliente"], datos["equipo"], datos["empleado"], proyecto_df, datos["tarea"],
+        datos["asignacion_tarea"], incidente_df, metricas=metricas
+    )
+    return cargar_tablas_dw(cursor_dw, tablas, dialecto="sqlite")
+
+def etl_por_bloques(oltp, cursor_dw, tam_bloque):
+    # Mismo flujo que ETL_Version_Final.ipynb
+    cliente_df = extraer_tabla(oltp, "cliente")
+    equipo_df = extraer_tabla(oltp, "equipo")
+    empleado_df = extraer_tabla(oltp, "empleado")
+    proyecto_df = extraer_tabla(oltp, "proyecto")
+    tarea_df = extraer_tabla(oltp, "tarea")
+
+    parciales_asig, primeras_asig = None, None
+    for bloque in bloques_tabla(oltp, "asignacion_tarea", tam_bloque=tam_bloque):
+        parciales_asig = sumar_parciales(parciales_asig, parciales_asignacion(bloque, tarea_df))
+        primeras_asig = acumular_primeras_asignaciones(primeras_asig, bloque)
+    parciales_inc = None
+    for bloque in bloques_tabla(oltp, "costos_incidente", tam_bloque=tam_bloque):
+        parciales_inc = sumar_parciales(parciales_inc, parciales_incidente(bloque))
+
+    proyecto_df = proyecto_df[proyecto_df["Estado"].isin(CERRADOS)]
+    validos = set(proyecto_df["idProyecto"])
+    metricas = metricas_desde_parciales(list(validos), parciales_asig, parciales_inc)
+    indice = construir_indice_asignacion(primeras_asig, safe_index(empleado_df, "idEmpleado"), safe_index(equipo_df, "idEquipo"))
+
+    incidentes = (
+        b[b["Proyecto_idProyecto"].isin(validos)]
+        for b in bloques_tabla(oltp, "incidente", tam_bloque=tam_bloque)
+    )
+    enviados, _ = cargar_incidentes_por_bloques(
+        cursor_dw, incidentes, cliente_df, equipo_df, empleado_df, proyecto_df, tarea_df,
+        metricas, indice, dialecto="sqlite"
+    )
+    return enviados
+
+def _perfilar(fn, *args):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    fn(*args)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico / 2**20, segundos
+
+def _volcado(conn):
+    # Las fechas llegan como texto en fetchall y como datetime64 por bloques: se comparan como fecha
+    tablas = {}
+    for t in COLUMNAS_DW:
+        df = pd.read_sql(f"SELECT * FROM {t} ORDER BY 1", conn)
+        for col in df.columns:
+            if col.startswith("fecha_"):
+                df[col] = pd.to_datetime(df[col], errors="coerce", format="mixed")
+        tablas[t] = df
+    return tablas
+
+def _dw_equivalente(conn_a, conn_b):
+    for a, b in zip(_volcado(conn_a).values(), _volcado(conn_b).values()):
+        try:
+            pd.testing.assert_frame_equal(a, b, check_exact=False, rtol=1e-9)
+        except AssertionError:
+            return False
+    return True
+
+def correr(tamanos, tam_bloque, semilla=42):
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        for n in tamanos:
+            ruta = os.path.join(carpeta, f"oltp_{n}.db")
+            crear_oltp_sqlite(ruta, generar_oltp(n, semilla)).close()
+
+            dws = {}
+            fila = {"incidentes": n, "asignaciones": n, "tam_bloque": tam_bloque}
+            for nombre, fn, extra in (("fetchall", etl_fetchall, ()), ("bloques", etl_por_bloques, (tam_bloque,))):
+                oltp = sqlite3.connect(ruta)
+                dw = crear_dw_sqlite()
+                pico_mb, segundos = _perfilar(fn, oltp, dw.cursor(), *extra)
+                dw.commit()
+                oltp.close()
+                dws[nombre] = dw
+                fila[f"{nombre}_pico_mb"] = round(pico_mb, 1)
+                fila[f"{nombre}_s"] = round(segundos, 3)
+            fila["filas_dw"] = contar_filas(dws["bloques"], COLUMNAS_DW)
+            fila["dw_identico"] = _dw_equivalente(dws["fetchall"], dws["bloques"])
+            print(json.dumps(fila, ensure_ascii=False))
+            resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[20000, 100000, 400000])
+    parser.add_argument("--tam-bloque", type=int, default=20000)
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.tamanos, args.tam_bloque)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,176 @@
+"""
+Generación y carga de datos sintéticos para db_gestion: notebook vs generador_oltp.
+
+"notebook" es la lógica de VFinal_Datos_Sinteticos_y_Población_gestion.ipynb
+(una fila a la vez con random, asignaciones con itertools.product + shuffle y
+DataFrame.to_sql); "vectorizado" es generador_oltp.generar_bloques con
+poblar(metodo="insert"). La carga es a un SQLite en memoria (sustituto de
+db_gestion). También verifica que no haya pares (tarea, empleado) repetidos y
+que la misma semilla produzca los mismos datos.
+
+El producto cartesiano del notebook crece como tareas x empleados: a escala 100
+ya son 60M de tuplas y a escala 1000 no cabe en memoria, por eso el notebook
+solo se corre hasta --max-notebook.
+
+Resultado de referencia (escala x CANTIDADES del notebook):
+    escala 10:      notebook generar 0.66 s   cargar 0.053 s   vectorizado generar 0.025 s  cargar 0.041 s
+    escala 100:     notebook generar 81.7 s   cargar 0.47 s    vectorizado generar 0.086 s  cargar 0.35 s
+    escala 1000:    (notebook omitido)                         vectorizado generar 0.78 s   cargar 3.6 s
+    escala 10000:   (notebook omitido)                         vectorizado generar 6.6 s    cargar 38 s (7.35M filas)
+
+Uso:
+    python benchmarks/bench_generador.py --escalas 10 100 10000 --max-notebook 100
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import itertools
+import json
+import random
+import sqlite3
+import string
+
+import pandas as pd
+
+from comun import medir
+import generador_oltp as g
+
+# =========================================================================
+# GENERACIÓN COMO EN EL NOTEBOOK (FILA POR FILA)
+# =========================================================================
+
+def _nombre():
+    return "".join(random.choices(string.ascii_uppercase, k=6))
+
+def _fecha(base=datetime.date(2025, 11, 1)):
+    return base - datetime.timedelta(days=random.randint(1, 1000))
+
+def generar_notebook(cantidades, semilla=42):
+    random.seed(semilla)
+    rangos = {tabla: range(1, n + 1) for tabla, n in cantidades.items()}
+    tablas = {}
+    tablas["cliente"] = pd.DataFrame([
+        [i, n, f"{n.lower()}{random.randint(1, 99)}@{random.choice(g.DOMINIOS)}", f"+52{random.randint(2220000000, 2299999999)}",
+         random.choice(g.INDUSTRIAS), round(random.uniform(50000, 200000), 2)]
+        for i, n in ((i, _nombre()) for i in rangos["cliente"])
+    ], columns=["idCliente", "Nombre", "Email", "Telefono", "Industria", "MetricaClienteInicial"])
+    tablas["equipo"] = pd.DataFrame([
+        [i, f"Equipo_{random.choice(string.ascii_uppercase)}_{random.randint(10, 99)}", random.choice([0, 1])]
+        for i in rangos["equipo"]
+    ], columns=["idEquipo", "Nombre", "Activo"])
+    tablas["empleado"] = pd.DataFrame([
+        [i, n, f"{n.lower()}{i}@{random.choice(g.DOMINIOS)}", round(random.uniform(8000, 22000), 2),
+         round(random.uniform(100, 300), 2), random.choice(rangos["equipo"])]
+        for i, n in ((i, _nombre()) for i in rangos["empleado"])
+    ], columns=["idEmpleado", "Nombre", "Email", "Salario", "SalarioxHora", "Equipo_idEquipo"])
+    tablas["estadisticas_proyecto"] = pd.DataFrame([
+        [i, _fecha(), random.randint(5, 100), random.randint(0, 25), round(random.uniform(10, 100), 2),
+         round(random.uniform(500, 20000), 2)]
+        for i in rangos["estadisticas_proyecto"]
+    ], columns=["idEstadistica", "Fecha", "Tareas_completadas", "Tareas_pendientes", "Horas_trabajadas", "Costo_diario"])
+    proyectos = []
+    for i in rangos["proyecto"]:
+        inicio = _fecha()
+        fin_est = inicio + datetime.timedelta(days=random.randint(30, 180))
+        proyectos.append([
+            i, f"Proyecto_{_nombre()}", random.choice(g.DESCRIPCIONES_PROYECTO), random.choice(g.TIPOS_PROYECTO),
+            inicio, fin_est, fin_est + datetime.timedelta(days=random.randint(-10, 20)), random.choice(g.ESTADOS_PROYECTO),
+            round(random.uniform(50000, 350000), 2), round(random.uniform(50000, 350000), 2),
+            random.choice(rangos["cliente"]), random.choice(rangos["estadisticas_proyecto"]),
+            round(random.uniform(50000, 350000), 2), random.choice([0, 1]),
+        ])
+    tablas["proyecto"] = pd.DataFrame(proyectos, columns=[
+        "idProyecto", "Nombre", "Descripcion", "Tipo", "Fecha_inicio", "Fecha_fin_estimada", "Fecha_fin_real", "Estado",
+        "Presupuesto", "Costo_real", "Cliente_idCliente", "Estadisticas_Proyecto_idEstadistica", "MetricaClienteFinal",
+        "CertificacionSeguridad",
+    ])
+    tareas = []
+    for i in rangos["tarea"]:
+        creacion = _fecha()
+        fin_est = creacion + datetime.timedelta(days=random.randint(5, 30))
+        tareas.append([
+            i, "Tarea_" + _nombre(), "Implementar " + random.choice(g.DESCRIPCIONES_TAREA), creacion, fin_est,
+            fin_est + datetime.timedelta(days=random.randint(-3, 5)), random.choice(g.ESTADOS_TAREA),
+            random.choice(g.PRIORIDADES), random.randint(5, 120), random.choice([0, 1]), random.choice([0, 1]),
+        ])
+    tablas["tarea"] = pd.DataFrame(tareas, columns=[
+        "idTarea", "Titulo", "Descripcion", "Fecha_creacion", "Fecha_fin_estimada", "Fecha_fin_real", "Estado",
+        "Prioridad", "Horas_estimadas", "EsAutomatizacion", "EsReutilizado",
+    ])
+    # Producto cartesiano completo, barajado
+    pares = list(itertools.product(rangos["tarea"], rangos["empleado"]))
+    random.shuffle(pares)
+    pares = pares[:min(cantidades["asignacion_tarea"], len(pares))]
+    tablas["asignacion_tarea"] = pd.DataFrame([
+        [i, t, e, _fecha(), random.randint(5, 120), random.randint(5, 120), random.choice(rangos["proyecto"])]
+        for i, (t, e) in enumerate(pares, start=1)
+    ], columns=["idAsignacion", "Tarea_idTarea", "Empleado_idEmpleado", "Fecha_asignacion", "Horas_estimadas",
+                "Horas_reales", "Proyecto_idProyecto"])
+    tablas["incidente"] = pd.DataFrame([
+        [i, random.choice(rangos["proyecto"]), _fecha(), random.choice(g.PRIORIDADES), "CERRADO",
+         random.choice(rangos["tarea"]), round(random.uniform(100, 2500), 2)]
+        for i in range(1, cantidades["incidente"] + 1)
+    ], columns=["idIncidente", "Proyecto_idProyecto", "Fecha_reporte", "Severidad", "Estado", "idTarea", "CostoCorreccion"])
+    return tablas
+
+def cargar_notebook(tablas):
+    conn = sqlite3.connect(":memory:")
+    for tabla, df in tablas.items():
+        df.to_sql(tabla, conn, if_exists="append", index=False)
+    conn.commit()
+    return conn
+
+# =========================================================================
+# COMPARACIÓN
+# =========================================================================
+
+def _crear_tablas(conn, cantidades):
+    # Mismas columnas que las tablas de db_gestion que llena el generador
+    for tabla, df in g.generar_bloques({t: 1 for t in cantidades}, tam_bloque=1):
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {tabla} ({', '.join(df.columns)})")
+
+def correr(escalas, max_notebook, semilla=42):
+    resultados = []
+    for escala in escalas:
+        cantidades = {tabla: n * escala for tabla, n in g.CANTIDADES.items()}
+        fila = {"escala": escala, "filas": sum(cantidades.values())}
+        if escala <= max_notebook:
+            tablas, t_gen = medir(generar_notebook, cantidades, semilla)
+            conn, t_carga = medir(cargar_notebook, tablas)
+            conn.close()
+            fila.update(notebook_generar_s=round(t_gen, 3), notebook_cargar_s=round(t_carga, 3))
+
+        bloques, t_gen = medir(lambda: list(g.generar_bloques(cantidades, semilla=semilla, base="2025-11-01")))
+        conn = sqlite3.connect(":memory:")
+        _crear_tablas(conn, cantidades)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, t_carga = medir(g.poblar, conn, iter(bloques), dialecto="sqlite")
+        repetidos = conn.execute(
+            "SELECT COUNT(*) - COUNT(DISTINCT Tarea_idTarea || '-' || Empleado_idEmpleado) FROM asignacion_tarea"
+        ).fetchone()[0]
+        cargadas = sum(conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in g.CANTIDADES)
+        conn.close()
+        otra_vez = g.generar_bloques(cantidades, semilla=semilla, base="2025-11-01")
+        fila.update(
+            vectorizado_generar_s=round(t_gen, 3),
+            vectorizado_cargar_s=round(t_carga, 3),
+            filas_cargadas=cargadas,
+            pares_repetidos=repetidos,
+            reproducible=all(a.equals(b) for (_, a), (_, b) in zip(bloques, otra_vez)),
+        )
+        print(json.dumps(fila))
+        resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--max-notebook", type=int, default=10, help="Escala máxima para correr la versión del notebook")
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.escalas, args.max_notebook)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
@@ -0,0 +1,274 @@
+"""
+Carga incremental (watermark) contra una carga completa desde cero.
+
+Sobre un OLTP SQLite (comun.generar_oltp + columna Fecha_modificacion):
+  1. carga completa a un DW y guarda el watermark (hora "del servidor" T0)
+  2. modifica el OLTP: costo y estado de incidentes, banderas de tareas, horas
+     de asignaciones, costo y estado de proyectos (abiertos que se cierran y
+     FINALIZADO <-> CANCELADO) e incidentes nuevos. Parte de los cambios queda
+     sellada en el mismo segundo T0 y parte un poco antes (transacción que
+     confirmó después de abrir la foto): sin el margen de traslape y el >= de
+     preparar_delta esas filas se perderían.
+  3. corre el ETL incremental sobre el mismo DW (mismo flujo que el notebook)
+  4. corre una carga completa en un DW vacío y compara TODAS las tablas del DW,
+     resumen_anio y resumen_proyecto
+
+preparar_delta se reproduce aquí en SQLite (preparar_delta_sqlite); debe seguir
+las mismas reglas que el procedimiento de Obtener_todo_final.sql.
+
+Uso:
+    python benchmarks/bench_incremental.py --tamanos 5000 50000 --fraccion 0.02
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime as dt, timedelta
+
+import numpy as np
+import pandas as pd
+
+from comun import generar_oltp, crear_oltp_sqlite, crear_dw_sqlite
+from etl_dw import (
+    COLUMNAS_DW, TABLAS_RECALCULADAS, WATERMARK_INICIAL, safe_index,
+    parciales_asignacion, parciales_incidente, sumar_parciales, metricas_desde_parciales,
+    acumular_primeras_asignaciones, construir_indice_asignacion, cargar_incidentes_por_bloques,
+    leer_watermark, avanzar_watermark, guardar_watermark, argumentos_incremental,
+    conciliar_incremental, actualizar_resumenes,
+)
+from extraccion_oltp import bloques_tabla, extraer_tabla
+
+CERRADOS = ["FINALIZADO", "CANCELADO"]
+TABLAS_MODIFICABLES = ["proyecto", "tarea", "asignacion_tarea", "incidente"]
+TABLAS_RESUMEN = ["resumen_anio", "resumen_proyecto"]
+
+T0 = dt(2025, 11, 1, 12, 0, 0)
+
+# =========================================================================
+# OLTP CON Fecha_modificacion
+# =========================================================================
+
+def _texto(fecha):
+    return fecha.strftime("%Y-%m-%d %H:%M:%S")
+
+def crear_oltp(ruta, n, semilla):
+    conn = crear_oltp_sqlite(ruta, generar_oltp(n, semilla))
+    for tabla in TABLAS_MODIFICABLES:
+        conn.execute(f"ALTER TABLE {tabla} ADD COLUMN Fecha_modificacion TEXT")
+        conn.execute(f"UPDATE {tabla} SET Fecha_modificacion = ?", (_texto(T0 - timedelta(days=1)),))
+    conn.commit()
+    return conn
+
+def preparar_delta_sqlite(conn, ultimo_incidente, ultimo_proyecto, desde):
+    """Mismas reglas que preparar_delta (Obtener_todo_final.sql) con tablas TEMP de SQLite."""
+    desde = _texto(desde)
+    conn.executescript("""
+        DROP TABLE IF EXISTS temp.tmp_proyectos_delta;
+        CREATE TEMP TABLE tmp_proyectos_delta (idProyecto INTEGER PRIMARY KEY);
+        DROP TABLE IF EXISTS temp.tmp_tareas_delta;
+        CREATE TEMP TABLE tmp_tareas_delta (idTarea INTEGER PRIMARY KEY);
+    """)
+    for consulta, parametros in (
+        ("SELECT idProyecto FROM proyecto WHERE idProyecto > ? OR Fecha_modificacion >= ?", (ultimo_proyecto, desde)),
+        ("SELECT Proyecto_idProyecto FROM incidente WHERE idIncidente > ? OR Fecha_modificacion >= ?", (ultimo_incidente, desde)),
+        ("SELECT Proyecto_idProyecto FROM asignacion_tarea WHERE Fecha_modificacion >= ?", (desde,)),
+        ("SELECT a.Proyecto_idProyecto FROM asignacion_tarea a JOIN tarea t ON t.idTarea = a.Tarea_idTarea "
+         "WHERE t.Fecha_modificacion >= ?", (desde,)),
+        ("SELECT i.Proyecto_idProyecto FROM incidente i JOIN tarea t ON t.idTarea = i.idTarea "
+         "WHERE t.Fecha_modificacion >= ?", (desde,)),
+    ):
+        conn.execute(f"INSERT OR IGNORE INTO tmp_proyectos_delta {consulta}", parametros)
+    conn.execute(
+        "INSERT OR IGNORE INTO tmp_tareas_delta SELECT a.Tarea_idTarea FROM asignacion_tarea a "
+        "JOIN tmp_proyectos_delta d ON d.idProyecto = a.Proyecto_idProyecto"
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO tmp_tareas_delta SELECT i.idTarea FROM incidente i "
+        "JOIN tmp_proyectos_delta d ON d.idProyecto = i.Proyecto_idProyecto WHERE i.idTarea IS NOT NULL"
+    )
+    return conn.execute("SELECT COUNT(*) FROM tmp_proyectos_delta").fetchone()[0]
+
+def modificar_oltp(conn, fraccion, semilla):
+    """
+    Cambios sobre una fracción de las filas. La mitad se sella en T0 (mismo
+    segundo que el watermark) y la otra mitad 2 minutos antes. Regresa cuántas
+    filas se tocaron por tipo de cambio.
+    """
+    rng = np.random.default_rng(semilla + 1)
+
+    def _muestra(consulta):
+        ids = [fila[0] for fila in conn.execute(consulta)]
+        k = max(1, int(len(ids) * fraccion)) if ids else 0
+        return [int(i) for i in rng.choice(ids, k, replace=False)] if k else []
+
+    def _sello(i):
+        return _texto(T0 if i % 2 == 0 else T0 - timedelta(minutes=2))
+
+    cerrados = "SELECT idProyecto FROM proyecto WHERE Estado IN ('FINALIZADO', 'CANCELADO')"
+    cambios = {}
+
+    ids = _muestra(f"SELECT idIncidente FROM incidente WHERE Proyecto_idProyecto IN ({cerrados})")
+    conn.executemany(
+        "UPDATE incidente SET CostoCorreccion = ?, Estado = 'ABIERTO', Fecha_modificacion = ? WHERE idIncidente = ?",
+        [(round(float(rng.uniform(5000, 99999)), 2), _sello(i), i) for i in ids]
+    )
+    cambios["incidentes_modificados"] = len(ids)
+
+    ids = _muestra("SELECT DISTINCT idTarea FROM incidente")
+    conn.executemany(
+        "UPDATE tarea SET EsAutomatizacion = 1 - EsAutomatizacion, Estado = 'COMPLETADA', Fecha_modificacion = ? "
+        "WHERE idTarea = ?", [(_sello(i), i) for i in ids]
+    )
+    cambios["tareas_modificadas"] = len(ids)
+
+    ids = _muestra("SELECT idAsignacion FROM asignacion_tarea")
+    conn.executemany(
+        "UPDATE asignacion_tarea SET Horas_reales = Horas_reales + 7, Fecha_modificacion = ? WHERE idAsignacion = ?",
+        [(_sello(i), i) for i in ids]
+    )
+    cambios["asignaciones_modificadas"] = len(ids)
+
+    ids = _muestra("SELECT idProyecto FROM proyecto WHERE Estado NOT IN ('FINALIZADO', 'CANCELADO')")
+    conn.executemany(
+        "UPDATE proyecto SET Estado = 'FINALIZADO', Fecha_modificacion = ? WHERE idProyecto = ?",
+        [(_sello(i), i) for i in ids]
+    )
+    cambios["proyectos_cerrados"] = len(ids)
+
+    ids = _muestra(cerrados)
+    conn.executemany(
+        "UPDATE proyecto SET Estado = CASE Estado WHEN 'FINALIZADO' THEN 'CANCELADO' ELSE 'FINALIZADO' END, "
+        "Costo_real = Costo_real * 1.5, Fecha_modificacion = ? WHERE idProyecto = ?",
+        [(_sello(i), i) for i in ids]
+    )
+    cambios["proyectos_modificados"] = len(ids)
+
+    ultimo = conn.execute("SELECT MAX(idIncidente) FROM incidente").fetchone()[0]
+    proyectos = _muestra(cerrados)
+    tareas = [fila[0] for fila in conn.execute("SELECT idTarea FROM tarea")]
+    conn.executemany(
+        "INSERT INTO incidente (idIncidente, Proyecto_idProyecto, Fecha_reporte, Severidad, Estado, idTarea, "
+        "CostoCorreccion, Fecha_modificacion) VALUES (?, ?, ?, 'ALTA', 'ABIERTO', ?, ?, ?)",
+        [(ultimo + k + 1, p, "2025-10-30", int(rng.choice(tareas)), 1234.5, _sello(k)) for k, p in enumerate(proyectos)]
+    )
+    cambios["incidentes_nuevos"] = len(proyectos)
+    conn.commit()
+    return cambios
+
+# =========================================================================
+# ETL (MISMO FLUJO QUE ETL_Version_Final.ipynb)
+# =========================================================================
+
+def correr_etl(oltp, dw, modo, inicio_extraccion, tam_bloque=20000):
+    cursor = dw.cursor()
+    watermark = dict(WATERMARK_INICIAL)
+    proyectos_delta = None
+    if modo == "incremental":
+        watermark = leer_watermark(cursor, dialecto="sqlite")
+        proyectos_delta = preparar_delta_sqlite(oltp, *argumentos_incremental(watermark))
+
+    cliente_df = extraer_tabla(oltp, "cliente", modo)
+    equipo_df = extraer_tabla(oltp, "equipo", modo)
+    empleado_df = extraer_tabla(oltp, "empleado", modo)
+    proyecto_df = extraer_tabla(oltp, "proyecto", modo)
+    tarea_df = extraer_tabla(oltp, "tarea", modo)
+
+    parciales_asig, primeras_asig = None, None
+    for bloque in bloques_tabla(oltp, "asignacion_tarea", modo, tam_bloque):
+        parciales_asig = sumar_parciales(parciales_asig, parciales_asignacion(bloque, tarea_df))
+        primeras_asig = acumular_primeras_asignaciones(primeras_asig, bloque)
+    parciales_inc = None
+    nuevo_watermark = avanzar_watermark(watermark, pd.DataFrame(), proyecto_df, inicio_extraccion)
+    for bloque in bloques_tabla(oltp, "costos_incidente", modo, tam_bloque):
+        parciales_inc = sumar_parciales(parciales_inc, parciales_incidente(bloque))
+        nuevo_watermark = avanzar_watermark(nuevo_watermark, bloque, pd.DataFrame(), inicio_extraccion)
+
+    proyecto_df = proyecto_df[proyecto_df["Estado"].isin(CERRADOS)]
+    validos = set(proyecto_df["idProyecto"])
+    metricas = metricas_desde_parciales(list(validos), parciales_asig, parciales_inc)
+    indice = construir_indice_asignacion(
+        primeras_asig if primeras_asig is not None else pd.DataFrame(),
+        safe_index(empleado_df, "idEmpleado"), safe_index(equipo_df, "idEquipo")
+    )
+    incidentes = (b[b["Proyecto_idProyecto"].isin(validos)] for b in bloques_tabla(oltp, "incidente", modo, tam_bloque))
+
+    tocados = set()
+    cargar_incidentes_por_bloques(
+        cursor, incidentes, cliente_df, equipo_df, empleado_df, proyecto_df, tarea_df, metricas, indice,
+        dialecto="sqlite", actualizar=TABLAS_RECALCULADAS if modo == "incremental" else (), proyectos_tocados=tocados
+    )
+    if modo == "incremental":
+        conciliar_incremental(cursor, tocados, dialecto="sqlite")
+    actualizar_resumenes(cursor, tocados, dialecto="sqlite")
+    guardar_watermark(cursor, nuevo_watermark, dialecto="sqlite")
+    dw.commit()
+    return proyectos_delta
+
+# =========================================================================
+# COMPARACIÓN
+# =========================================================================
+
+def _volcado(conn, tabla):
+    df = pd.read_sql(f"SELECT * FROM {tabla}", conn)
+    df = df.sort_values(list(df.columns[:3] if tabla == "resumen_anio" else df.columns[:1])).reset_index(drop=True)
+    for col in df.columns:
+        if col.startswith("fecha_"):
+            df[col] = pd.to_datetime(df[col], errors="coerce", format="mixed")
+    return df
+
+def diferencias(conn_a, conn_b):
+    """Tablas cuyo contenido difiere entre los dos DW (las sumas se comparan con rtol=1e-9)."""
+    distintas = []
+    for tabla in list(COLUMNAS_DW) + TABLAS_RESUMEN:
+        try:
+            pd.testing.assert_frame_equal(_volcado(conn_a, tabla), _volcado(conn_b, tabla), check_exact=False, rtol=1e-9)
+        except AssertionError:
+            distintas.append(tabla)
+    return distintas
+
+def correr(tamanos, fraccion, semilla=42):
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        for n in tamanos:
+            oltp = crear_oltp(os.path.join(carpeta, f"oltp_{n}.db"), n, semilla)
+            dw_incremental = crear_dw_sqlite()
+            correr_etl(oltp, dw_incremental, "completa", T0)
+
+            cambios = modificar_oltp(oltp, fraccion, semilla)
+            inicio = time.perf_counter()
+            proyectos_delta = correr_etl(oltp, dw_incremental, "incremental", T0 + timedelta(minutes=10))
+            t_incremental = time.perf_counter() - inicio
+
+            dw_completo = crear_dw_sqlite()
+            inicio = time.perf_counter()
+            correr_etl(oltp, dw_completo, "completa", T0 + timedelta(minutes=10))
+            t_completo = time.perf_counter() - inicio
+
+            distintas = diferencias(dw_incremental, dw_completo)
+            fila = {
+                "incidentes": n,
+                "fraccion": fraccion,
+                **cambios,
+                "proyectos_delta": proyectos_delta,
+                "incremental_s": round(t_incremental, 3),
+                "completo_s": round(t_completo, 3),
+                "dw_identico": not distintas,
+                "tablas_distintas": distintas,
+            }
+            oltp.close()
+            print(json.dumps(fila, ensure_ascii=False))
+            resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[5000, 50000])
+    parser.add_argument("--fraccion", type=float, default=0.02, help="Fracción de filas modificadas por tipo de cambio")
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.tamanos, args.fraccion)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
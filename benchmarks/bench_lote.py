@@ -0,0 +1,86 @@
+"""
+Barrido de escenarios (tareas, semanas): predecir_riesgo_defecto por escenario
+vs predecir_riesgo_lote.
+
+"por_escenario" llama predecir_riesgo_defecto (ya con el modelo persistido) una
+vez por escenario y parsea su JSON; se mide con una muestra (--muestra) y se
+extrapola al total. "lote" es una sola llamada a predecir_riesgo_lote en formato
+matriz y en formato largo (DataFrame); el JSON solo se mide hasta 100k
+escenarios. Verifica en la muestra que ambos caminos dan los mismos totales y
+curvas.
+
+Resultado de referencia (por_escenario extrapolado de 5000):
+    10000 escenarios:    por escenario 8.9 s    lote matriz 0.011 s   largo 0.039 s   json 0.064 s
+    1000000 escenarios:  por escenario 918 s    lote matriz 1.11 s    largo 3.22 s
+
+Uso:
+    python benchmarks/bench_lote.py --escenarios 10000 1000000
+"""
+import argparse
+import contextlib
+import io
+import json
+
+import numpy as np
+
+from comun import medir
+from modelo_rayleigh import predecir_riesgo_defecto, predecir_riesgo_lote
+
+# Coeficientes con la forma de los que da entrenar_modelo sobre el DW sintético
+MODELO = {"coeficientes": [0.85, 0.42], "intercepto": -1.7, "version_datos": "bench"}
+
+def por_escenario(tareas, semanas):
+    resultados = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for t, s in zip(tareas.tolist(), semanas.tolist()):
+            resultados.append(json.loads(predecir_riesgo_defecto(t, s, modelo=MODELO)))
+    return resultados
+
+def _mismos(individuales, lote):
+    for i, r in enumerate(individuales):
+        n = lote["Semanas"][i]
+        if r["Total_Defectos_Estimados"] != lote["Total_Defectos_Estimados"][i]:
+            return False
+        if [p["Defectos"] for p in r["Curva_Riesgo_Rayleigh"]] != lote["Curvas"][i, :n].tolist():
+            return False
+    return True
+
+def correr(tamanos, muestra, semilla=42):
+    rng = np.random.default_rng(semilla)
+    resultados = []
+    for n in tamanos:
+        tareas = rng.integers(5, 200, n)
+        semanas = rng.integers(4, 52, n)
+        m = min(n, muestra)
+
+        individuales, t_ind = medir(por_escenario, tareas[:m], semanas[:m])
+        lote, t_matriz = medir(predecir_riesgo_lote, tareas, semanas, modelo=MODELO, repeticiones=3)
+        largo, t_largo = medir(predecir_riesgo_lote, tareas, semanas, modelo=MODELO, formato="largo")
+        fila = {
+            "escenarios": n,
+            "por_escenario_s": round(t_ind / m * n, 2),
+            "por_escenario_extrapolado": m < n,
+            "lote_matriz_s": round(t_matriz, 3),
+            "lote_largo_s": round(t_largo, 3),
+            "filas_largo": len(largo),
+            "speedup_matriz": round(t_ind / m * n / t_matriz, 1),
+        }
+        if n <= 100000:
+            _, t_json = medir(predecir_riesgo_lote, tareas, semanas, modelo=MODELO, como_json=True)
+            fila["lote_json_s"] = round(t_json, 3)
+        fila["mismos_datos"] = _mismos(individuales, lote)
+        print(json.dumps(fila))
+        resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escenarios", type=int, nargs="+", default=[10000, 1000000])
+    parser.add_argument("--muestra", type=int, default=5000, help="Escenarios que se corren uno por uno")
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.escenarios, args.muestra)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
@@ -0,0 +1,126 @@
+"""
+Latencia por predicción de predecir_riesgo_defecto: reentrenar en cada llamada
+vs modelo persistido.
+
+"reentrenar" es lo que hacía cada llamada: leer el histórico del DW (la consulta
+de obtener_totales_proyectos más dos consultas por proyecto, como contar_tareas
+y calcular_semanas_proyecto), ajustar LinearRegression y predecir.
+"persistido" carga una vez el archivo de modelo_rayleigh.guardar_modelo y cada
+predicción es solo la aritmética de predecir_total_defectos. También mide lo que
+cuesta revisar la versión del DW (version_datos_dw) y verifica que ambos caminos
+predicen el mismo total para un lote de proyectos nuevos.
+
+El DW es SQLite (comun.dw_sintetico) en lugar de db_soporte.
+
+Resultado de referencia:
+    10000 incidentes (659 proyectos):    reentrenar 142 ms/predicción   persistido 0.5 µs
+    50000 incidentes (3305 proyectos):   reentrenar 3.6 s/predicción    persistido 0.6 µs
+
+Uso:
+    python benchmarks/bench_modelo.py --incidentes 10000 50000
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from comun import medir, dw_sintetico
+from modelo_rayleigh import (
+    version_datos_dw, entrenar_modelo, guardar_modelo, cargar_modelo, predecir_total_defectos,
+)
+
+# =========================================================================
+# HISTÓRICO DESDE EL DW (MISMAS CONSULTAS QUE obtener_totales_proyectos)
+# =========================================================================
+
+def totales_desde_dw(conn):
+    proyectos = conn.execute("""
+        SELECT p.idProyecto, h.defectos_reportados
+        FROM dim_proyecto p
+        JOIN hecho_proyecto h ON h.idProyecto = p.idProyecto
+    """).fetchall()
+    registros = []
+    for idp, defectos in proyectos:
+        total_tareas = conn.execute("SELECT COUNT(*) FROM dim_tarea WHERE idProyecto = ?", (idp,)).fetchone()[0]
+        semanas = conn.execute(
+            "SELECT CAST((julianday(fecha_fin_real) - julianday(fecha_inicio)) / 7 AS INTEGER) FROM dim_proyecto WHERE idProyecto = ?",
+            (idp,)
+        ).fetchone()[0]
+        registros.append({
+            "idProyecto": idp,
+            "Tiempo_Semanas": semanas or 0,
+            "Total_Defectos": defectos,
+            "Total_Tareas": total_tareas,
+        })
+    return pd.DataFrame(registros)
+
+def _ajustar(df_totales):
+    modelo_regresion = LinearRegression()
+    modelo_regresion.fit(df_totales[["Total_Tareas", "Tiempo_Semanas"]].values, df_totales["Total_Defectos"].values)
+    return modelo_regresion
+
+def _predecir_sklearn(modelo_regresion, tareas, semanas):
+    return np.maximum(1, modelo_regresion.predict(np.array([[tareas, semanas]]))[0])
+
+def predecir_reentrenando(conn, tareas, semanas):
+    # Camino anterior: histórico completo + fit en cada predicción
+    return _predecir_sklearn(_ajustar(totales_desde_dw(conn)), tareas, semanas)
+
+# =========================================================================
+# COMPARACIÓN
+# =========================================================================
+
+def correr(tamanos, predicciones=200, semilla=42):
+    rng = np.random.default_rng(semilla)
+    nuevos = list(zip(rng.integers(5, 80, predicciones).tolist(), rng.integers(4, 40, predicciones).tolist()))
+    resultados = []
+    for n in tamanos:
+        conn = dw_sintetico(n, semilla)
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "modelo_defectos.json")
+
+            version, t_version = medir(version_datos_dw, conn, repeticiones=5)
+            modelo, t_entrenar = medir(lambda: entrenar_modelo(totales_desde_dw(conn), version))
+            guardar_modelo(modelo, ruta)
+            cargado, t_cargar = medir(cargar_modelo, ruta, repeticiones=5)
+
+            # El camino anterior es lento: se mide con pocas predicciones
+            muestra = nuevos[:3]
+            _, t_antes = medir(lambda: [predecir_reentrenando(conn, t, s) for t, s in muestra])
+            _, t_despues = medir(lambda: [predecir_total_defectos(cargado, t, s) for t, s in nuevos], repeticiones=20)
+
+            # Mismo histórico: el fit de sklearn y los coeficientes guardados deben coincidir
+            regresion = _ajustar(totales_desde_dw(conn))
+            esperado = [_predecir_sklearn(regresion, t, s) for t, s in nuevos]
+            obtenido = [predecir_total_defectos(cargado, t, s) for t, s in nuevos]
+            fila = {
+                "incidentes": n,
+                "proyectos_entrenamiento": modelo["n_proyectos"],
+                "reentrenar_ms_por_prediccion": round(t_antes / len(muestra) * 1000, 2),
+                "persistido_us_por_prediccion": round(t_despues / len(nuevos) * 1e6, 3),
+                "entrenar_una_vez_s": round(t_entrenar, 3),
+                "cargar_modelo_ms": round(t_cargar * 1000, 3),
+                "version_dw_ms": round(t_version * 1000, 3),
+                "mismas_predicciones": bool(np.allclose(esperado, obtenido, rtol=0, atol=1e-9))
+                                       and [int(x) for x in esperado] == [int(x) for x in obtenido],
+            }
+        conn.close()
+        print(json.dumps(fila))
+        resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incidentes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--predicciones", type=int, default=200)
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.incidentes, args.predicciones)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
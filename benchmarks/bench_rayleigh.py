@@ -0,0 +1,104 @@
+"""
+Distribución de Rayleigh: ModeloRayleighDistribucion original vs motor por lotes.
+
+"original" es la función como estaba en modelo_rayleigh.py (np.arange + argsort
+por llamada + DataFrame.to_dict('records')). Se compara contra:
+  - ModeloRayleighDistribucion actual (misma salida, proporciones en caché)
+  - distribuir_rayleigh_lote para muchas curvas con totales, semanas y b distintos
+y se verifica que las curvas sean idénticas, entero por entero, en una rejilla de
+totales x semanas x b.
+
+Resultado de referencia:
+    una curva de 52 semanas:   original ~600-950 µs    actual ~90-170 µs
+    1000000 curvas (4-103 semanas, 3 valores de b):  ciclo ~1000 s (extrapolado)   lote 1.9 s
+
+Uso:
+    python benchmarks/bench_rayleigh.py --curvas 10000 1000000
+"""
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from comun import medir
+from modelo_rayleigh import ModeloRayleighDistribucion, distribuir_rayleigh_lote, proporciones_rayleigh
+
+def rayleigh_original(total_defects, duration_weeks, historic_b=0.005):
+    total_defectos_estimados = int(np.round(total_defects))
+    duracion_hist = int(duration_weeks)
+    b_ajustado = historic_b
+    time_points = np.arange(1, duracion_hist + 1)
+    pdf_values = 2 * b_ajustado * time_points * np.exp(-b_ajustado * time_points**2)
+    proportions = pdf_values / np.sum(pdf_values)
+    defects_per_week_float = total_defectos_estimados * proportions
+    defects_per_week = np.round(defects_per_week_float).astype(int)
+    diff = total_defectos_estimados - np.sum(defects_per_week)
+    if diff != 0:
+        decimal_parts = defects_per_week_float - defects_per_week
+        indices_to_adjust = np.argsort(decimal_parts)[::-1][:abs(diff)]
+        defects_per_week[indices_to_adjust] += np.sign(diff)
+    df_distribucion = pd.DataFrame({'Semana': time_points, 'Defectos': defects_per_week})
+    return {
+        "Total_Defectos_Estimados": total_defectos_estimados,
+        "Curva_Riesgo_Rayleigh": df_distribucion.to_dict('records'),
+        "Parametro_Rayleigh_b": float(b_ajustado)
+    }
+
+def verificar_rejilla(totales=range(0, 400, 7), semanas=range(0, 160, 3), bs=(0.002, 0.005, 0.01, 0.05)):
+    """Compara el motor contra la función original en todas las combinaciones."""
+    t, s, b = (x.ravel() for x in np.meshgrid(list(totales), list(semanas), list(bs), indexing="ij"))
+    curvas = distribuir_rayleigh_lote(t, s, b)
+    for i in range(len(t)):
+        esperado = rayleigh_original(int(t[i]), int(s[i]), float(b[i]))
+        if [p["Defectos"] for p in esperado["Curva_Riesgo_Rayleigh"]] != curvas[i, :s[i]].tolist():
+            return False, len(t)
+        if ModeloRayleighDistribucion(int(t[i]), int(s[i]), float(b[i])) != esperado:
+            return False, len(t)
+    return True, len(t)
+
+def correr(tamanos, semilla=42):
+    identico, combinaciones = verificar_rejilla()
+    print(json.dumps({"rejilla_combinaciones": combinaciones, "identico": identico}))
+    resultados = [{"rejilla_combinaciones": combinaciones, "identico": identico, "por_llamada": [], "lotes": []}]
+
+    # Una curva por llamada (lo que hace predecir_riesgo_defecto)
+    for duracion in (12, 52, 520):
+        proporciones_rayleigh.cache_clear()
+        _, t_antes = medir(rayleigh_original, 40, duracion, repeticiones=50)
+        _, t_despues = medir(ModeloRayleighDistribucion, 40, duracion, repeticiones=50)
+        fila = {"semanas": duracion, "original_us": round(t_antes * 1e6, 1), "actual_us": round(t_despues * 1e6, 1)}
+        print(json.dumps(fila))
+        resultados[0]["por_llamada"].append(fila)
+
+    # Muchas curvas: ciclo con la función original vs una llamada al motor
+    rng = np.random.default_rng(semilla)
+    for n in tamanos:
+        totales = rng.integers(1, 300, n)
+        semanas = rng.integers(4, 104, n)
+        b = rng.choice([0.002, 0.005, 0.01], n)
+        m = min(n, 5000)
+        _, t_ciclo = medir(lambda: [rayleigh_original(totales[i], semanas[i], b[i]) for i in range(m)])
+        proporciones_rayleigh.cache_clear()
+        curvas, t_lote = medir(distribuir_rayleigh_lote, totales, semanas, b)
+        fila = {
+            "curvas": n,
+            "ciclo_original_s": round(t_ciclo / m * n, 2),
+            "ciclo_extrapolado": m < n,
+            "lote_s": round(t_lote, 3),
+            "lote_mb": round(curvas.nbytes / 2**20, 1),
+        }
+        print(json.dumps(fila))
+        resultados[0]["lotes"].append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--curvas", type=int, nargs="+", default=[10000, 1000000])
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.curvas)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
@@ -0,0 +1,147 @@
+"""
+Tablas resumen del DW (resumen_anio, resumen_proyecto) contra las filas completas.
+
+Sobre un DW SQLite (comun.dw_sintetico, que ya llama a actualizar_resumenes):
+  - exportación: bytes (Parquet + CSV) y tiempo de exportar las filas que usaba
+    el Dashboard (proyectos, tareas, incidentes) contra las dos tablas resumen
+  - cubo: cubo_scorecard.construir_cubo desde las filas contra
+    construir_cubo_resumen desde los resúmenes, y que ambos cubos sean iguales
+  - mantenimiento: agrega tareas e incidentes nuevos a una parte de los
+    proyectos y recalcula solo esos (como la carga incremental); compara el
+    tiempo con recalcular todo y verifica que los resúmenes quedan iguales
+
+Resultado de referencia (fracción tocada 2%):
+    20000 incidentes:   exportación filas 621 KB / 0.15 s   resúmenes 58 KB / 0.02 s
+                        cubo filas 0.14 s   resúmenes 0.15 s   incremental 3.8 ms   completo 19 ms
+    200000 incidentes:  exportación filas 6.3 MB / 0.89 s   resúmenes 0.53 MB / 0.14 s
+                        cubo filas 0.21 s   resúmenes 0.20 s   incremental 35 ms    completo 256 ms
+El cubo cuesta lo mismo desde cualquiera de las dos (lo domina armar los paneles
+por año); lo que baja es lo que viaja del DW y lo que se guarda y se lee.
+
+Uso:
+    python benchmarks/bench_resumenes.py --incidentes 20000 200000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from comun import medir, dw_sintetico
+from datos_dashboard import ARCHIVOS, exportar_tablas, leer_tabla, TABLAS_RESUMEN
+from cubo_scorecard import construir_cubo, construir_cubo_resumen
+from etl_dw import actualizar_resumenes
+
+TABLAS_FILAS = ["proyectos", "tareas", "incidentes"]
+
+# =========================================================================
+# UTILIDADES
+# =========================================================================
+
+def _bytes(carpeta, tablas):
+    return sum(
+        os.path.getsize(os.path.join(carpeta, f"{ARCHIVOS[t]}.{ext}"))
+        for t in tablas for ext in ("parquet", "csv")
+    )
+
+def _iguales(a, b):
+    # Mismos valores en los DataFrames del cubo (los dtypes pueden variar: int32 del resumen vs int64)
+    if isinstance(a, pd.DataFrame):
+        if not isinstance(b, pd.DataFrame) or list(a.columns.drop("idProyecto", errors="ignore")) != list(b.columns.drop("idProyecto", errors="ignore")):
+            return False
+        cols = a.columns.drop("idProyecto", errors="ignore")
+        try:
+            pd.testing.assert_frame_equal(
+                a[cols].reset_index(drop=True).astype(object), b[cols].reset_index(drop=True).astype(object),
+                check_dtype=False
+            )
+        except AssertionError:
+            return False
+        return True
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(_iguales(a[k], b[k]) for k in a)
+    return a == b
+
+def _resumenes(conn):
+    return [
+        pd.read_sql(f"SELECT * FROM {t} ORDER BY 1, 2, 3", conn)
+        for t in ("resumen_anio", "resumen_proyecto")
+    ]
+
+def _agregar_hechos(conn, fraccion, semilla):
+    # Tareas e incidentes nuevos para una fracción de los proyectos (lo que trae una corrida incremental)
+    rng = np.random.default_rng(semilla)
+    ids = [r[0] for r in conn.execute("SELECT idProyecto FROM dim_proyecto").fetchall()]
+    tocados = sorted(rng.choice(ids, max(1, int(len(ids) * fraccion)), replace=False).tolist())
+    sig_tarea = conn.execute("SELECT COALESCE(MAX(idTarea), 0) + 1 FROM dim_tarea").fetchone()[0]
+    sig_inc = conn.execute("SELECT COALESCE(MAX(idIncidente), 0) + 1 FROM hecho_incidente").fetchone()[0]
+    tareas, incidentes = [], []
+    for i, pid in enumerate(tocados):
+        tareas.append((sig_tarea + i, f"Tarea {sig_tarea + i}", int(rng.integers(0, 2)), pid))
+        incidentes.append((sig_inc + i, pid, sig_tarea + i, 1, "Media", "Cerrado", 100.0))
+    conn.executemany("INSERT INTO dim_tarea (idTarea, nombre, es_automatizacion, idProyecto) VALUES (?, ?, ?, ?)", tareas)
+    conn.executemany(
+        "INSERT INTO hecho_incidente (idIncidente, idProyecto, idTarea, idCalidad, severidad, estado, costo_correccion) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", incidentes
+    )
+    return set(tocados)
+
+# =========================================================================
+# COMPARACIÓN
+# =========================================================================
+
+def correr(tamanos, fraccion=0.02, semilla=42):
+    resultados = []
+    for n in tamanos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "dw.db")
+            dw_sintetico(n, semilla, ruta=ruta).close()
+            conectar = lambda: sqlite3.connect(ruta, check_same_thread=False)
+
+            _, t_filas = medir(exportar_tablas, conectar, TABLAS_FILAS, carpeta)
+            _, t_resumen = medir(exportar_tablas, conectar, TABLAS_RESUMEN, carpeta)
+            filas = [leer_tabla(t, carpeta=carpeta) for t in TABLAS_FILAS]
+            resumenes = [leer_tabla(t, carpeta=carpeta) for t in TABLAS_RESUMEN]
+            cubo_filas, t_cubo_filas = medir(construir_cubo, *filas, repeticiones=3)
+            cubo_resumen, t_cubo_resumen = medir(construir_cubo_resumen, *resumenes, repeticiones=3)
+
+            conn = sqlite3.connect(ruta)
+            tocados = _agregar_hechos(conn, fraccion, semilla)
+            _, t_incremental = medir(actualizar_resumenes, conn.cursor(), tocados, "sqlite")
+            incremental = _resumenes(conn)
+            _, t_completo = medir(actualizar_resumenes, conn.cursor(), None, "sqlite")
+            completo = _resumenes(conn)
+            conn.close()
+
+            fila = {
+                "incidentes": n,
+                "exportar_filas_kb": round(_bytes(carpeta, TABLAS_FILAS) / 1024, 1),
+                "exportar_resumen_kb": round(_bytes(carpeta, TABLAS_RESUMEN) / 1024, 1),
+                "exportar_filas_s": round(t_filas, 3),
+                "exportar_resumen_s": round(t_resumen, 3),
+                "cubo_filas_s": round(t_cubo_filas, 3),
+                "cubo_resumen_s": round(t_cubo_resumen, 3),
+                "cubo_identico": _iguales(cubo_filas, cubo_resumen),
+                "proyectos_tocados": len(tocados),
+                "resumen_incremental_ms": round(t_incremental * 1000, 2),
+                "resumen_completo_ms": round(t_completo * 1000, 2),
+                "incremental_igual_a_completo": all(a.equals(b) for a, b in zip(incremental, completo)),
+            }
+        print(json.dumps(fila, ensure_ascii=False))
+        resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incidentes", type=int, nargs="+", default=[20000, 200000])
+    parser.add_argument("--fraccion", type=float, default=0.02, help="Fracción de proyectos con datos nuevos")
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.incidentes, args.fraccion)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
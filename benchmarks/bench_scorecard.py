@@ -0,0 +1,155 @@
+"""
+Tiempo por panel del Balanced Scorecard: cálculo en cada rerun vs cubo.
+
+"antes" es el cálculo de cada panel como estaba en Dashboard.py (groupby, merge
+y melt sobre las tablas completas en cada rerun); "despues" es la búsqueda en el
+cubo de cubo_scorecard.py. También mide lo que cuesta construir el cubo (una vez
+por versión de datos) y verifica que ambos caminos dan los mismos datos a las
+gráficas para cada año y para "Todos".
+
+Uso:
+    python benchmarks/bench_scorecard.py --filas 10000 100000 1000000
+"""
+import argparse
+import json
+
+import pandas as pd
+
+from comun import medir
+from bench_snapshot import generar_exportaciones
+from datos_dashboard import tipar_tabla
+from cubo_scorecard import CLAVE_TODOS, construir_cubo
+
+# =========================================================================
+# PANELES COMO ESTABAN EN Dashboard.py (SE RECALCULAN EN CADA RERUN)
+# =========================================================================
+
+def panel1_antes(proyectos):
+    proy_final = proyectos[proyectos["EstadoProyecto"] == "FINALIZADO"]
+    if proy_final.empty:
+        return None
+    resumen_anio = (
+        proy_final
+        .assign(Dentro=lambda df: df["costo_real"] <= df["presupuesto"])
+        .groupby("AnioCierre")
+        .agg(Finalizados=("idProyecto", "count"), DentroPresupuesto=("Dentro", "sum"))
+        .reset_index()
+    )
+    resumen_anio["FueraPresupuesto"] = resumen_anio["Finalizados"] - resumen_anio["DentroPresupuesto"]
+    resumen_anio["AnioCierre"] = resumen_anio["AnioCierre"].astype(str)
+    long_df = resumen_anio.melt(id_vars=["AnioCierre"], value_vars=["DentroPresupuesto", "FueraPresupuesto"],
+                                var_name="Tipo", value_name="Proyectos")
+    long_df["Tipo"] = long_df["Tipo"].map({"DentroPresupuesto": "Dentro del presupuesto", "FueraPresupuesto": "Fuera del presupuesto"})
+    return long_df
+
+def panel2_antes(proyectos):
+    proy_cancel = proyectos[proyectos["EstadoProyecto"] == "CANCELADO"]
+    if proy_cancel.empty:
+        return None
+    return (
+        proy_cancel.groupby("Industria", observed=True)["idProyecto"].count()
+        .reset_index(name="ProyectosCancelados")
+        .sort_values("ProyectosCancelados", ascending=False)
+    ).head(5)
+
+def panel3_antes(tareas, proyectos, anio_sel):
+    tareas_con_anio = tareas.merge(proyectos[["idProyecto", "AnioCierre"]], left_on="Proyecto_idProyecto",
+                                   right_on="idProyecto", how="left")
+    tareas_filtradas = tareas_con_anio.copy()
+    if anio_sel != CLAVE_TODOS:
+        tareas_filtradas = tareas_filtradas[tareas_filtradas["AnioCierre"] == anio_sel]
+    if tareas_filtradas.empty:
+        return None
+    resumen_auto = (
+        tareas_filtradas.groupby("Proyecto_idProyecto")
+        .agg(TareasTotales=("idTarea", "count"), TareasAuto=("EsAutomatizacion", "sum"))
+        .reset_index()
+    )
+    resumen_auto["TareasNoAuto"] = resumen_auto["TareasTotales"] - resumen_auto["TareasAuto"]
+    resumen_auto = resumen_auto.merge(proyectos[["idProyecto", "nombre_proyecto"]], left_on="Proyecto_idProyecto",
+                                      right_on="idProyecto", how="left")
+    top_auto = resumen_auto.sort_values("TareasTotales", ascending=False).head(3)
+    plot_df = top_auto.melt(id_vars=["nombre_proyecto"], value_vars=["TareasAuto", "TareasNoAuto"],
+                            var_name="Tipo", value_name="Cantidad")
+    plot_df["Tipo"] = plot_df["Tipo"].map({"TareasAuto": "Automatizadas", "TareasNoAuto": "No automatizadas"})
+    return plot_df
+
+def panel4_antes(incidentes, tareas, proyectos):
+    inc_por_proy = incidentes.groupby("Proyecto_idProyecto")["idIncidente"].count().reset_index(name="NumIncidentes")
+    tareas_por_proy = tareas.groupby("Proyecto_idProyecto")["idTarea"].count().reset_index(name="NumTareas")
+    resumen = inc_por_proy.merge(tareas_por_proy, on="Proyecto_idProyecto", how="left")
+    resumen["NumTareas"] = resumen["NumTareas"].fillna(1)
+    resumen["IncidentesPorTarea"] = resumen["NumIncidentes"] / resumen["NumTareas"]
+    resumen = resumen.merge(proyectos[["idProyecto", "nombre_proyecto"]], left_on="Proyecto_idProyecto",
+                            right_on="idProyecto", how="left")
+    return resumen.sort_values("IncidentesPorTarea", ascending=False).drop_duplicates(subset=["nombre_proyecto"]).head(5)
+
+# =========================================================================
+# COMPARACIÓN
+# =========================================================================
+
+def _iguales(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    try:
+        pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False)
+        return True
+    except AssertionError:
+        return False
+
+def _antes(proyectos_todos, tareas, incidentes, clave):
+    proyectos = proyectos_todos if clave == CLAVE_TODOS else proyectos_todos[proyectos_todos["AnioCierre"] == clave]
+    return {
+        "financiera": lambda: panel1_antes(proyectos),
+        "cancelaciones": lambda: panel2_antes(proyectos),
+        "automatizacion": lambda: panel3_antes(tareas, proyectos, clave),
+        "incidentes": lambda: panel4_antes(incidentes, tareas, proyectos),
+    }
+
+def _del_cubo(entrada, panel):
+    valor = entrada[panel]
+    if panel == "financiera":
+        return valor["por_anio"] if valor else None
+    if panel == "automatizacion":
+        return valor["top"] if valor and valor["estado"] == "ok" else None
+    return valor
+
+def correr(tamanos):
+    resultados = []
+    for n in tamanos:
+        tablas = generar_exportaciones(n)
+        proyectos = tipar_tabla(tablas["proyectos"], "proyectos")
+        tareas = tipar_tabla(tablas["tareas"], "tareas")
+        incidentes = tipar_tabla(tablas["incidentes"], "incidentes")
+
+        cubo, t_cubo = medir(construir_cubo, proyectos, tareas, incidentes)
+        claves = list(cubo)
+        fila = {"filas": n, "claves_cubo": len(claves), "construir_cubo_s": round(t_cubo, 4), "paneles": {}}
+        identico = True
+        for panel in ("financiera", "cancelaciones", "automatizacion", "incidentes"):
+            t_antes, t_despues = 0.0, 0.0
+            for clave in claves:
+                esperado, t = medir(_antes(proyectos, tareas, incidentes, clave)[panel])
+                t_antes += t
+                obtenido, t = medir(lambda: _del_cubo(cubo[clave], panel))
+                t_despues += t
+                identico &= _iguales(esperado, obtenido)
+            fila["paneles"][panel] = {
+                "antes_ms": round(t_antes / len(claves) * 1000, 3),
+                "despues_ms": round(t_despues / len(claves) * 1000, 4),
+            }
+        fila["mismos_datos"] = identico
+        print(json.dumps(fila))
+        resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.filas)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
@@ -0,0 +1,152 @@
+"""
+Latencia del servicio HTTP de predicción (servicio_prediccion.py).
+
+Arranca el servicio en un hilo contra un DW SQLite (comun.dw_sintetico, con
+PoolSQLite), entrena el modelo y la calibración una vez y luego:
+  - --clientes hilos con conexión keep-alive piden /predecir con combinaciones
+    (tareas, semanas) al azar; se reporta p50/p99 del lado del cliente y del
+    histograma del servidor (/metricas), y se verifica que la respuesta sea la
+    misma que calcular_riesgo en el proceso
+  - los mismos hilos mandan a la vez el mismo lote grande a /predecir_lote para
+    ver cuántas solicitudes se coalescen en un solo cálculo
+Los clientes corren en el mismo proceso (comparten el GIL con el servidor), así
+que las latencias son una cota superior.
+
+Resultado de referencia (20000 incidentes, 8 clientes, 2000 solicitudes):
+    /predecir      servidor p50 1.8 ms  p99 4.9 ms   cliente p50 4.5 ms  p99 8.7 ms
+                   ~1650 solicitudes/s, respuestas iguales a calcular_riesgo
+                   (cada predicción pasa por el pool de hilos para no detener el loop)
+    /predecir_lote 8 lotes idénticos de 100000 escenarios: 7 coalescidas (un solo cálculo)
+
+Uso:
+    python benchmarks/bench_servicio.py --solicitudes 2000 --clientes 8
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from comun import dw_sintetico
+import modelo_rayleigh as mr
+from servicio_prediccion import PoolSQLite, ClientePrediccion, iniciar_servicio
+
+def arrancar_en_hilo():
+    """Corre el servicio en un loop propio en otro hilo; regresa (puerto, servicio, detener)."""
+    listo = threading.Event()
+    estado = {}
+
+    def correr():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        servidor, servicio = loop.run_until_complete(iniciar_servicio(puerto=0))
+        estado.update(puerto=servidor.sockets[0].getsockname()[1], servicio=servicio, loop=loop, servidor=servidor)
+        listo.set()
+        loop.run_forever()
+        servidor.close()
+        loop.run_until_complete(servidor.wait_closed())
+        loop.close()
+
+    threading.Thread(target=correr, daemon=True).start()
+    listo.wait()
+    return estado["puerto"], estado["servicio"], lambda: estado["loop"].call_soon_threadsafe(estado["loop"].stop)
+
+def _percentil(valores, p):
+    return round(float(np.percentile(valores, p)), 3)
+
+def correr(n_incidentes, solicitudes, clientes, escenarios_lote, semilla=42):
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_dw = os.path.join(carpeta, "dw.db")
+        dw_sintetico(n_incidentes, semilla, ruta_dw).close()
+        mr.usar_pool(PoolSQLite(ruta_dw))
+        with open(os.devnull, "w") as nulo:
+            with contextlib.redirect_stdout(nulo):
+                mr.actualizar_modelo(ruta=os.path.join(carpeta, "modelo.json"), ruta_cache=None)
+                mr.actualizar_calibracion(ruta=os.path.join(carpeta, "calibracion.json"))
+
+        puerto, servicio, detener = arrancar_en_hilo()
+        rng = np.random.default_rng(semilla)
+        combinaciones = [(int(t), int(s)) for t, s in zip(rng.integers(5, 80, 50), rng.integers(4, 40, 50))]
+        latencias, errores = [], []
+
+        def cliente(i):
+            c = ClientePrediccion(puerto=puerto)
+            local = np.random.default_rng(semilla + i)
+            for _ in range(solicitudes // clientes):
+                t, s = combinaciones[local.integers(len(combinaciones))]
+                inicio = time.perf_counter()
+                estado, respuesta = c.predecir(t, s)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+                if estado != 200 or respuesta != json.loads(json.dumps(mr.calcular_riesgo(t, s))):
+                    errores.append((t, s, estado))
+            c.cerrar()
+
+        hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(clientes)]
+        inicio = time.perf_counter()
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        segundos = time.perf_counter() - inicio
+
+        # Mismo lote grande desde todos los clientes a la vez
+        tareas = rng.integers(5, 200, escenarios_lote).tolist()
+        semanas = rng.integers(4, 52, escenarios_lote).tolist()
+        antes = servicio.contadores["coalescidas"]
+        barrera = threading.Barrier(clientes)
+        tiempos_lote = []
+
+        def cliente_lote():
+            c = ClientePrediccion(puerto=puerto, timeout=60)
+            barrera.wait()
+            inicio = time.perf_counter()
+            estado, _ = c.predecir_lote(tareas, semanas)
+            tiempos_lote.append(time.perf_counter() - inicio)
+            if estado != 200:
+                errores.append(("lote", estado))
+            c.cerrar()
+
+        hilos = [threading.Thread(target=cliente_lote) for _ in range(clientes)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+        _, metricas = ClientePrediccion(puerto=puerto).metricas()
+        detener()
+
+    servidor_predecir = metricas["latencias"]["/predecir"]
+    fila = {
+        "solicitudes": len(latencias),
+        "clientes": clientes,
+        "solicitudes_por_s": round(len(latencias) / segundos),
+        "cliente_p50_ms": _percentil(latencias, 50),
+        "cliente_p99_ms": _percentil(latencias, 99),
+        "servidor_p50_ms": servidor_predecir["p50_ms"],
+        "servidor_p99_ms": servidor_predecir["p99_ms"],
+        "respuestas_distintas": len(errores),
+        "lote_escenarios": escenarios_lote,
+        "lote_max_s": round(max(tiempos_lote), 3),
+        "lote_coalescidas": metricas["contadores"]["coalescidas"] - antes,
+    }
+    print(json.dumps(fila))
+    return fila
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incidentes", type=int, default=20000, help="Tamaño del DW sintético")
+    parser.add_argument("--solicitudes", type=int, default=2000)
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--escenarios-lote", type=int, default=100000)
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultado = correr(args.incidentes, args.solicitudes, args.clientes, args.escenarios_lote)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2)
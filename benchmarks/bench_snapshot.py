@@ -0,0 +1,91 @@
+"""
+Arranque en frío del Dashboard: CSV completos vs snapshot Parquet.
+
+Genera exportaciones sintéticas con las columnas de dw_proyectos, dw_tareas y
+dw_incidentes (escala --filas para tareas/incidentes), las escribe como CSV y
+como Parquet con datos_dashboard, y mide para cada formato el tiempo de lectura
+y la memoria de los DataFrames resultantes (memory_usage(deep=True)).
+
+Uso:
+    python benchmarks/bench_snapshot.py --filas 100000 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from comun import medir
+from datos_dashboard import ruta_archivo, guardar_snapshot, leer_tabla
+
+def generar_exportaciones(n, semilla=42):
+    rng = np.random.default_rng(semilla)
+    n_proy = max(10, n // 5)
+    anios = rng.integers(2021, 2027, n_proy).astype(float)
+    anios[::50] = np.nan
+    proyectos = pd.DataFrame({
+        "idProyecto": np.arange(1, n_proy + 1),
+        "nombre_proyecto": [f"Proyecto_{i:07d}" for i in range(n_proy)],
+        "tipo_proyecto": rng.choice(["WEB", "MOVIL", "ESCRITORIO", "EMBEBIDO"], n_proy),
+        "presupuesto": rng.uniform(5e4, 3.5e5, n_proy).round(2),
+        "costo_real": rng.uniform(5e4, 3.5e5, n_proy).round(2),
+        "fecha_inicio": "2024-01-01",
+        "fecha_fin_real": "2024-06-30",
+        "EstadoProyecto": rng.choice(["Finalizado", "Cancelado"], n_proy),
+        "Industria": rng.choice(["Fintech", "Educación", "Salud", "Retail", "Transporte"], n_proy),
+        "AnioCierre": anios,
+    })
+    tareas = pd.DataFrame({
+        "idTarea": np.arange(1, n + 1),
+        "nombre": [f"Tarea_{i:07d}" for i in range(n)],
+        "EsAutomatizacion": rng.integers(0, 2, n),
+        "EsReutilizado": rng.integers(0, 2, n),
+        "Proyecto_idProyecto": rng.integers(1, n_proy + 1, n),
+    })
+    incidentes = pd.DataFrame({
+        "idIncidente": np.arange(1, n + 1),
+        "Proyecto_idProyecto": rng.integers(1, n_proy + 1, n),
+        "idTarea": rng.integers(1, n + 1, n),
+        "severidad": rng.choice(["Baja", "Media", "Alta", "Critica"], n),
+        "costo_correccion": rng.uniform(100, 2500, n).round(2),
+    })
+    return {"proyectos": proyectos, "tareas": tareas, "incidentes": incidentes}
+
+def _mb(dfs):
+    return round(sum(df.memory_usage(deep=True).sum() for df in dfs) / 2**20, 1)
+
+def correr(tamanos):
+    resultados = []
+    for n in tamanos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            tablas = generar_exportaciones(n)
+            for tabla, df in tablas.items():
+                df.to_csv(ruta_archivo(tabla, "csv", carpeta), index=False)
+                guardar_snapshot(df, tabla, carpeta)
+
+            # Lo que hacía load_data: cada CSV completo, tipos inferidos
+            csv, t_csv = medir(lambda: [pd.read_csv(ruta_archivo(t, "csv", carpeta)) for t in tablas], repeticiones=3)
+            snap, t_snap = medir(lambda: [leer_tabla(t, carpeta=carpeta) for t in tablas], repeticiones=3)
+            fila = {
+                "filas": n,
+                "csv_s": round(t_csv, 3), "parquet_s": round(t_snap, 3),
+                "csv_mb": _mb(csv), "parquet_mb": _mb(snap),
+                "disco_csv_mb": round(sum(os.path.getsize(ruta_archivo(t, "csv", carpeta)) for t in tablas) / 2**20, 1),
+                "disco_parquet_mb": round(sum(os.path.getsize(ruta_archivo(t, "parquet", carpeta)) for t in tablas) / 2**20, 1),
+            }
+        print(json.dumps(fila))
+        resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.filas)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
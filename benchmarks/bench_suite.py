@@ -0,0 +1,246 @@
+"""
+Suite de extremo a extremo: OLTP -> ETL -> DW -> exportación -> Dashboard -> predicción.
+
+Para cada factor (1x, 10x, 100x de --base veces las CANTIDADES del notebook de
+datos sintéticos) llena un OLTP SQLite con generador_oltp (esquema de
+Version1_Gestion_Fase_1_y_2.sql) y mide tiempo y pico de memoria (tracemalloc)
+de cada etapa, contra SQLite como sustituto de db_gestion y db_soporte:
+  - extraccion:    las tablas de obtener_todo con extraccion_oltp.extraer_tabla
+  - transformacion: calcular_metricas_proyectos + construir_tablas_dw
+  - carga:         cargar_tablas_dw (INSERT multi-fila por lotes) + actualizar_resumenes + commit
+  - exportacion.*: cada consulta de datos_dashboard.CONSULTAS_EXPORTACION (CSV + Parquet)
+  - dashboard.*:   leer_tabla del snapshot, preparar_vistas, cada panel del
+                   Balanced Scorecard para todos los años y el cubo desde los resúmenes
+  - prediccion.*:  entrenar (modelo + calibración), predecir_riesgo_defecto con
+                   el caché vacío y predecir_riesgo_lote con --escenarios
+
+Escribe el resultado en JSON (--salida) con el commit, la fecha y la versión de
+Python. Con --comparar se compara contra un JSON anterior y se marcan las etapas
+que tardan más de --umbral veces lo que tardaban (regresiones).
+
+Los tiempos incluyen el costo de tracemalloc; --sin-memoria lo apaga para tener
+solo tiempos.
+
+Resultado de referencia (--base 10, con tracemalloc, segundos):
+                               extraccion  transformacion  carga  exportacion  paneles  predecir_200  lote
+    1x   (6350 filas OLTP):       0.27         0.32         0.11      0.15       0.39       0.42      0.12
+    10x  (63500 filas OLTP):      1.47         0.73         0.57      0.43       0.36       0.41      0.10
+    100x (635000 filas OLTP):    19.8          4.08         5.08      5.54       0.59       0.52      0.15
+
+Uso:
+    python benchmarks/bench_suite.py --factores 1 10 100 --base 10 --salida suite.json
+    python benchmarks/bench_suite.py --salida suite_nueva.json --comparar suite.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from comun import RAIZ, crear_dw_sqlite, oltp_generado
+from generador_oltp import CANTIDADES
+from extraccion_oltp import extraer_tabla
+from etl_dw import calcular_metricas_proyectos, construir_tablas_dw, cargar_tablas_dw, actualizar_resumenes
+from datos_dashboard import ARCHIVOS, CONSULTAS_EXPORTACION, exportar_tabla, leer_tabla
+from cubo_scorecard import CLAVE_TODOS, PANELES, preparar_vistas, calcular_panel, construir_cubo_resumen
+import modelo_rayleigh as mr
+from servicio_prediccion import PoolSQLite
+
+CERRADOS = ["FINALIZADO", "CANCELADO"]
+TABLAS_OBTENER_TODO = ("cliente", "equipo", "empleado", "proyecto", "tarea", "asignacion_tarea", "incidente")
+
+# =========================================================================
+# MEDICIÓN POR ETAPA
+# =========================================================================
+
+class Etapas:
+    """Corre cada etapa una vez y guarda segundos y pico de memoria (MB)."""
+    def __init__(self, memoria=True):
+        self.memoria = memoria
+        self.resultados = {}
+
+    def medir(self, nombre, fn, *args, **kwargs):
+        if self.memoria:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        resultado = fn(*args, **kwargs)
+        segundos = time.perf_counter() - inicio
+        etapa = {"s": round(segundos, 4)}
+        if self.memoria:
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            etapa["pico_mb"] = round(pico / 2**20, 2)
+        self.resultados[nombre] = etapa
+        return resultado
+
+# =========================================================================
+# ETAPAS
+# =========================================================================
+
+def extraer(ruta_oltp):
+    conn = sqlite3.connect(ruta_oltp)
+    datos = {tabla: extraer_tabla(conn, tabla) for tabla in TABLAS_OBTENER_TODO}
+    conn.close()
+    return datos
+
+def transformar(datos):
+    proyecto_df = datos["proyecto"][datos["proyecto"]["Estado"].isin(CERRADOS)]
+    incidente_df = datos["incidente"][datos["incidente"]["Proyecto_idProyecto"].isin(set(proyecto_df["idProyecto"]))]
+    metricas = calcular_metricas_proyectos(proyecto_df, datos["tarea"], datos["asignacion_tarea"], incidente_df)
+    tablas, _ = construir_tablas_dw(
+        datos["cliente"], datos["equipo"], datos["empleado"], proyecto_df, datos["tarea"],
+        datos["asignacion_tarea"], incidente_df, metricas=metricas
+    )
+    return tablas
+
+def cargar(conn_dw, tablas):
+    cursor = conn_dw.cursor()
+    tocados = set()
+    enviados = cargar_tablas_dw(cursor, tablas, dialecto="sqlite", proyectos_tocados=tocados)
+    actualizar_resumenes(cursor, tocados, dialecto="sqlite")
+    conn_dw.commit()
+    return enviados
+
+def paneles(vistas, panel):
+    # El mismo calcular_panel que usa panel_anio, en todos los años y "Todos"
+    claves = [CLAVE_TODOS] + list(vistas["anios"])
+    for clave in claves:
+        calcular_panel(vistas, clave, panel)
+    return len(claves)
+
+def predecir_sin_cache(combinaciones):
+    for t, s in combinaciones:
+        mr._cache_predicciones.limpiar()
+        mr.predecir_riesgo_defecto(t, s)
+
+def correr_factor(factor, base, carpeta, memoria, escenarios, semilla=42):
+    cantidades = {tabla: n * base * factor for tabla, n in CANTIDADES.items()}
+    ruta_oltp = os.path.join(carpeta, f"oltp_{factor}.db")
+    ruta_dw = os.path.join(carpeta, f"dw_{factor}.db")
+    carpeta_export = os.path.join(carpeta, f"export_{factor}")
+    os.makedirs(carpeta_export)
+    etapas = Etapas(memoria)
+
+    filas_oltp = etapas.medir("generar_oltp", oltp_generado, ruta_oltp, cantidades, semilla)
+
+    # ETL
+    datos = etapas.medir("extraccion", extraer, ruta_oltp)
+    tablas = etapas.medir("transformacion", transformar, datos)
+    del datos
+    conn_dw = crear_dw_sqlite(ruta_dw)
+    filas_dw = etapas.medir("carga", cargar, conn_dw, tablas)
+    del tablas
+
+    # Export_to_csvs
+    filas_export = {}
+    for tabla in CONSULTAS_EXPORTACION:
+        filas_export[tabla] = etapas.medir(f"exportacion.{tabla}", exportar_tabla, conn_dw, tabla, carpeta_export)
+    conn_dw.close()
+
+    # Dashboard (desde el snapshot recién exportado)
+    leidas = {}
+    for tabla in ARCHIVOS:
+        leidas[tabla] = etapas.medir(f"dashboard.leer.{tabla}", leer_tabla, tabla, carpeta=carpeta_export)
+    vistas = etapas.medir("dashboard.vistas", preparar_vistas, leidas["proyectos"], leidas["tareas"], leidas["incidentes"])
+    for panel in PANELES:
+        etapas.medir(f"dashboard.panel.{panel}", paneles, vistas, panel)
+    etapas.medir("dashboard.cubo_resumen", construir_cubo_resumen, leidas["resumen_anio"], leidas["resumen_proyectos"])
+
+    # Predicción contra el DW recién cargado
+    mr.usar_pool(PoolSQLite(ruta_dw))
+    with contextlib.redirect_stdout(io.StringIO()):
+        etapas.medir(
+            "prediccion.entrenar",
+            lambda: (mr.actualizar_modelo(forzar=True, ruta=os.path.join(carpeta, f"modelo_{factor}.json"), ruta_cache=None),
+                     mr.actualizar_calibracion(ruta=os.path.join(carpeta, f"calibracion_{factor}.json"))),
+        )
+        rng = np.random.default_rng(semilla)
+        combinaciones = list(zip(rng.integers(5, 80, 200).tolist(), rng.integers(4, 40, 200).tolist()))
+        etapas.medir("prediccion.predecir_200", predecir_sin_cache, combinaciones)
+        etapas.medir(
+            "prediccion.lote", mr.predecir_riesgo_lote,
+            rng.integers(5, 200, escenarios), rng.integers(4, 52, escenarios)
+        )
+
+    fila = {
+        "factor": factor,
+        "filas_oltp": int(sum(filas_oltp.values())),
+        "filas_dw": {t: int(n) for t, n in filas_dw.items()},
+        "filas_exportadas": filas_export,
+        "etapas": etapas.resultados,
+    }
+    print(json.dumps({"factor": factor, "filas_oltp": fila["filas_oltp"],
+                      "etapas_s": {n: e["s"] for n, e in etapas.resultados.items()}}))
+    return fila
+
+# =========================================================================
+# RESULTADOS (JSON) Y COMPARACIÓN CONTRA UNA CORRIDA ANTERIOR
+# =========================================================================
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparar(actual, anterior, umbral):
+    """Etapas (por factor) cuyo tiempo creció más de umbral veces."""
+    previos = {fila["factor"]: fila["etapas"] for fila in anterior["resultados"]}
+    regresiones = []
+    for fila in actual["resultados"]:
+        for nombre, etapa in fila["etapas"].items():
+            previa = previos.get(fila["factor"], {}).get(nombre)
+            # Las etapas de milisegundos son puro ruido
+            if previa is None or previa["s"] < 0.01:
+                continue
+            razon = etapa["s"] / previa["s"]
+            if razon > umbral:
+                regresiones.append({"factor": fila["factor"], "etapa": nombre, "antes_s": previa["s"],
+                                    "ahora_s": etapa["s"], "razon": round(razon, 2)})
+    return regresiones
+
+def correr(factores, base, memoria=True, escenarios=100000):
+    with tempfile.TemporaryDirectory() as carpeta:
+        resultados = [correr_factor(f, base, carpeta, memoria, escenarios) for f in factores]
+    return {
+        "commit": _commit(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "base": base,
+        "memoria": memoria,
+        "resultados": resultados,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--factores", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--base", type=int, default=10, help="1x = base veces las CANTIDADES de generador_oltp")
+    parser.add_argument("--escenarios", type=int, default=100000, help="Escenarios de predecir_riesgo_lote")
+    parser.add_argument("--sin-memoria", action="store_true", help="No usar tracemalloc (solo tiempos)")
+    parser.add_argument("--salida", default="suite_resultados.json", help="Ruta del JSON de resultados")
+    parser.add_argument("--comparar", default=None, help="JSON de una corrida anterior")
+    parser.add_argument("--umbral", type=float, default=1.25, help="Razón de tiempo que cuenta como regresión")
+    args = parser.parse_args()
+
+    resultado = correr(args.factores, args.base, not args.sin_memoria, args.escenarios)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            resultado["regresiones"] = comparar(resultado, json.load(f), args.umbral)
+        for r in resultado["regresiones"]:
+            print(f"REGRESIÓN {r['etapa']} ({r['factor']}x): {r['antes_s']} s -> {r['ahora_s']} s ({r['razon']}x)")
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"Resultados en {args.salida}")
+    sys.exit(1 if resultado.get("regresiones") else 0)
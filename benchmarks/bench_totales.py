@@ -0,0 +1,75 @@
+"""
+Construcción del set de entrenamiento del modelo de defectos.
+
+Compara tres formas de obtener Total_Tareas, Tiempo_Semanas y Total_Defectos
+de todos los proyectos en un DW SQLite (comun.dw_sintetico):
+  - n+1:     una consulta de proyectos y dos por proyecto (como los callproc de
+             contar_tareas y calcular_semanas_proyecto)
+  - vista:   obtener_totales_proyectos, una sola consulta a v_entrenamiento_defectos
+  - cache:   obtener_totales_proyectos con ruta_cache cuando el Parquet ya es de
+             la versión actual del DW
+y verifica que las tres regresan los mismos datos.
+
+Resultado de referencia:
+    3305 proyectos:   n+1 3.33 s    vista 0.023 s   cache 0.002 s
+    13014 proyectos:  (n+1 omitido) vista 0.086 s   cache 0.002 s
+
+Uso:
+    python benchmarks/bench_totales.py --incidentes 10000 50000 200000 --max-legado 50000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+from comun import medir, dw_sintetico
+from bench_modelo import totales_desde_dw
+from modelo_rayleigh import obtener_totales_proyectos, version_datos_dw
+
+COLUMNAS = ["idProyecto", "Tiempo_Semanas", "Total_Defectos", "Total_Tareas"]
+
+def _normalizar(df):
+    return df[COLUMNAS].sort_values("idProyecto").reset_index(drop=True).astype("int64")
+
+def _silencio(fn, *args, **kwargs):
+    # obtener_totales_proyectos imprime el head() del resultado
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+def correr(tamanos, max_legado, semilla=42):
+    resultados = []
+    for n in tamanos:
+        conn = dw_sintetico(n, semilla)
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "totales_proyectos.parquet")
+            version = version_datos_dw(conn)
+
+            vista, t_vista = medir(_silencio, obtener_totales_proyectos, conn, repeticiones=3)
+            _silencio(obtener_totales_proyectos, conn, ruta_cache=ruta, version=version)
+            cache, t_cache = medir(_silencio, obtener_totales_proyectos, conn, ruta_cache=ruta, version=version, repeticiones=3)
+
+            fila = {"incidentes": n, "proyectos": len(vista), "vista_s": round(t_vista, 4), "cache_s": round(t_cache, 4)}
+            identico = _normalizar(vista).equals(_normalizar(cache))
+            if n <= max_legado:
+                legado, t_legado = medir(totales_desde_dw, conn)
+                fila["n_mas_1_s"] = round(t_legado, 3)
+                identico &= _normalizar(legado).equals(_normalizar(vista))
+            fila["mismos_datos"] = identico
+        conn.close()
+        print(json.dumps(fila))
+        resultados.append(fila)
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incidentes", type=int, nargs="+", default=[10000, 50000, 200000])
+    parser.add_argument("--max-legado", type=int, default=50000, help="Tamaño máximo para correr el camino n+1")
+    parser.add_argument("--salida", default=None, help="Ruta opcional para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.incidentes, args.max_legado)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
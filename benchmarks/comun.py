@@ -0,0 +1,248 @@
+"""
+Utilidades compartidas por los benchmarks: rutas, cronómetro, datos OLTP
+sintéticos con la forma de los result sets de obtener_todo y un DW en SQLite
+como sustituto local de db_soporte.
+"""
+import sys
+import time
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+CARPETA_ETL = RAIZ / "Proyecto Versiones FINALES"
+for ruta in (RAIZ, CARPETA_ETL):
+    if str(ruta) not in sys.path:
+        sys.path.insert(0, str(ruta))
+
+# =========================================================================
+# CRONÓMETRO
+# =========================================================================
+
+def medir(fn, *args, repeticiones=1, **kwargs):
+    """Ejecuta fn y regresa (resultado, mejor tiempo en segundos)."""
+    mejor = float("inf")
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = fn(*args, **kwargs)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return resultado, mejor
+
+# =========================================================================
+# DATOS OLTP SINTÉTICOS (MISMAS COLUMNAS QUE obtener_todo)
+# =========================================================================
+
+def _fechas(rng, n, base=pd.Timestamp("2025-11-01"), dias=1000):
+    return (base - pd.to_timedelta(rng.integers(1, dias, n), unit="D")).date
+
+def generar_oltp(n_incidentes, semilla=42):
+    """
+    Regresa los 8 DataFrames de obtener_todo con proporciones parecidas a la BD
+    de gestión: ~1 proyecto por cada 5 incidentes y ~1 asignación por incidente.
+    """
+    rng = np.random.default_rng(semilla)
+    n_clientes = max(10, n_incidentes // 500)
+    n_equipos = max(5, n_incidentes // 2000)
+    n_empleados = max(30, n_incidentes // 100)
+    n_proyectos = max(20, n_incidentes // 5)
+    n_tareas = max(40, n_incidentes // 2)
+    n_asignaciones = n_incidentes
+
+    cliente_df = pd.DataFrame({
+        "idCliente": np.arange(1, n_clientes + 1),
+        "Nombre": [f"CLI{i:06d}" for i in range(n_clientes)],
+        "Email": [f"cli{i}@empresa.com" for i in range(n_clientes)],
+        "Telefono": [f"+52{2220000000 + i}" for i in range(n_clientes)],
+        "Industria": rng.choice(["Fintech", "Educación", "Salud", "Retail", "Transporte"], n_clientes),
+        "MetricaClienteInicial": rng.uniform(50000, 200000, n_clientes).round(2),
+    })
+    equipo_df = pd.DataFrame({
+        "idEquipo": np.arange(1, n_equipos + 1),
+        "Nombre": [f"Equipo_{i}" for i in range(n_equipos)],
+        "Activo": rng.integers(0, 2, n_equipos),
+    })
+    empleado_df = pd.DataFrame({
+        "idEmpleado": np.arange(1, n_empleados + 1),
+        "Nombre": [f"EMP{i:06d}" for i in range(n_empleados)],
+        "Email": [f"emp{i}@empresa.com" for i in range(n_empleados)],
+        "Salario": rng.uniform(8000, 22000, n_empleados).round(2),
+        "SalarioxHora": rng.uniform(100, 300, n_empleados).round(2),
+        "Equipo_idEquipo": rng.integers(1, n_equipos + 1, n_empleados),
+    })
+    estadistica_df = pd.DataFrame({
+        "idEstadistica": [1], "Fecha": _fechas(rng, 1), "Tareas_completadas": [10],
+        "Tareas_pendientes": [2], "Horas_trabajadas": [40.0], "Costo_diario": [1000.0],
+    })
+    inicio = pd.to_datetime(_fechas(rng, n_proyectos))
+    fin_est = inicio + pd.to_timedelta(rng.integers(30, 180, n_proyectos), unit="D")
+    fin_real = fin_est + pd.to_timedelta(rng.integers(-10, 20, n_proyectos), unit="D")
+    proyecto_df = pd.DataFrame({
+        "idProyecto": np.arange(1, n_proyectos + 1),
+        "Nombre": [f"Proyecto_{i:06d}" for i in range(n_proyectos)],
+        "Descripcion": rng.choice(["Sistema web de ventas", "App móvil", "ERP", "Control escolar", "Dashboard BI"], n_proyectos),
+        "Tipo": rng.choice(["WEB", "MOVIL", "ESCRITORIO", "EMBEBIDO"], n_proyectos),
+        "Fecha_inicio": inicio.date,
+        "Fecha_fin_estimada": fin_est.date,
+        "Fecha_fin_real": fin_real.date,
+        "Estado": rng.choice(["ACTIVO", "CANCELADO", "EN_PRUEBAS", "EN_PLANEACION", "FINALIZADO", "PAUSADO"], n_proyectos),
+        "Presupuesto": rng.uniform(50000, 350000, n_proyectos).round(2),
+        "Costo_real": rng.uniform(50000, 350000, n_proyectos).round(2),
+        "Cliente_idCliente": rng.integers(1, n_clientes + 1, n_proyectos),
+        "Estadisticas_Proyecto_idEstadistica": 1,
+        "MetricaClienteFinal": rng.uniform(50000, 350000, n_proyectos).round(2),
+        "CertificacionSeguridad": rng.integers(0, 2, n_proyectos),
+    })
+    creacion = pd.to_datetime(_fechas(rng, n_tareas))
+    tarea_df = pd.DataFrame({
+        "idTarea": np.arange(1, n_tareas + 1),
+        "Titulo": [f"Tarea_{i:06d}" for i in range(n_tareas)],
+        "Descripcion": rng.choice(["Implementar frontend", "Implementar backend", "Implementar API", "Implementar test"], n_tareas),
+        "Fecha_creacion": creacion.to_pydatetime(),
+        "Fecha_fin_estimada": (creacion + pd.to_timedelta(rng.integers(5, 30, n_tareas), unit="D")).date,
+        "Fecha_fin_real": (creacion + pd.to_timedelta(rng.integers(5, 35, n_tareas), unit="D")).date,
+        "Estado": rng.choice(["PENDIENTE", "EN_PROGRESO", "EN_REVISION", "COMPLETADA", "BLOQUEADA"], n_tareas),
+        "Prioridad": rng.choice(["BAJA", "MEDIA", "ALTA", "CRITICA"], n_tareas),
+        "Horas_estimadas": rng.integers(5, 120, n_tareas),
+        "EsAutomatizacion": rng.integers(0, 2, n_tareas),
+        "EsReutilizado": rng.integers(0, 2, n_tareas),
+    })
+    asignacion_df = pd.DataFrame({
+        "idAsignacion": np.arange(1, n_asignaciones + 1),
+        "Tarea_idTarea": rng.integers(1, n_tareas + 1, n_asignaciones),
+        "Empleado_idEmpleado": rng.integers(1, n_empleados + 1, n_asignaciones),
+        "Fecha_asignacion": _fechas(rng, n_asignaciones),
+        "Horas_estimadas": rng.integers(5, 120, n_asignaciones),
+        "Horas_reales": rng.integers(5, 120, n_asignaciones),
+        "Proyecto_idProyecto": rng.integers(1, n_proyectos + 1, n_asignaciones),
+    })
+    incidente_df = pd.DataFrame({
+        "idIncidente": np.arange(1, n_incidentes + 1),
+        "Proyecto_idProyecto": rng.integers(1, n_proyectos + 1, n_incidentes),
+        "Fecha_reporte": _fechas(rng, n_incidentes),
+        "Severidad": rng.choice(["BAJA", "MEDIA", "ALTA", "CRITICA"], n_incidentes),
+        "Estado": "CERRADO",
+        "idTarea": rng.integers(1, n_tareas + 1, n_incidentes),
+        "CostoCorreccion": rng.uniform(100, 2500, n_incidentes).round(2),
+    })
+    return [cliente_df, equipo_df, empleado_df, estadistica_df, proyecto_df, tarea_df, asignacion_df, incidente_df]
+
+TABLAS_OLTP = [
+    "cliente", "equipo", "empleado", "estadisticas_proyecto", "proyecto", "tarea", "asignacion_tarea", "incidente",
+]
+
+def crear_oltp_sqlite(ruta, tablas_oltp):
+    """
+    Vuelca los 8 DataFrames de generar_oltp en una BD SQLite con los nombres de
+    db_gestion (sustituto local para probar la extracción). Las fechas se guardan
+    como texto ISO, igual que las regresaría el conector como cadena.
+    """
+    conn = sqlite3.connect(ruta)
+    for nombre, df in zip(TABLAS_OLTP, tablas_oltp):
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype == object and len(df) and hasattr(df[col].iloc[0], "isoformat"):
+                df[col] = [v.isoformat(" ") if hasattr(v, "hour") else v.isoformat() for v in df[col]]
+        df.to_sql(nombre, conn, index=False, if_exists="replace")
+    conn.commit()
+    return conn
+
+def oltp_generado(ruta, cantidades, semilla=42, base="2025-11-01"):
+    """
+    BD SQLite con las tablas de db_gestion llenas con generador_oltp (mismas
+    columnas que el notebook de datos sintéticos). Regresa filas por tabla.
+    """
+    import contextlib
+    import io
+    from generador_oltp import generar_bloques, poblar
+
+    conn = sqlite3.connect(ruta)
+    for tabla, df in generar_bloques({t: 1 for t in cantidades}, tam_bloque=1):
+        conn.execute(f"CREATE TABLE {tabla} ({', '.join(df.columns)})")
+    with contextlib.redirect_stdout(io.StringIO()):
+        filas = poblar(conn, generar_bloques(cantidades, semilla=semilla, base=base), dialecto="sqlite")
+    conn.close()
+    return filas
+
+def filtrar_cerrados(proyecto_df, incidente_df):
+    """Mismo filtro del ETL: solo proyectos FINALIZADOS/CANCELADOS y sus incidentes."""
+    proyecto_df = proyecto_df[proyecto_df["Estado"].isin(["FINALIZADO", "CANCELADO"])]
+    incidente_df = incidente_df[incidente_df["Proyecto_idProyecto"].isin(set(proyecto_df["idProyecto"]))]
+    return proyecto_df, incidente_df
+
+# =========================================================================
+# DW EN SQLITE (SUSTITUTO LOCAL DE db_soporte)
+# =========================================================================
+
+DDL_DW_SQLITE = """
+CREATE TABLE dim_cliente (idCliente INTEGER PRIMARY KEY, nombre TEXT, email TEXT, telefono TEXT, industria TEXT, metrica_base_roi REAL);
+CREATE TABLE dim_equipo (idEquipo INTEGER PRIMARY KEY, nombre TEXT, activo INTEGER);
+CREATE TABLE dim_empleado (idEmpleado INTEGER PRIMARY KEY, nombre TEXT, email TEXT, salario REAL, salarioxhora REAL, idEquipo INTEGER);
+CREATE TABLE dim_estado_proyecto (idEstado INTEGER PRIMARY KEY, estado TEXT);
+CREATE TABLE dim_proyecto (idProyecto INTEGER PRIMARY KEY, nombre_proyecto TEXT, tipo_proyecto TEXT, descripcion TEXT,
+    presupuesto REAL, costo_real REAL, metrica_final_roi REAL, certificacion_seguridad INTEGER, fecha_inicio TEXT,
+    fecha_fin_estimada TEXT, fecha_fin_real TEXT, idCliente INTEGER, idEquipo INTEGER, idEstado INTEGER);
+CREATE TABLE dim_tarea (idTarea INTEGER PRIMARY KEY, nombre TEXT, descripcion TEXT, fecha_creacion TEXT,
+    fecha_fin_estimada TEXT, fecha_fin_real TEXT, prioridad INTEGER, es_automatizacion INTEGER, es_reutilizado INTEGER, idProyecto INTEGER);
+CREATE TABLE dim_tiempo (idTiempo INTEGER PRIMARY KEY, fecha_completa TEXT, anio INTEGER, trimestre INTEGER, mes INTEGER, semana INTEGER, dia INTEGER);
+CREATE TABLE dim_calidad (idCalidad INTEGER PRIMARY KEY, severidad_defecto TEXT, tipo_incidente TEXT, certificacion_seguridad INTEGER);
+CREATE TABLE hecho_proyecto (idFact INTEGER PRIMARY KEY, idProyecto INTEGER, idCliente INTEGER, idEquipo INTEGER, idTiempo INTEGER,
+    idEstado INTEGER, presupuesto REAL, costo_real REAL, desviacion_presupuestal REAL, metrica_base_roi REAL, metrica_final_roi REAL,
+    tareas_automatizacion_total INTEGER, tareas_reutilizadas_total INTEGER, defectos_reportados INTEGER, costo_defecto REAL,
+    avance_proyecto REAL, horas_estimadas_total REAL, horas_reales_total REAL);
+CREATE TABLE hecho_incidente (idIncidente INTEGER PRIMARY KEY, idProyecto INTEGER, idTarea INTEGER, idCalidad INTEGER,
+    fecha_reporte TEXT, severidad TEXT, estado TEXT, costo_correccion REAL);
+CREATE INDEX idx_tarea_proyecto ON dim_tarea (idProyecto);
+CREATE INDEX idx_hp_proyecto ON hecho_proyecto (idProyecto);
+CREATE INDEX idx_hp_cliente ON hecho_proyecto (idCliente);
+CREATE INDEX idx_hp_equipo ON hecho_proyecto (idEquipo);
+CREATE INDEX idx_hp_tiempo ON hecho_proyecto (idTiempo);
+CREATE INDEX idx_hp_estado ON hecho_proyecto (idEstado);
+CREATE INDEX idx_hi_proyecto ON hecho_incidente (idProyecto);
+CREATE INDEX idx_hi_tarea ON hecho_incidente (idTarea);
+CREATE INDEX idx_hi_calidad ON hecho_incidente (idCalidad);
+CREATE TABLE resumen_anio (anio INTEGER NOT NULL, estado TEXT NOT NULL, industria TEXT NOT NULL, proyectos INTEGER NOT NULL,
+    dentro_presupuesto INTEGER NOT NULL, PRIMARY KEY (anio, estado, industria));
+CREATE TABLE resumen_proyecto (idProyecto INTEGER PRIMARY KEY, tareas_total INTEGER NOT NULL, tareas_automatizadas INTEGER NOT NULL,
+    incidentes INTEGER NOT NULL);
+CREATE TABLE etl_watermark (proceso TEXT PRIMARY KEY, ultimo_idIncidente INTEGER NOT NULL DEFAULT 0,
+    ultimo_idProyecto INTEGER NOT NULL DEFAULT 0, ultima_modificacion TEXT NOT NULL, fecha_ejecucion TEXT);
+CREATE VIEW v_entrenamiento_defectos AS
+SELECT p.idProyecto, COALESCE(t.total_tareas, 0) AS Total_Tareas,
+    COALESCE(CAST((julianday(p.fecha_fin_real) - julianday(p.fecha_inicio)) / 7 AS INTEGER), 0) AS Tiempo_Semanas,
+    h.defectos_reportados AS Total_Defectos
+FROM dim_proyecto p
+JOIN hecho_proyecto h ON h.idProyecto = p.idProyecto
+LEFT JOIN (SELECT idProyecto, COUNT(*) AS total_tareas FROM dim_tarea GROUP BY idProyecto) t ON t.idProyecto = p.idProyecto;
+"""
+
+# Las columnas DATETIME de obtener_todo llegan como pd.Timestamp
+sqlite3.register_adapter(pd.Timestamp, lambda t: t.isoformat(" "))
+
+def crear_dw_sqlite(ruta=":memory:"):
+    conn = sqlite3.connect(ruta)
+    conn.executescript(DDL_DW_SQLITE)
+    return conn
+
+def contar_filas(conn, tablas):
+    return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tablas}
+
+def dw_sintetico(n_incidentes, semilla=42, ruta=":memory:"):
+    """DW SQLite poblado con el ETL por conjuntos a partir de generar_oltp."""
+    from etl_dw import calcular_metricas_proyectos, construir_tablas_dw, cargar_tablas_dw, actualizar_resumenes
+
+    cliente_df, equipo_df, empleado_df, _, proyecto_df, tarea_df, asignacion_df, incidente_df = generar_oltp(n_incidentes, semilla)
+    proyecto_df, incidente_df = filtrar_cerrados(proyecto_df, incidente_df)
+    metricas = calcular_metricas_proyectos(proyecto_df, tarea_df, asignacion_df, incidente_df)
+    tablas, _ = construir_tablas_dw(
+        cliente_df, equipo_df, empleado_df, proyecto_df, tarea_df, asignacion_df, incidente_df, metricas=metricas
+    )
+    conn = crear_dw_sqlite(ruta)
+    cursor = conn.cursor()
+    tocados = set()
+    cargar_tablas_dw(cursor, tablas, dialecto="sqlite", proyectos_tocados=tocados)
+    actualizar_resumenes(cursor, tocados, dialecto="sqlite")
+    conn.commit()
+    return conn
@@ -0,0 +1,302 @@
+import pandas as pd
+
+# =========================================================================
+# CUBO DEL BALANCED SCORECARD
+# =========================================================================
+# Los cuatro paneles de Dashboard.py se calculan una sola vez por versión de
+# datos, para cada AnioCierre y para "Todos". En cada rerun de Streamlit el
+# panel solo busca su entrada en el cubo (cubo[anio][panel]); ya no se hacen
+# groupby, merge ni melt sobre las tablas completas.
+
+CLAVE_TODOS = "Todos"
+
+def _panel_financiera(total_final, total_dentro, resumen_anio):
+    # resumen_anio: AnioCierre, Finalizados, DentroPresupuesto (None si no hay año)
+    panel = {
+        "total_final": total_final,
+        "total_dentro": total_dentro,
+        "pct_dentro": (total_dentro / total_final * 100) if total_final > 0 else 0,
+        "por_anio": None,
+    }
+    if resumen_anio is not None:
+        resumen_anio["FueraPresupuesto"] = resumen_anio["Finalizados"] - resumen_anio["DentroPresupuesto"]
+
+        # pasar a formato largo para barras agrupadas
+        resumen_anio["AnioCierre"] = resumen_anio["AnioCierre"].astype(str)
+        long_df = resumen_anio.melt(
+            id_vars=["AnioCierre"],
+            value_vars=["DentroPresupuesto", "FueraPresupuesto"],
+            var_name="Tipo",
+            value_name="Proyectos"
+        )
+        long_df["Tipo"] = long_df["Tipo"].map({
+            "DentroPresupuesto": "Dentro del presupuesto",
+            "FueraPresupuesto": "Fuera del presupuesto"
+        })
+        panel["por_anio"] = long_df
+    return panel
+
+def _financiera(proyectos):
+    # Panel 1: proyectos finalizados dentro de presupuesto, por año
+    proy_final = proyectos[proyectos["EstadoProyecto"] == "FINALIZADO"]
+    if proy_final.empty:
+        return None
+    total_final = len(proy_final)
+    total_dentro = int((proy_final["costo_real"] <= proy_final["presupuesto"]).sum())
+    resumen_anio = None
+    if "AnioCierre" in proy_final.columns:
+        resumen_anio = (
+            proy_final
+            .assign(Dentro=lambda df: df["costo_real"] <= df["presupuesto"])
+            .groupby("AnioCierre")
+            .agg(
+                Finalizados=("idProyecto", "count"),
+                DentroPresupuesto=("Dentro", "sum")
+            )
+            .reset_index()
+        )
+    return _panel_financiera(total_final, total_dentro, resumen_anio)
+
+def _cancelaciones(proyectos):
+    # Panel 2: top 5 industrias con más proyectos cancelados
+    proy_cancel = proyectos[proyectos["EstadoProyecto"] == "CANCELADO"]
+    if proy_cancel.empty or "Industria" not in proy_cancel.columns:
+        return None
+    industria_counts = (
+        proy_cancel.groupby("Industria", observed=True)["idProyecto"]
+        .count()
+        .reset_index(name="ProyectosCancelados")
+        .sort_values("ProyectosCancelados", ascending=False)
+    )
+    return industria_counts.head(5)
+
+def _automatizacion(resumen_proyecto, tareas_anio, proyectos, top_n=3):
+    # Panel 3: tareas automatizadas vs no automatizadas (top proyectos por número de tareas)
+    if tareas_anio.empty:
+        return {"estado": "sin_tareas"}
+    total_tareas = len(tareas_anio)
+    total_auto = int((tareas_anio["EsAutomatizacion"] == 1).sum())
+    return _panel_automatizacion(resumen_proyecto, proyectos, total_tareas, total_auto, top_n)
+
+def _panel_automatizacion(resumen_proyecto, proyectos, total_tareas, total_auto, top_n=3):
+    resumen_auto = resumen_proyecto.merge(
+        proyectos[["idProyecto", "nombre_proyecto"]],
+        left_on="Proyecto_idProyecto",
+        right_on="idProyecto",
+        how="left"
+    )
+    top_auto = resumen_auto.sort_values("TareasTotales", ascending=False).head(top_n)
+    plot_df = top_auto.melt(
+        id_vars=["nombre_proyecto"],
+        value_vars=["TareasAuto", "TareasNoAuto"],
+        var_name="Tipo",
+        value_name="Cantidad"
+    )
+    plot_df["Tipo"] = plot_df["Tipo"].map({"TareasAuto": "Automatizadas", "TareasNoAuto": "No automatizadas"})
+    return {
+        "estado": "ok",
+        "total_tareas": total_tareas,
+        "total_auto": total_auto,
+        "pct_auto": (total_auto / total_tareas * 100) if total_tareas > 0 else 0,
+        "top": plot_df,
+    }
+
+def _incidentes_por_tarea(incidentes, tareas):
+    # Panel 4 (parte que no depende del año): incidentes / tareas por proyecto
+    inc_por_proy = (
+        incidentes.groupby("Proyecto_idProyecto")["idIncidente"]
+        .count()
+        .reset_index(name="NumIncidentes")
+    )
+    tareas_por_proy = (
+        tareas.groupby("Proyecto_idProyecto")["idTarea"]
+        .count()
+        .reset_index(name="NumTareas")
+    )
+    resumen = inc_por_proy.merge(tareas_por_proy, on="Proyecto_idProyecto", how="left")
+    resumen["NumTareas"] = resumen["NumTareas"].fillna(1)
+    resumen["IncidentesPorTarea"] = resumen["NumIncidentes"] / resumen["NumTareas"]
+    return resumen
+
+def _top_incidentes(resumen, proyectos):
+    # Panel 4: top 5 proyectos distintos por proporción de incidentes (nombre del año seleccionado)
+    resumen = resumen.merge(
+        proyectos[["idProyecto", "nombre_proyecto"]],
+        left_on="Proyecto_idProyecto",
+        right_on="idProyecto",
+        how="left"
+    )
+    return (
+        resumen
+        .sort_values("IncidentesPorTarea", ascending=False)
+        .drop_duplicates(subset=["nombre_proyecto"])
+        .head(5)
+    )
+
+def _por_anio(df, anios):
+    # Un solo groupby en lugar de un filtro booleano (y una copia) por año
+    grupos = dict(tuple(df.groupby("AnioCierre", sort=False))) if not df.empty else {}
+    return {anio: grupos.get(anio, df.iloc[0:0]) for anio in anios}
+
+def preparar_vistas(proyectos, tareas, incidentes):
+    """
+    Joins que no dependen del año (tareas con su AnioCierre, resumen de tareas e
+    incidentes por proyecto) y las vistas de cada año, calculados una sola vez.
+    Las vistas son de solo lectura: los paneles no las modifican.
+    """
+    anios = sorted(proyectos["AnioCierre"].dropna().unique()) if "AnioCierre" in proyectos.columns else []
+    vistas = {
+        "anios": anios,
+        "hay_tareas": not tareas.empty,
+        "proyectos": {CLAVE_TODOS: proyectos, **_por_anio(proyectos, anios)},
+        "tareas": {},
+        "resumen_tareas": {},
+        "resumen_incidentes": _incidentes_por_tarea(incidentes, tareas) if not incidentes.empty else None,
+    }
+    if not tareas.empty and not proyectos.empty:
+        tareas_con_anio = tareas.merge(
+            proyectos[["idProyecto", "AnioCierre"]],
+            left_on="Proyecto_idProyecto",
+            right_on="idProyecto",
+            how="left"
+        )
+        resumen_tareas = (
+            tareas_con_anio.groupby("Proyecto_idProyecto")
+            .agg(
+                TareasTotales=("idTarea", "count"),
+                TareasAuto=("EsAutomatizacion", "sum"),
+                AnioCierre=("AnioCierre", "first")
+            )
+            .reset_index()
+        )
+        resumen_tareas["TareasNoAuto"] = resumen_tareas["TareasTotales"] - resumen_tareas["TareasAuto"]
+        vistas["tareas"] = {CLAVE_TODOS: tareas_con_anio, **_por_anio(tareas_con_anio, anios)}
+        vistas["resumen_tareas"] = {
+            clave: df.drop(columns="AnioCierre").reset_index(drop=True)
+            for clave, df in {CLAVE_TODOS: resumen_tareas, **_por_anio(resumen_tareas, anios)}.items()
+        }
+    return vistas
+
+PANELES = ("financiera", "cancelaciones", "automatizacion", "incidentes")
+
+def calcular_panel(vistas, clave, panel):
+    """Un panel (uno de PANELES) para un año (o CLAVE_TODOS), o None si muestra "sin datos"."""
+    proy = vistas["proyectos"][clave]
+    if panel == "financiera":
+        return _financiera(proy)
+    if panel == "cancelaciones":
+        return _cancelaciones(proy)
+    if panel == "automatizacion":
+        if not vistas["hay_tareas"] or proy.empty:
+            return None
+        return _automatizacion(vistas["resumen_tareas"][clave], vistas["tareas"][clave], proy)
+    if panel == "incidentes":
+        resumen_incidentes = vistas["resumen_incidentes"]
+        return _top_incidentes(resumen_incidentes, proy) if resumen_incidentes is not None else None
+    raise KeyError(panel)
+
+def panel_anio(vistas, clave):
+    """Entrada del cubo para un año (o CLAVE_TODOS) a partir de preparar_vistas."""
+    return {panel: calcular_panel(vistas, clave, panel) for panel in PANELES}
+
+def construir_cubo(proyectos, tareas, incidentes):
+    """
+    Regresa {clave: {"financiera", "cancelaciones", "automatizacion", "incidentes"}}
+    con una clave por cada AnioCierre y CLAVE_TODOS. Cada entrada trae lo que el
+    panel dibuja (totales y DataFrames pequeños), o None cuando el panel muestra
+    su mensaje de "sin datos".
+    """
+    vistas = preparar_vistas(proyectos, tareas, incidentes)
+    return {clave: panel_anio(vistas, clave) for clave in [CLAVE_TODOS] + list(vistas["anios"])}
+
+# =========================================================================
+# CUBO DESDE LAS TABLAS RESUMEN DEL DW
+# =========================================================================
+# Con resumen_anio (conteos por año, estado e industria) y resumen_proyectos
+# (tareas, automatizadas e incidentes por proyecto) que exporta
+# Export_to_csvs.ipynb, el cubo sale de unos cuantos KB en lugar de todas las
+# filas de tareas e incidentes. Las entradas son las mismas que construir_cubo.
+
+def _filtrar_anio(df, clave):
+    return df if clave == CLAVE_TODOS else df[df["AnioCierre"] == clave]
+
+def _financiera_resumen(anios_df):
+    finalizados = anios_df[anios_df["EstadoProyecto"] == "FINALIZADO"]
+    if finalizados.empty:
+        return None
+    con_anio = finalizados.dropna(subset=["AnioCierre"])
+    resumen_anio = (
+        con_anio.groupby("AnioCierre")
+        .agg(Finalizados=("Proyectos", "sum"), DentroPresupuesto=("DentroPresupuesto", "sum"))
+        .astype("int64")
+        .reset_index()
+    )
+    return _panel_financiera(int(finalizados["Proyectos"].sum()), int(finalizados["DentroPresupuesto"].sum()), resumen_anio)
+
+def _cancelaciones_resumen(anios_df):
+    cancelados = anios_df[anios_df["EstadoProyecto"] == "CANCELADO"]
+    if cancelados.empty:
+        return None
+    industria_counts = (
+        cancelados.groupby("Industria", observed=True)["Proyectos"]
+        .sum()
+        .astype("int64")
+        .reset_index(name="ProyectosCancelados")
+        .sort_values("ProyectosCancelados", ascending=False)
+    )
+    return industria_counts.head(5)
+
+def preparar_vistas_resumen(resumen_anio, resumen_proyectos):
+    """Equivalente de preparar_vistas a partir de las tablas resumen."""
+    por_proyecto = resumen_proyectos.rename(columns={"idProyecto": "Proyecto_idProyecto"})
+    con_tareas = por_proyecto[por_proyecto["TareasTotales"] > 0].astype({"TareasTotales": "int64", "TareasAuto": "int64"})
+    con_tareas = con_tareas.assign(TareasNoAuto=con_tareas["TareasTotales"] - con_tareas["TareasAuto"])
+    con_incidentes = por_proyecto[por_proyecto["NumIncidentes"] > 0]
+    resumen_incidentes = None
+    if not con_incidentes.empty:
+        # Un proyecto con incidentes y sin tareas cuenta como 1 tarea (igual que _incidentes_por_tarea)
+        num_tareas = con_incidentes["TareasTotales"].where(con_incidentes["TareasTotales"] > 0, 1).astype("float64")
+        resumen_incidentes = pd.DataFrame({
+            "Proyecto_idProyecto": con_incidentes["Proyecto_idProyecto"].to_numpy(),
+            "NumIncidentes": con_incidentes["NumIncidentes"].astype("int64").to_numpy(),
+            "NumTareas": num_tareas.to_numpy(),
+        })
+        resumen_incidentes["IncidentesPorTarea"] = resumen_incidentes["NumIncidentes"] / resumen_incidentes["NumTareas"]
+    return {
+        "anios": sorted(resumen_anio["AnioCierre"].dropna().unique()),
+        "resumen_anio": resumen_anio,
+        # Nombre y año de cada proyecto que aparece en la consulta de proyectos del exportador
+        "nombres": por_proyecto.dropna(subset=["nombre_proyecto"])
+                               .rename(columns={"Proyecto_idProyecto": "idProyecto"})[["idProyecto", "nombre_proyecto", "AnioCierre"]],
+        "resumen_tareas": con_tareas,
+        "resumen_incidentes": resumen_incidentes,
+    }
+
+def panel_resumen(vistas, clave):
+    """Entrada del cubo para un año (o CLAVE_TODOS) a partir de preparar_vistas_resumen."""
+    anios_df = _filtrar_anio(vistas["resumen_anio"], clave)
+    nombres = _filtrar_anio(vistas["nombres"], clave)
+    resumen_tareas = vistas["resumen_tareas"]
+    if resumen_tareas.empty or anios_df.empty:
+        automatizacion = None
+    else:
+        tareas_anio = _filtrar_anio(resumen_tareas, clave)
+        if tareas_anio.empty:
+            automatizacion = {"estado": "sin_tareas"}
+        else:
+            automatizacion = _panel_automatizacion(
+                tareas_anio.drop(columns=["AnioCierre", "nombre_proyecto"]), nombres,
+                int(tareas_anio["TareasTotales"].sum()), int(tareas_anio["TareasAuto"].sum())
+            )
+    resumen_incidentes = vistas["resumen_incidentes"]
+    return {
+        "financiera": _financiera_resumen(anios_df),
+        "cancelaciones": _cancelaciones_resumen(anios_df),
+        "automatizacion": automatizacion,
+        "incidentes": _top_incidentes(resumen_incidentes, nombres) if resumen_incidentes is not None else None,
+    }
+
+def construir_cubo_resumen(resumen_anio, resumen_proyectos):
+    """Mismo cubo que construir_cubo, desde resumen_anio y resumen_proyectos del DW."""
+    vistas = preparar_vistas_resumen(resumen_anio, resumen_proyectos)
+    return {clave: panel_resumen(vistas, clave) for clave in [CLAVE_TODOS] + list(vistas["anios"])}
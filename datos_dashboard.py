@@ -0,0 +1,404 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+# =========================================================================
+# SNAPSHOT DEL DW PARA EL DASHBOARD (PARQUET TIPADO + RESPALDO EN CSV)
+# =========================================================================
+# Export_to_csvs.ipynb escribe cada consulta en CSV y en Parquet (zstd) con los
+# tipos de ESQUEMA_DASHBOARD ya aplicados; Dashboard.py lee el Parquet
+# memory-mapped y solo con las columnas que usa. Si el Parquet no existe (o no
+# está pyarrow) se lee el CSV y se le aplican los mismos tipos.
+
+CARPETA_DATOS = os.path.dirname(os.path.abspath(__file__))
+
+ARCHIVOS = {
+    "proyectos": "dw_proyectos",
+    "tareas": "dw_tareas",
+    "incidentes": "dw_incidentes",
+    "hechos": "dw_hechos_proyecto",
+    "resumen_anio": "dw_resumen_anio",
+    "resumen_proyectos": "dw_resumen_proyectos",
+}
+
+# Tipos por columna. "category" se normaliza a mayúsculas cuando aparece en MAYUSCULAS.
+ESQUEMA_DASHBOARD = {
+    "proyectos": {
+        "idProyecto": "int32", "nombre_proyecto": "string", "tipo_proyecto": "category",
+        "presupuesto": "float64", "costo_real": "float64", "fecha_inicio": "datetime64[ns]",
+        "fecha_fin_real": "datetime64[ns]", "EstadoProyecto": "category", "Industria": "category",
+        "AnioCierre": "Int16",
+    },
+    "tareas": {
+        "idTarea": "int32", "nombre": "string", "EsAutomatizacion": "int8", "EsReutilizado": "int8",
+        "Proyecto_idProyecto": "int32",
+    },
+    "incidentes": {
+        "idIncidente": "int32", "Proyecto_idProyecto": "int32", "idTarea": "Int32", "severidad": "category",
+        "costo_correccion": "float64",
+    },
+    "hechos": {
+        "idProyecto": "int32", "presupuesto": "float64", "costo_real": "float64", "desviacion_presupuestal": "float64",
+        "tareas_automatizacion_total": "int32", "defectos_reportados": "int32",
+    },
+    "resumen_anio": {
+        "AnioCierre": "Int16", "EstadoProyecto": "category", "Industria": "category", "Proyectos": "int32",
+        "DentroPresupuesto": "int32",
+    },
+    "resumen_proyectos": {
+        "idProyecto": "int32", "nombre_proyecto": "string", "AnioCierre": "Int16", "TareasTotales": "int32",
+        "TareasAuto": "int32", "NumIncidentes": "int32",
+    },
+}
+
+# Los estados se comparan siempre en mayúsculas ("FINALIZADO", "CANCELADO")
+MAYUSCULAS = {"EstadoProyecto", "severidad"}
+
+# Columnas que realmente lee Dashboard.py
+COLUMNAS_DASHBOARD = {
+    "proyectos": ["idProyecto", "nombre_proyecto", "presupuesto", "costo_real", "EstadoProyecto", "Industria", "AnioCierre"],
+    "tareas": ["idTarea", "EsAutomatizacion", "Proyecto_idProyecto"],
+    "incidentes": ["idIncidente", "Proyecto_idProyecto"],
+    "hechos": list(ESQUEMA_DASHBOARD["hechos"]),
+    "resumen_anio": list(ESQUEMA_DASHBOARD["resumen_anio"]),
+    "resumen_proyectos": list(ESQUEMA_DASHBOARD["resumen_proyectos"]),
+}
+
+# Lo escribe el exportador al terminar: hash de contenido y filas de cada tabla
+MANIFIESTO = "dw_manifest.json"
+
+def ruta_archivo(tabla, extension, carpeta=None):
+    return os.path.join(carpeta or CARPETA_DATOS, f"{ARCHIVOS[tabla]}.{extension}")
+
+def archivo_tabla(tabla, carpeta=None):
+    """El archivo que leer_tabla va a leer: el Parquet si existe, si no el CSV."""
+    ruta_parquet = ruta_archivo(tabla, "parquet", carpeta)
+    return ruta_parquet if os.path.exists(ruta_parquet) else ruta_archivo(tabla, "csv", carpeta)
+
+def tipar_tabla(df, tabla):
+    """Aplica ESQUEMA_DASHBOARD a un DataFrame (las columnas que no trae se ignoran)."""
+    for col, tipo in ESQUEMA_DASHBOARD[tabla].items():
+        if col not in df.columns:
+            continue
+        if tipo == "category":
+            valores = df[col].astype("string")
+            if col in MAYUSCULAS:
+                valores = valores.str.strip().str.upper()
+            df[col] = valores.astype("category")
+        elif tipo.startswith("datetime"):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif tipo.startswith("Int") or tipo.startswith("float"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(tipo)
+        else:
+            df[col] = df[col].astype(tipo)
+    return df
+
+def _esquema_arrow(tabla):
+    # Esquema fijo para que todos los bloques del ParquetWriter coincidan
+    import pyarrow as pa
+    tipos = {
+        "int8": pa.int8(), "int32": pa.int32(), "Int16": pa.int16(), "Int32": pa.int32(),
+        "float64": pa.float64(), "string": pa.string(), "datetime64[ns]": pa.timestamp("ns"),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+    }
+    return pa.schema([(col, tipos[tipo]) for col, tipo in ESQUEMA_DASHBOARD[tabla].items()])
+
+class EscritorSnapshot:
+    """
+    Escribe una tabla en Parquet por bloques (cada bloque es un row group), para
+    que el exportador no tenga que juntar la consulta completa en memoria.
+    """
+    def __init__(self, tabla, carpeta=None, compresion="zstd"):
+        import pyarrow.parquet as pq
+        self.tabla = tabla
+        self.esquema = _esquema_arrow(tabla)
+        self.ruta = ruta_archivo(tabla, "parquet", carpeta)
+        self._temporal = self.ruta + ".tmp"
+        self._writer = pq.ParquetWriter(self._temporal, self.esquema, compression=compresion)
+
+    def escribir(self, bloque):
+        import pyarrow as pa
+        bloque = tipar_tabla(bloque.copy(), self.tabla)
+        self._writer.write_table(pa.Table.from_pandas(bloque, schema=self.esquema, preserve_index=False))
+
+    def cerrar(self):
+        self._writer.close()
+        # Reemplazo atómico: el Dashboard nunca ve un archivo a medio escribir
+        os.replace(self._temporal, self.ruta)
+
+    def descartar(self):
+        """Cierra y borra el temporal sin tocar el snapshot publicado (si la consulta falló)."""
+        try:
+            self._writer.close()
+        finally:
+            if os.path.exists(self._temporal):
+                os.remove(self._temporal)
+
+def guardar_snapshot(df, tabla, carpeta=None):
+    escritor = EscritorSnapshot(tabla, carpeta)
+    escritor.escribir(df)
+    escritor.cerrar()
+
+def leer_tabla(tabla, columnas=None, carpeta=None):
+    """
+    Lee una tabla del snapshot: Parquet memory-mapped con solo las columnas
+    pedidas, o el CSV tipado si no hay Parquet.
+    """
+    columnas = columnas or COLUMNAS_DASHBOARD[tabla]
+    ruta_parquet = ruta_archivo(tabla, "parquet", carpeta)
+    if os.path.exists(ruta_parquet):
+        try:
+            df = pd.read_parquet(ruta_parquet, columns=columnas, memory_map=True)
+            # Los enteros con nulos (AnioCierre) se conservan como Int16/Int32 y no como float
+            for col in df.columns:
+                tipo = ESQUEMA_DASHBOARD[tabla].get(col, "")
+                if tipo.startswith("Int") and str(df[col].dtype) != tipo:
+                    df[col] = df[col].astype(tipo)
+            return df
+        except ImportError:
+            pass
+    df = pd.read_csv(ruta_archivo(tabla, "csv", carpeta), usecols=lambda c: c in columnas)
+    return tipar_tabla(df, tabla)
+
+# =========================================================================
+# CONSULTAS DEL EXPORTADOR (Export_to_csvs.ipynb)
+# =========================================================================
+
+TAM_BLOQUE_EXPORTACION = 50000
+
+# Consultas simultáneas contra el DW en exportar_tablas (una conexión por consulta)
+MAX_CONCURRENCIA_EXPORTACION = 4
+
+CONSULTAS_EXPORTACION = {
+    # Proyectos (con estado, presupuesto, costo, cliente)
+    "proyectos": """
+SELECT 
+    dp.idProyecto,
+    dp.nombre_proyecto,
+    dp.tipo_proyecto,
+    dp.presupuesto,
+    dp.costo_real,
+    dp.fecha_inicio,
+    dp.fecha_fin_real,
+    des.estado AS EstadoProyecto,
+    dc.industria AS Industria,
+    dt.anio AS AnioCierre
+FROM dim_proyecto dp
+INNER JOIN dim_estado_proyecto des ON dp.idEstado = des.idEstado
+INNER JOIN dim_cliente dc ON dp.idCliente = dc.idCliente
+LEFT JOIN dim_tiempo dt ON dp.idProyecto = dt.idTiempo  -- Ajusta join si tu modelo usa otra relación
+""",
+    # Tareas (con indicador de automatización y proyecto)
+    "tareas": """
+SELECT 
+    idTarea,
+    nombre,
+    es_automatizacion AS EsAutomatizacion,
+    es_reutilizado AS EsReutilizado,
+    idProyecto AS Proyecto_idProyecto
+FROM dim_tarea
+""",
+    # Incidentes (con proyecto asociado)
+    "incidentes": """
+SELECT 
+    idIncidente,
+    idProyecto AS Proyecto_idProyecto,
+    idTarea,
+    severidad,
+    costo_correccion
+FROM hecho_incidente
+""",
+    # Hechos agregados por proyecto
+    "hechos": """
+SELECT 
+    idProyecto,
+    presupuesto,
+    costo_real,
+    desviacion_presupuestal,
+    tareas_automatizacion_total,
+    defectos_reportados
+FROM hecho_proyecto
+""",
+    # Resúmenes que mantiene el ETL (etl_dw.actualizar_resumenes): con estos dos
+    # el Dashboard arma el cubo sin bajar las filas de tareas e incidentes
+    "resumen_anio": """
+SELECT
+    NULLIF(anio, 0) AS AnioCierre,
+    estado AS EstadoProyecto,
+    NULLIF(industria, '') AS Industria,
+    proyectos AS Proyectos,
+    dentro_presupuesto AS DentroPresupuesto
+FROM resumen_anio
+ORDER BY anio, estado, industria
+""",
+    # Nombre y año solo para los proyectos que trae la consulta "proyectos" (mismos joins)
+    "resumen_proyectos": """
+SELECT
+    r.idProyecto,
+    p.nombre_proyecto,
+    p.AnioCierre,
+    r.tareas_total AS TareasTotales,
+    r.tareas_automatizadas AS TareasAuto,
+    r.incidentes AS NumIncidentes
+FROM resumen_proyecto r
+LEFT JOIN (
+    SELECT dp.idProyecto, dp.nombre_proyecto, dt.anio AS AnioCierre
+    FROM dim_proyecto dp
+    INNER JOIN dim_estado_proyecto des ON dp.idEstado = des.idEstado
+    INNER JOIN dim_cliente dc ON dp.idCliente = dc.idCliente
+    LEFT JOIN dim_tiempo dt ON dp.idProyecto = dt.idTiempo
+) p ON p.idProyecto = r.idProyecto
+ORDER BY r.idProyecto
+""",
+}
+
+# Lo que necesita Dashboard.py; las filas completas (proyectos, tareas,
+# incidentes, hechos) se siguen pudiendo exportar pidiéndolas en tablas=
+TABLAS_RESUMEN = ["resumen_anio", "resumen_proyectos"]
+
+def exportar_tabla(conn, tabla, carpeta=None, tam_bloque=TAM_BLOQUE_EXPORTACION):
+    """
+    Lee la consulta de la tabla por bloques y la agrega al CSV y al snapshot
+    Parquet tipado que lee el Dashboard. Ambos se escriben en un .tmp y se
+    publican con os.replace al terminar; si la consulta falla a medias se borran
+    los temporales y quedan los archivos anteriores. Regresa el número de filas exportadas.
+    """
+    total = 0
+    ruta_csv = ruta_archivo(tabla, "csv", carpeta)
+    temporal_csv = ruta_csv + ".tmp"
+    parquet = EscritorSnapshot(tabla, carpeta)
+    try:
+        for i, bloque in enumerate(pd.read_sql(CONSULTAS_EXPORTACION[tabla], conn, chunksize=tam_bloque)):
+            bloque.to_csv(temporal_csv, index=False, mode="w" if i == 0 else "a", header=(i == 0))
+            parquet.escribir(bloque)
+            total += len(bloque)
+    except BaseException:
+        parquet.descartar()
+        if os.path.exists(temporal_csv):
+            os.remove(temporal_csv)
+        raise
+    parquet.cerrar()
+    if os.path.exists(temporal_csv):
+        os.replace(temporal_csv, ruta_csv)
+    return total
+
+def _exportar_con_conexion(conectar, tabla, carpeta, tam_bloque):
+    conn = conectar()
+    try:
+        return exportar_tabla(conn, tabla, carpeta, tam_bloque)
+    finally:
+        # Con un pool de mysql.connector, close() regresa la conexión al pool
+        conn.close()
+
+def exportar_tablas(conectar, tablas=None, carpeta=None, max_concurrencia=MAX_CONCURRENCIA_EXPORTACION,
+                    tam_bloque=TAM_BLOQUE_EXPORTACION, al_terminar=None):
+    """
+    Exporta varias tablas a la vez: cada consulta corre en su propio hilo con su
+    propia conexión (conectar() la abre o la toma de un pool) y escribe su CSV y
+    su Parquet conforme llegan sus bloques. A lo más max_concurrencia consultas
+    simultáneas, para no saturar el DW; el tiempo total se acerca al de la
+    consulta más lenta y no a la suma. al_terminar(tabla, filas) se llama en
+    cuanto termina cada tabla. Regresa {tabla: filas exportadas}.
+    """
+    tablas = list(tablas or CONSULTAS_EXPORTACION)
+    filas = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrencia, len(tablas))), thread_name_prefix="exportacion") as ejecutor:
+        futuros = {ejecutor.submit(_exportar_con_conexion, conectar, tabla, carpeta, tam_bloque): tabla for tabla in tablas}
+        try:
+            for futuro in as_completed(futuros):
+                tabla = futuros[futuro]
+                filas[tabla] = futuro.result()
+                if al_terminar is not None:
+                    al_terminar(tabla, filas[tabla])
+        except BaseException:
+            # Si una consulta falla no se empiezan las que faltan; las que ya corren terminan
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+    return {tabla: filas[tabla] for tabla in tablas}
+
+# =========================================================================
+# VERSIÓN DE LOS DATOS (LLAVE DE CACHÉ)
+# =========================================================================
+
+def hash_archivo(ruta, tam_bloque=1 << 20):
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+def _firma_stat(ruta):
+    st = os.stat(ruta)
+    return st.st_mtime_ns, st.st_size
+
+def escribir_manifiesto(filas=None, carpeta=None):
+    """
+    Guarda en MANIFIESTO el sha256, tamaño y mtime del archivo de cada tabla.
+    filas es opcional (tabla -> número de filas exportadas), solo informativo.
+    """
+    manifiesto = {"generado": datetime.now().isoformat(timespec="seconds"), "tablas": {}}
+    for tabla in ARCHIVOS:
+        ruta = archivo_tabla(tabla, carpeta)
+        if not os.path.exists(ruta):
+            continue
+        mtime_ns, tamano = _firma_stat(ruta)
+        manifiesto["tablas"][tabla] = {
+            "archivo": os.path.basename(ruta),
+            "sha256": hash_archivo(ruta),
+            "tamano": tamano,
+            "mtime_ns": mtime_ns,
+            "filas": (filas or {}).get(tabla),
+        }
+    ruta = os.path.join(carpeta or CARPETA_DATOS, MANIFIESTO)
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, indent=2)
+    os.replace(ruta + ".tmp", ruta)
+    return manifiesto
+
+def versiones_datos(carpeta=None):
+    """
+    Versión de cada tabla para usarla como llave de caché. Si el manifiesto del
+    exportador describe el archivo actual (mismo nombre, tamaño y mtime) se usa
+    su sha256; si no (archivo reemplazado a mano, sin manifiesto) se usa la firma
+    mtime/tamaño. Solo hace os.stat por tabla: es barato llamarla en cada rerun.
+    """
+    try:
+        with open(os.path.join(carpeta or CARPETA_DATOS, MANIFIESTO), encoding="utf-8") as f:
+            manifiesto = json.load(f).get("tablas", {})
+    except (OSError, ValueError):
+        manifiesto = {}
+
+    versiones = {}
+    for tabla in ARCHIVOS:
+        ruta = archivo_tabla(tabla, carpeta)
+        if not os.path.exists(ruta):
+            versiones[tabla] = None
+            continue
+        mtime_ns, tamano = _firma_stat(ruta)
+        entrada = manifiesto.get(tabla, {})
+        if (entrada.get("archivo") == os.path.basename(ruta) and entrada.get("tamano") == tamano
+                and entrada.get("mtime_ns") == mtime_ns):
+            versiones[tabla] = entrada["sha256"]
+        else:
+            versiones[tabla] = f"{os.path.basename(ruta)}:{mtime_ns}:{tamano}"
+    return versiones
+
+def snapshot_desde_csv(carpeta=None):
+    """Genera los Parquet (y el manifiesto) a partir de los CSV ya exportados."""
+    filas = {}
+    for tabla in ARCHIVOS:
+        if not os.path.exists(ruta_archivo(tabla, "csv", carpeta)):
+            continue
+        df = pd.read_csv(ruta_archivo(tabla, "csv", carpeta))
+        guardar_snapshot(df, tabla, carpeta)
+        filas[tabla] = len(df)
+        print(f"✓ {ARCHIVOS[tabla]}.parquet ({len(df)} filas)")
+    escribir_manifiesto(filas, carpeta)
+
+if __name__ == "__main__":
+    snapshot_desde_csv()